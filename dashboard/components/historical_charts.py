@@ -21,6 +21,10 @@ _GREEN_BAND = (0.25, 0.40)     # Sebastian ratio target
 _RED_BAND_LO = 0.20
 _RED_BAND_HI = 0.50
 
+# Server-side downsampling target per series; "All" and 1M ranges would
+# otherwise ship every raw snapshot to the browser.
+_CHART_MAX_POINTS = 1500
+
 
 # ---------------------------------------------------------------------------
 # Public entry point (T065)
@@ -263,7 +267,7 @@ def _load_snapshots(store: Any, time_range: str) -> list[dict]:
         loop = asyncio.new_event_loop()
         try:
             rows = loop.run_until_complete(
-                store.query_snapshots(start_dt=start_dt)
+                store.query_snapshots(start_dt=start_dt, max_points=_CHART_MAX_POINTS)
             )
         finally:
             loop.close()
@@ -140,6 +140,8 @@ CREATE INDEX IF NOT EXISTS idx_acct_snap_acct ON account_snapshots (account_id);
 
 CREATE INDEX IF NOT EXISTS idx_acct_snap_ts ON account_snapshots (timestamp DESC);
 
+CREATE INDEX IF NOT EXISTS idx_acct_snap_acct_ts ON account_snapshots (account_id, timestamp DESC);
+
 -- ────────────────────────────────────────────────────────────────────────────
 -- 5. Option chains cache (optional, for offline analysis)
 -- ────────────────────────────────────────────────────────────────────────────
@@ -190,6 +192,53 @@ CREATE TABLE IF NOT EXISTS available_expirations (
 
 CREATE INDEX IF NOT EXISTS idx_avail_expir_underlying ON available_expirations (underlying, sec_type);
 
+-- ────────────────────────────────────────────────────────────────────────────
+-- 6b. Contract registry — qualified IB contracts reused across sessions
+-- ────────────────────────────────────────────────────────────────────────────
+CREATE TABLE IF NOT EXISTS contract_registry (
+    symbol TEXT NOT NULL,
+    expiry TEXT NOT NULL DEFAULT '', -- YYYYMMDD ('' for STK / FUT month codes)
+    strike DOUBLE PRECISION NOT NULL DEFAULT 0,
+    option_right TEXT NOT NULL DEFAULT '', -- 'C', 'P' or ''
+    sec_type TEXT NOT NULL,
+    exchange TEXT NOT NULL DEFAULT '',
+    conid BIGINT NOT NULL,
+    currency TEXT NOT NULL DEFAULT 'USD',
+    multiplier TEXT,
+    local_symbol TEXT,
+    trading_class TEXT,
+    qualified_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (
+        symbol,
+        expiry,
+        strike,
+        option_right,
+        sec_type,
+        exchange
+    )
+);
+
+CREATE INDEX IF NOT EXISTS idx_contract_registry_conid ON contract_registry (conid);
+
+-- ────────────────────────────────────────────────────────────────────────────
+-- 6c. Perf events — optional per-stage timings (IB_PERF_EVENTS_DB=1)
+-- ────────────────────────────────────────────────────────────────────────────
+CREATE TABLE IF NOT EXISTS perf_events (
+    id BIGSERIAL PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    operation TEXT NOT NULL, -- e.g. 'refresh_positions'
+    stage TEXT NOT NULL, -- stage name, or 'total' (carries the run counters)
+    duration_ms DOUBLE PRECISION NOT NULL,
+    counts JSONB,
+    recorded_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_perf_events_op_stage_time ON perf_events (
+    operation,
+    stage,
+    recorded_at DESC
+);
+
 -- ────────────────────────────────────────────────────────────────────────────
 -- 7. Trade journal — human notes on trade logic / post-mortem
 -- ────────────────────────────────────────────────────────────────────────────
@@ -262,6 +311,8 @@ CREATE TABLE IF NOT EXISTS risk_snapshots (
 
 CREATE INDEX IF NOT EXISTS idx_risk_snap_ts ON risk_snapshots (timestamp DESC);
 
+CREATE INDEX IF NOT EXISTS idx_risk_snap_acct_ts ON risk_snapshots (account_id, timestamp DESC);
+
 -- ────────────────────────────────────────────────────────────────────────────
 -- 10. Strategy associations — reconstructed multi-leg strategies
 -- ────────────────────────────────────────────────────────────────────────────
@@ -328,9 +379,12 @@ CREATE INDEX IF NOT EXISTS idx_strategy_group_legs_account ON strategy_group_leg
 
 -- ────────────────────────────────────────────────────────────────────────────
 -- 11. Positions cache — minute-by-minute snapshots for LLM tools
+--     Range-partitioned by UTC day (positions_cache_pYYYYMMDD).  The desktop
+--     app creates partitions ahead of time and thins/drops old history
+--     (Database.compact_positions_cache, IB_POSITIONS_CACHE_* settings).
 -- ────────────────────────────────────────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS positions_cache (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     account_id TEXT NOT NULL,
     snapshot_id TEXT NOT NULL, -- UUID per refresh cycle
     conid BIGINT NOT NULL,
@@ -353,8 +407,9 @@ CREATE TABLE IF NOT EXISTS positions_cache (
     vega DOUBLE PRECISION,
     iv DOUBLE PRECISION,
     spx_delta DOUBLE PRECISION,
-    cached_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-);
+    cached_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, cached_at)
+) PARTITION BY RANGE (cached_at);
 
 CREATE INDEX IF NOT EXISTS idx_positions_cache_account_cached ON positions_cache (account_id, cached_at DESC);
 
@@ -366,6 +421,16 @@ CREATE INDEX IF NOT EXISTS idx_positions_cache_expiry ON positions_cache (
     cached_at DESC
 );
 
+-- Newest snapshot per (account, kind), upserted alongside each cache write so
+-- "latest positions" is one primary-key lookup regardless of history size.
+CREATE TABLE IF NOT EXISTS latest_snapshot (
+    account_id TEXT NOT NULL,
+    kind TEXT NOT NULL, -- 'positions'
+    snapshot_id TEXT NOT NULL,
+    cached_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (account_id, kind)
+);
+
 -- ────────────────────────────────────────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS portfolio_greeks_cache (
     id SERIAL PRIMARY KEY,
@@ -403,4 +468,19 @@ CREATE TABLE IF NOT EXISTS portfolio_metrics_cache (
     cached_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
-CREATE INDEX IF NOT EXISTS idx_portfolio_metrics_cache_account_cached ON portfolio_metrics_cache (account_id, cached_at DESC);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_portfolio_metrics_cache_account_cached ON portfolio_metrics_cache (account_id, cached_at DESC);
+
+-- Hourly / daily buckets of the greeks/metrics caches and the risk/account
+-- snapshots for long-range charts.  stats holds <col>, <col>_first, _min,
+-- _max, _avg per value column; refreshed incrementally per account by
+-- Database.refresh_timeseries_rollups.
+CREATE TABLE IF NOT EXISTS timeseries_rollup (
+    source TEXT NOT NULL, -- 'portfolio_greeks' | 'portfolio_metrics' | 'risk_snapshots' | 'account_snapshots'
+    resolution TEXT NOT NULL, -- 'hour' | 'day'
+    account_id TEXT NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    samples INTEGER NOT NULL,
+    stats JSONB NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (source, resolution, account_id, bucket_start)
+);
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""desktop/engine/bounded_cache.py — Bounded TTL + LRU cache with memory accounting.
+
+The engine's chain, skeleton, expiry, Greek and last-price caches used to be
+plain dicts that grew for the life of the process.  :class:`BoundedCache` is a
+drop-in ``MutableMapping`` replacement that
+
+* expires entries older than *ttl_s* on access,
+* evicts least-recently-used entries once *max_entries* or *max_bytes* is
+  exceeded (sizes are estimated with :func:`approx_size`), and
+* counts hits, misses, evictions and expirations for display in the UI.
+"""
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Iterator
+
+# Lists longer than this are sized from a sample of their first elements.
+_SIZE_SAMPLE = 8
+
+
+def approx_size(obj: Any, _depth: int = 0) -> int:
+    """Rough deep size of *obj* in bytes (containers, dataclasses, plain objects).
+
+    Long homogeneous sequences are extrapolated from a sample so that sizing a
+    500-row chain costs the same as sizing eight rows.
+    """
+    size = sys.getsizeof(obj)
+    if _depth > 4 or isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        items = list(obj.items())
+        sample = items[:_SIZE_SAMPLE]
+        if sample:
+            per_item = sum(approx_size(k, _depth + 1) + approx_size(v, _depth + 1) for k, v in sample) / len(sample)
+            size += int(per_item * len(items))
+        return size
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        seq = list(obj) if not isinstance(obj, (list, tuple)) else obj
+        sample = seq[:_SIZE_SAMPLE]
+        if sample:
+            per_item = sum(approx_size(v, _depth + 1) for v in sample) / len(sample)
+            size += int(per_item * len(seq))
+        return size
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return size + sum(approx_size(getattr(obj, f.name, None), _depth + 1) for f in fields(obj))
+    attrs = getattr(obj, "__dict__", None)
+    if isinstance(attrs, dict):
+        size += approx_size(attrs, _depth + 1)
+    return size
+
+
+class BoundedCache(MutableMapping):
+    """``dict``-compatible cache bounded by entry count and/or estimated bytes.
+
+    ``key in cache`` does not touch LRU order; ``cache[key]`` / ``get`` do.
+    A miss is counted by whichever of the two finds nothing, so the common
+    ``if key in cache: value = cache[key]`` pattern counts once per lookup.
+    Iteration, ``items()`` and ``values()`` skip expired entries without
+    changing LRU order or the counters.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        ttl_s: float | None = None,
+        sizeof: Callable[[Any], int] = approx_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.max_entries = max_entries if max_entries and max_entries > 0 else None
+        self.max_bytes = max_bytes if max_bytes and max_bytes > 0 else None
+        self.ttl_s = ttl_s if ttl_s and ttl_s > 0 else None
+        self._sizeof = sizeof
+        self._clock = clock
+        # key → (value, stored_at, nbytes); most recently used last
+        self._data: OrderedDict[Any, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # ── Mapping protocol ─────────────────────────────────────────────────
+    def __getitem__(self, key: Any) -> Any:
+        entry = self._live_entry(key)
+        if entry is None:
+            self.misses += 1
+            raise KeyError(key)
+        self.hits += 1
+        self._data.move_to_end(key)
+        return entry[0]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        nbytes = self._measure(value) if self.max_bytes else 0
+        self._data[key] = (value, self._clock(), nbytes)
+        self._bytes += nbytes
+        self._enforce_budget()
+
+    def __delitem__(self, key: Any) -> None:
+        value, _ts, nbytes = self._data.pop(key)
+        self._bytes -= nbytes
+
+    def __contains__(self, key: object) -> bool:
+        if self._live_entry(key) is not None:
+            return True
+        self.misses += 1
+        return False
+
+    def __iter__(self) -> Iterator[Any]:
+        self.purge_expired()
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"BoundedCache({self.name!r}, entries={len(self._data)}, bytes={self._bytes})"
+
+    def items(self) -> list[tuple[Any, Any]]:  # type: ignore[override]
+        self.purge_expired()
+        return [(k, entry[0]) for k, entry in self._data.items()]
+
+    def values(self) -> list[Any]:  # type: ignore[override]
+        self.purge_expired()
+        return [entry[0] for entry in self._data.values()]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    # ── Budget / accounting ──────────────────────────────────────────────
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns the number removed."""
+        if self.ttl_s is None:
+            return 0
+        cutoff = self._clock() - self.ttl_s
+        expired = [k for k, (_v, ts, _n) in self._data.items() if ts < cutoff]
+        for key in expired:
+            del self[key]
+        self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _live_entry(self, key: Any) -> tuple[Any, float, int] | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if self.ttl_s is not None and self._clock() - entry[1] > self.ttl_s:
+            del self[key]
+            self.expirations += 1
+            return None
+        return entry
+
+    def _measure(self, value: Any) -> int:
+        try:
+            return int(self._sizeof(value))
+        except Exception:
+            return sys.getsizeof(value)
+
+    def _enforce_budget(self) -> None:
+        # Never evict the entry just written: a single oversized value is kept
+        # (alone) rather than silently dropped.
+        while len(self._data) > 1 and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._data))
+            del self[oldest]
+            self.evictions += 1
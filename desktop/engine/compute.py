@@ -0,0 +1,127 @@
+"""desktop/engine/compute.py — Off-loop executor for pure-Python portfolio math.
+
+``IBEngine.refresh_positions`` hands the built position rows to
+:func:`compute_portfolio` through a :class:`ComputeExecutor`, so risk
+aggregation and strategy reconstruction run on a worker instead of the qasync
+loop that also paints the GUI.  Inputs and outputs are plain dataclasses and
+dicts, so the same call works on a thread pool (default) or a process pool;
+the awaiting coroutine resumes on the loop thread, which is where the engine
+emits its Qt signals.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence, TypeVar
+
+from desktop.models.strategy_reconstructor import StrategyGroup, StrategyReconstructor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+COMPUTE_MODES = ("thread", "process", "inline")
+
+
+@dataclass
+class PortfolioComputeResult:
+    """Output of :func:`compute_portfolio`.
+
+    ``risk`` holds the ``PortfolioRiskSummary`` fields; ``reconstructor`` is
+    returned so its cached strategy layout survives a process-pool round trip.
+    """
+    risk: dict[str, float | int]
+    native_total_delta: float
+    groups: list[StrategyGroup]
+    reconstructor: StrategyReconstructor
+
+
+def aggregate_risk(rows: Sequence[Any]) -> tuple[dict[str, float | int], float]:
+    """Portfolio totals for *rows*; returns ``(summary fields, native delta)``.
+
+    Aggregate delta is kept in SPX-equivalent units to avoid mixed-unit totals
+    across stocks, equity options and index options.
+    """
+    native_total_delta = 0.0
+    total_gamma = total_theta = total_vega = total_spx_delta = 0.0
+    total_value = gross_exposure = 0.0
+    opts = stks = 0
+    for r in rows:
+        native_total_delta += r.delta or 0
+        total_gamma += r.gamma or 0
+        total_theta += r.theta or 0
+        total_vega += r.vega or 0
+        total_spx_delta += r.spx_delta or 0
+        total_value += r.market_value or 0
+        gross_exposure += abs(r.market_value or 0)
+        if r.sec_type in ("OPT", "FOP"):
+            opts += 1
+        elif r.sec_type == "STK":
+            stks += 1
+    risk = {
+        "total_positions": len(rows),
+        "total_value": total_value,
+        "total_spx_delta": total_spx_delta,
+        "total_delta": total_spx_delta,
+        "total_gamma": total_gamma,
+        "total_theta": total_theta,
+        "total_vega": total_vega,
+        "theta_vega_ratio": total_theta / total_vega if total_vega != 0 else 0.0,
+        "gross_exposure": gross_exposure,
+        "net_exposure": total_value,
+        "options_count": opts,
+        "stocks_count": stks,
+    }
+    return risk, native_total_delta
+
+
+def compute_portfolio(rows: Sequence[Any], reconstructor: StrategyReconstructor) -> PortfolioComputeResult:
+    """Risk totals and strategy groups for one refresh (no I/O, no Qt)."""
+    risk, native_total_delta = aggregate_risk(rows)
+    groups = reconstructor.reconstruct(rows)
+    return PortfolioComputeResult(
+        risk=risk,
+        native_total_delta=native_total_delta,
+        groups=groups,
+        reconstructor=reconstructor,
+    )
+
+
+class ComputeExecutor:
+    """Run CPU-bound callables off the event loop.
+
+    *mode* is ``thread`` (default; one worker so stateful inputs such as the
+    reconstructor are never used concurrently), ``process`` (callables and
+    arguments must be picklable) or ``inline`` (run on the loop, for debugging).
+    """
+
+    def __init__(self, mode: str | None = None, *, max_workers: int | None = None):
+        mode = (mode or os.getenv("IB_COMPUTE_EXECUTOR", "thread")).strip().lower()
+        if mode not in COMPUTE_MODES:
+            logger.warning("Unknown IB_COMPUTE_EXECUTOR %r; using thread", mode)
+            mode = "thread"
+        self.mode = mode
+        self._max_workers = max(1, int(max_workers or os.getenv("IB_COMPUTE_WORKERS", "1")))
+        self._executor: Executor | None = None
+
+    def _ensure_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="compute")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.mode == "inline":
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._ensure_executor(), fn, *args)
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,210 @@
+"""desktop/engine/contract_registry.py — Persistent contract qualification registry.
+
+Every path that needs a qualified IB contract (option chain loads, the
+position Greek sweep, order resolution, WhatIf simulation) consults this
+registry before calling ``qualifyContractsAsync``.  Contracts are keyed by
+``(symbol, expiry, strike, right, secType, exchange)`` and additionally indexed
+by conId; only registry misses are sent to IB.  The registry is warmed from the
+``contract_registry`` table at connect time and newly qualified contracts are
+queued for persistence, so a restart does not re-qualify the same chain.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+from typing import Any, Callable, Iterable
+
+from ib_async import Contract
+
+logger = logging.getLogger(__name__)
+
+RegistryKey = tuple[str, str, float, str, str, str]
+
+_PERSISTED_FIELDS = (
+    "conId", "symbol", "secType", "lastTradeDateOrContractMonth", "strike", "right",
+    "exchange", "currency", "multiplier", "localSymbol", "tradingClass",
+)
+
+
+def registry_key(
+    symbol: Any,
+    expiry: Any,
+    strike: Any,
+    right: Any,
+    sec_type: Any,
+    exchange: Any,
+) -> RegistryKey:
+    """Normalise contract attributes into a registry key."""
+    try:
+        strike_value = round(float(strike or 0.0), 4)
+    except (TypeError, ValueError):
+        strike_value = 0.0
+    right_text = str(right or "").upper()[:1]
+    return (
+        str(symbol or "").upper(),
+        str(expiry or "").replace("-", "")[:8],
+        strike_value,
+        right_text if right_text in {"C", "P"} else "",
+        str(sec_type or "").upper(),
+        str(exchange or "").upper(),
+    )
+
+
+def contract_key(contract: Any) -> RegistryKey:
+    return registry_key(
+        getattr(contract, "symbol", ""),
+        getattr(contract, "lastTradeDateOrContractMonth", ""),
+        getattr(contract, "strike", 0.0),
+        getattr(contract, "right", ""),
+        getattr(contract, "secType", ""),
+        getattr(contract, "exchange", ""),
+    )
+
+
+def _match_key(key: RegistryKey) -> tuple[str, str, float, str]:
+    # IB may echo a different exchange / secType spelling; match on the option identity.
+    return key[:4]
+
+
+class ContractRegistry:
+    """In-memory qualified-contract registry with write-behind persistence.
+
+    The IB client is looked up through *ib_provider* on every call so the
+    engine (and tests) can swap ``IBEngine._ib`` after construction.
+    """
+
+    def __init__(self, ib_provider: Callable[[], Any]):
+        self._ib_provider = ib_provider
+        self._by_key: dict[RegistryKey, Any] = {}
+        self._by_conid: dict[int, Any] = {}
+        self._pending: dict[RegistryKey, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def lookup(self, contract: Any) -> Any | None:
+        """Return a copy of the qualified contract for *contract* (by conId, then key)."""
+        conid = int(getattr(contract, "conId", 0) or 0)
+        if conid > 0 and conid in self._by_conid:
+            return copy.copy(self._by_conid[conid])
+        return self.lookup_key(contract_key(contract))
+
+    def lookup_key(self, key: RegistryKey) -> Any | None:
+        stored = self._by_key.get(key)
+        return copy.copy(stored) if stored is not None else None
+
+    def store(self, contract: Any, *, key: RegistryKey | None = None, persist: bool = True) -> None:
+        """Record a copy of a qualified *contract*; ignored unless it carries a conId.
+
+        A copy is kept, and lookups hand out copies, so callers that adjust
+        their contract (routing exchange, tradingClass) cannot alter the entry.
+        """
+        conid = int(getattr(contract, "conId", 0) or 0)
+        if conid <= 0:
+            return
+        contract = copy.copy(contract)
+        keys = {contract_key(contract)}
+        if key is not None:
+            keys.add(key)
+        for k in keys:
+            self._by_key[k] = contract
+            if persist:
+                self._pending[k] = contract
+        self._by_conid[conid] = contract
+
+    def warm(self, rows: Iterable[dict[str, Any]]) -> int:
+        """Load persisted rows (see :meth:`drain_pending`); returns the count loaded."""
+        loaded = 0
+        for row in rows or []:
+            try:
+                conid = int(row.get("conid") or 0)
+                if conid <= 0:
+                    continue
+                contract = Contract(
+                    conId=conid,
+                    symbol=str(row.get("symbol") or ""),
+                    secType=str(row.get("sec_type") or ""),
+                    lastTradeDateOrContractMonth=str(row.get("expiry") or ""),
+                    strike=float(row.get("strike") or 0.0),
+                    right=str(row.get("option_right") or ""),
+                    exchange=str(row.get("exchange") or ""),
+                    currency=str(row.get("currency") or "USD"),
+                    multiplier=str(row.get("multiplier") or ""),
+                    localSymbol=str(row.get("local_symbol") or ""),
+                    tradingClass=str(row.get("trading_class") or ""),
+                )
+            except Exception as exc:
+                logger.debug("Skipping unreadable contract registry row %r: %s", row, exc)
+                continue
+            key = registry_key(
+                row.get("symbol"), row.get("expiry"), row.get("strike"),
+                row.get("option_right"), row.get("sec_type"), row.get("exchange"),
+            )
+            self.store(contract, key=key, persist=False)
+            loaded += 1
+        return loaded
+
+    def drain_pending(self) -> list[dict[str, Any]]:
+        """Return (and clear) rows for contracts stored since the last drain."""
+        rows: list[dict[str, Any]] = []
+        for key, contract in self._pending.items():
+            row = {field: getattr(contract, field, None) for field in _PERSISTED_FIELDS}
+            rows.append({
+                "symbol": key[0],
+                "expiry": key[1],
+                "strike": key[2],
+                "option_right": key[3],
+                "sec_type": key[4],
+                "exchange": key[5],
+                "conid": int(row["conId"] or 0),
+                "currency": row["currency"] or "USD",
+                "multiplier": row["multiplier"] or None,
+                "local_symbol": row["localSymbol"] or None,
+                "trading_class": row["tradingClass"] or None,
+            })
+        self._pending.clear()
+        return rows
+
+    async def qualify(self, contracts: list[Any], *, timeout: float | None = None) -> list[Any | None]:
+        """Qualify *contracts*, asking IB only for registry misses.
+
+        Returns a list aligned with *contracts*; entries that IB could not
+        qualify are ``None``.  IB errors and timeouts propagate to the caller.
+        """
+        results: list[Any | None] = [None] * len(contracts)
+        misses: list[tuple[int, Any]] = []
+        for index, contract in enumerate(contracts):
+            cached = self.lookup(contract)
+            if cached is not None:
+                results[index] = cached
+            else:
+                misses.append((index, contract))
+        self.hits += len(contracts) - len(misses)
+        self.misses += len(misses)
+        if not misses:
+            return results
+
+        request_keys = [contract_key(c) for _, c in misses]
+        call = self._ib_provider().qualifyContractsAsync(*[c for _, c in misses])
+        qualified = await (asyncio.wait_for(call, timeout=timeout) if timeout else call)
+        qualified = list(qualified or [])
+
+        if len(qualified) == len(misses):
+            pairs = zip(misses, request_keys, qualified)
+        else:
+            by_key = {
+                _match_key(contract_key(q)): q
+                for q in qualified
+                if q is not None and int(getattr(q, "conId", 0) or 0) > 0
+            }
+            pairs = zip(misses, request_keys, (by_key.get(_match_key(k)) for k in request_keys))
+
+        for (index, _orig), key, qual in pairs:
+            if qual is None or int(getattr(qual, "conId", 0) or 0) <= 0:
+                continue
+            self.store(qual, key=key)
+            results[index] = qual
+        return results
@@ -0,0 +1,231 @@
+"""desktop/engine/greek_subscriptions.py — Long-lived option Greek streams.
+
+Keeps exactly one streaming ``reqMktData`` ticker per held option conId.
+``IBEngine.refresh_positions`` reconciles the subscription set against the
+current positions (subscribing new legs, cancelling closed ones) and then
+reads Greeks straight from the live tickers, so a steady-state refresh needs
+no market-data requests and no sleeps.  Freshly opened streams are awaited
+with :meth:`GreekSubscriptionManager.wait_for_greeks`, which returns as soon
+as every ticker has usable Greeks instead of sleeping a fixed interval.
+
+Persistent streams never take the last ``reserve_lines`` of the line budget.
+Legs that do not fit are sampled in rotating batches through
+:meth:`GreekSubscriptionManager.sample`, which borrows lines from the reserve
+only for as long as the batch takes to deliver Greeks.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from desktop.engine.market_data_lines import LinePriority, MarketDataLineScheduler
+
+logger = logging.getLogger(__name__)
+
+CONSUMER = "greeks"
+ROTATION_CONSUMER = "greeks_rotation"
+
+_POLL_INTERVAL_S = 0.025
+
+
+def has_model_greeks(ticker: Any) -> bool:
+    """True once IB has delivered a finite model delta for *ticker*."""
+    greeks = getattr(ticker, "modelGreeks", None)
+    delta = getattr(greeks, "delta", None) if greeks is not None else None
+    return isinstance(delta, (int, float)) and math.isfinite(delta)
+
+
+@dataclass
+class GreekCollection:
+    """Outcome of :meth:`GreekSubscriptionManager.wait_for_greeks`."""
+    ready: list[int] = field(default_factory=list)
+    timed_out: list[int] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return not self.timed_out
+
+
+class GreekSubscriptionManager:
+    """Registry of streaming option tickers keyed by conId.
+
+    Lines are held at ``LinePriority.HELD`` through the engine's
+    :class:`MarketDataLineScheduler`, so a held leg that is also shown in the
+    option chain shares one IB subscription.
+    """
+
+    def __init__(
+        self,
+        lines: MarketDataLineScheduler,
+        generic_ticks: str = "100,101,104,106",
+        *,
+        reserve_lines: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._lines = lines
+        self._generic_ticks = generic_ticks
+        self._reserve_lines = max(0, int(reserve_lines))
+        self._clock = clock
+        self._tickers: dict[int, tuple[Any, Any]] = {}
+        self._subscribed_at: dict[int, float] = {}
+        lines.on_evicted(CONSUMER, self._on_evicted)
+
+    def __len__(self) -> int:
+        return len(self._tickers)
+
+    def __contains__(self, conid: object) -> bool:
+        return conid in self._tickers
+
+    @property
+    def conids(self) -> set[int]:
+        return set(self._tickers)
+
+    @property
+    def free_slots(self) -> int:
+        """Persistent streams that can still be opened without touching the reserve.
+
+        Only Greek streams count against the budget here: chain, watchlist and
+        agent lines have lower priority and are evicted by ``acquire`` to make room.
+        """
+        used = self._lines.held_by(CONSUMER, ROTATION_CONSUMER)
+        return max(0, self._lines.budget - self._reserve_lines - used)
+
+    def ticker(self, conid: int) -> Any | None:
+        entry = self._tickers.get(int(conid or 0))
+        return entry[1] if entry else None
+
+    def contract(self, conid: int) -> Any | None:
+        entry = self._tickers.get(int(conid or 0))
+        return entry[0] if entry else None
+
+    def diff(self, conids: Iterable[int]) -> tuple[set[int], set[int]]:
+        """Return ``(to_add, to_drop)`` needed to match the held *conids*."""
+        wanted = {int(c) for c in conids if int(c or 0) > 0}
+        current = set(self._tickers)
+        return wanted - current, current - wanted
+
+    def subscribe(self, contract: Any) -> Any | None:
+        """Open a streaming subscription for *contract* unless one already exists."""
+        conid = int(getattr(contract, "conId", 0) or 0)
+        if conid <= 0:
+            return None
+        existing = self._tickers.get(conid)
+        if existing:
+            return existing[1]
+        if conid not in self._lines and not self.free_slots:
+            return None
+        ticker = self._lines.acquire(contract, CONSUMER, LinePriority.HELD, self._generic_ticks)
+        if ticker is None:
+            logger.debug("No market-data line for greek stream %s", getattr(contract, "localSymbol", "?"))
+            return None
+        self._tickers[conid] = (contract, ticker)
+        self._subscribed_at[conid] = self._clock()
+        return ticker
+
+    async def wait_for_greeks(
+        self,
+        conids: Iterable[int],
+        timeout: float,
+        *,
+        ready: Callable[[Any], bool] = has_model_greeks,
+        deadline: float | None = None,
+        from_now: bool = False,
+    ) -> GreekCollection:
+        """Wait until each stream in *conids* satisfies *ready*, or times out.
+
+        Each contract gets *timeout* seconds from its own subscription time, so
+        streams opened by an earlier batch have been settling while later
+        batches were qualified; with *from_now* the timeout runs from this call
+        instead (a retry pass).  *deadline* (a clock value) caps the whole wait.
+        Returns immediately when everything is already ready.  The number of
+        polls is bounded by *timeout*, so a stalled clock cannot hang the wait.
+        """
+        started = self._clock()
+        timeout = max(0.0, timeout)
+        waiting: dict[int, float] = {}
+        for conid in conids:
+            conid = int(conid or 0)
+            if conid in self._tickers:
+                base = started if from_now else self._subscribed_at.get(conid, started)
+                limit = base + timeout
+                waiting[conid] = min(limit, deadline) if deadline is not None else limit
+        result = GreekCollection()
+        # Short sleeps up to an earlier contract's limit cost one poll each, hence + len(waiting).
+        polls_left = int(timeout / _POLL_INTERVAL_S) + 1 + len(waiting)
+        while waiting:
+            now = self._clock()
+            polls_left -= 1
+            for conid, limit in list(waiting.items()):
+                ticker = self.ticker(conid)
+                if ticker is None:
+                    del waiting[conid]  # evicted / cancelled while waiting
+                    result.timed_out.append(conid)
+                elif ready(ticker):
+                    del waiting[conid]
+                    result.ready.append(conid)
+                elif now >= limit or polls_left <= 0:
+                    del waiting[conid]
+                    result.timed_out.append(conid)
+            if waiting:
+                await asyncio.sleep(min(_POLL_INTERVAL_S, max(0.0, min(waiting.values()) - now)))
+        result.elapsed_s = self._clock() - started
+        return result
+
+    async def sample(
+        self,
+        contracts: Iterable[Any],
+        timeout: float,
+        *,
+        ready: Callable[[Any], bool] = has_model_greeks,
+    ) -> dict[int, Any]:
+        """Stream *contracts* just long enough to read Greeks; returns ``{conId: ticker}``.
+
+        Used for legs that did not fit in the persistent pool.  Lines are released before
+        returning; the tickers keep their last values for the caller to read.
+        """
+        opened: dict[int, Any] = {}
+        for contract in contracts:
+            conid = int(getattr(contract, "conId", 0) or 0)
+            if conid <= 0 or conid in opened:
+                continue
+            ticker = self._lines.acquire(contract, ROTATION_CONSUMER, LinePriority.HELD, self._generic_ticks)
+            if ticker is not None:
+                opened[conid] = ticker
+        try:
+            deadline = self._clock() + max(0.0, timeout)
+            for _ in range(int(max(0.0, timeout) / _POLL_INTERVAL_S) + 1):
+                if all(ready(ticker) for ticker in opened.values()) or self._clock() >= deadline:
+                    break
+                await asyncio.sleep(_POLL_INTERVAL_S)
+        finally:
+            for conid in opened:
+                self._lines.release(conid, ROTATION_CONSUMER)
+        return opened
+
+    def unsubscribe(self, conid: int) -> None:
+        conid = int(conid or 0)
+        self._subscribed_at.pop(conid, None)
+        if self._tickers.pop(conid, None) is not None:
+            self._lines.release(conid, CONSUMER)
+
+    def _on_evicted(self, conid: int) -> None:
+        self._tickers.pop(conid, None)
+        self._subscribed_at.pop(conid, None)
+
+    def retain(self, conids: Iterable[int]) -> set[int]:
+        """Cancel every stream whose conId is not in *conids*; return the dropped ids."""
+        _to_add, to_drop = self.diff(conids)
+        for conid in to_drop:
+            self.unsubscribe(conid)
+        return to_drop
+
+    def cancel_all(self) -> None:
+        """Cancel every active stream (disconnect / reconnect)."""
+        for conid in list(self._tickers):
+            self.unsubscribe(conid)
+        self._tickers.clear()
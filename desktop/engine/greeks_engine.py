@@ -3,6 +3,13 @@ from __future__ import annotations
 import math
 from dataclasses import dataclass
 from datetime import date
+from typing import Sequence
+
+import numpy as np
+
+# Abramowitz & Stegun 7.1.26 coefficients for the vectorised erf (|err| < 1.5e-7).
+_AS_P = 0.3275911
+_AS_A = (0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429)
 
 
 @dataclass(frozen=True)
@@ -15,6 +22,37 @@ class GreeksEstimate:
     source: str = "estimated_bsm"
 
 
+@dataclass(frozen=True)
+class GreeksBatch:
+    """Struct-of-arrays result of :meth:`GreeksEngine.estimate_batch`.
+
+    Rows whose inputs could not be priced have ``valid[i] == False`` and NaN
+    greeks.  ``black76[i]`` marks rows priced with the Black-76 (FOP) model.
+    """
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray
+    vega: np.ndarray
+    iv: np.ndarray
+    valid: np.ndarray
+    black76: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.delta.shape[0])
+
+    def row(self, index: int) -> GreeksEstimate | None:
+        if not bool(self.valid[index]):
+            return None
+        return GreeksEstimate(
+            delta=float(self.delta[index]),
+            gamma=float(self.gamma[index]),
+            theta=float(self.theta[index]),
+            vega=float(self.vega[index]),
+            iv=float(self.iv[index]),
+            source="estimated_black76" if bool(self.black76[index]) else "estimated_bsm",
+        )
+
+
 class GreeksEngine:
     """Local Black-Scholes fallback for missing option Greeks.
 
@@ -24,6 +62,9 @@ class GreeksEngine:
       - `gamma` as unit gamma per contract before scaling
       - `theta` as daily theta
       - `vega` per 1 volatility-point move
+
+    `estimate` prices one contract; `estimate_batch` prices arrays of contracts
+    in a single NumPy pass and uses Black-76 for futures options (FOP).
     """
 
     def __init__(self, risk_free_rate: float = 0.01):
@@ -80,6 +121,89 @@ class GreeksEngine:
         vega = (s * pdf_d1 * sqrt_t) / 100.0
         return GreeksEstimate(delta=delta, gamma=gamma, theta=theta, vega=vega, iv=sigma)
 
+    def estimate_batch(
+        self,
+        *,
+        underlying_price: Sequence[float] | np.ndarray,
+        strike: Sequence[float] | np.ndarray,
+        expiry: Sequence[date | None],
+        right: Sequence[str],
+        iv: Sequence[float] | np.ndarray,
+        sec_type: Sequence[str] | None = None,
+        valuation_date: date | None = None,
+    ) -> GreeksBatch:
+        """Vectorised Black-Scholes / Black-76 greeks for many contracts at once.
+
+        All inputs are aligned by index.  Rows with ``sec_type == "FOP"`` treat
+        ``underlying_price`` as the futures price and use Black-76; everything
+        else uses the same Black-Scholes model as :meth:`estimate`.
+        """
+        s = np.nan_to_num(np.asarray(underlying_price, dtype=float), nan=0.0)
+        k = np.nan_to_num(np.asarray(strike, dtype=float), nan=0.0)
+        sigma = np.nan_to_num(np.asarray(iv, dtype=float), nan=0.0)
+        today = valuation_date or date.today()
+        years_by_expiry: dict[date | None, float] = {}
+        for e in expiry:
+            if e not in years_by_expiry:
+                years_by_expiry[e] = max((e - today).days, 1) / 365.0 if e is not None else 0.0
+        t = np.fromiter((years_by_expiry[e] for e in expiry), dtype=float, count=s.shape[0])
+        is_put = np.fromiter((r in ("P", "p") for r in right), dtype=bool, count=s.shape[0])
+        if sec_type is None:
+            black76 = np.zeros(s.shape, dtype=bool)
+        else:
+            black76 = np.fromiter((st in ("FOP", "fop") for st in sec_type), dtype=bool, count=s.shape[0])
+
+        valid = (s > 0) & (k > 0) & (sigma > 0) & (t > 0)
+        # Substitute harmless values in invalid rows so the math never warns.
+        s_ = np.where(valid, s, 1.0)
+        k_ = np.where(valid, k, 1.0)
+        sig_ = np.where(valid, sigma, 1.0)
+        t_ = np.where(valid, t, 1.0)
+
+        r = self._risk_free_rate
+        sqrt_t = np.sqrt(t_)
+        variance_term = sig_ * sqrt_t
+        carry = np.where(black76, 0.0, r)
+        d1 = (np.log(s_ / k_) + (carry + 0.5 * sig_ * sig_) * t_) / variance_term
+        d2 = d1 - variance_term
+        pdf_d1 = np.exp(-0.5 * d1 * d1) / math.sqrt(2.0 * math.pi)
+        cdf_d1 = self._norm_cdf_array(d1)
+        cdf_d2 = self._norm_cdf_array(d2)
+        discount = np.exp(-r * t_)
+
+        # Black-Scholes (spot underlying).
+        bs_delta = np.where(is_put, cdf_d1 - 1.0, cdf_d1)
+        bs_decay = -(s_ * pdf_d1 * sig_) / (2.0 * sqrt_t)
+        bs_theta = np.where(
+            is_put,
+            bs_decay + r * k_ * discount * (1.0 - cdf_d2),
+            bs_decay - r * k_ * discount * cdf_d2,
+        ) / 365.0
+        bs_gamma = pdf_d1 / (s_ * variance_term)
+        bs_vega = (s_ * pdf_d1 * sqrt_t) / 100.0
+
+        # Black-76 (futures underlying): every term is discounted.
+        b76_delta = discount * np.where(is_put, cdf_d1 - 1.0, cdf_d1)
+        b76_decay = -(s_ * discount * pdf_d1 * sig_) / (2.0 * sqrt_t)
+        b76_theta = np.where(
+            is_put,
+            b76_decay - r * s_ * discount * (1.0 - cdf_d1) + r * k_ * discount * (1.0 - cdf_d2),
+            b76_decay + r * s_ * discount * cdf_d1 - r * k_ * discount * cdf_d2,
+        ) / 365.0
+        b76_gamma = discount * bs_gamma
+        b76_vega = discount * bs_vega
+
+        nan = np.nan
+        return GreeksBatch(
+            delta=np.where(valid, np.where(black76, b76_delta, bs_delta), nan),
+            gamma=np.where(valid, np.where(black76, b76_gamma, bs_gamma), nan),
+            theta=np.where(valid, np.where(black76, b76_theta, bs_theta), nan),
+            vega=np.where(valid, np.where(black76, b76_vega, bs_vega), nan),
+            iv=np.where(valid, sigma, nan),
+            valid=valid,
+            black76=black76,
+        )
+
     @staticmethod
     def _time_to_expiry(expiry: date | None, valuation_date: date | None = None) -> float:
         if expiry is None:
@@ -94,4 +218,12 @@ class GreeksEngine:
 
     @staticmethod
     def _norm_cdf(x: float) -> float:
-        return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
\ No newline at end of file
+        return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+    @staticmethod
+    def _norm_cdf_array(x: np.ndarray) -> np.ndarray:
+        z = np.abs(x) / math.sqrt(2.0)
+        u = 1.0 / (1.0 + _AS_P * z)
+        a1, a2, a3, a4, a5 = _AS_A
+        erf = 1.0 - (((((a5 * u + a4) * u) + a3) * u + a2) * u + a1) * u * np.exp(-z * z)
+        return 0.5 * (1.0 + np.sign(x) * erf)
@@ -35,8 +35,17 @@ from ib_async import IB, Contract, FuturesOption, Option, Stock, Future, MarketO
 import time as _time_mod  # for cache TTL checks
 from PySide6.QtCore import QObject, Signal
 
-from desktop.db.database import Database
+from desktop.db.database import Database, SnapshotRetention
+from desktop.engine.bounded_cache import BoundedCache
+from desktop.engine.compute import ComputeExecutor, compute_portfolio
+from desktop.engine.contract_registry import ContractRegistry
+from desktop.engine.greek_subscriptions import GreekSubscriptionManager
 from desktop.engine.greeks_engine import GreeksEngine
+from desktop.engine.iv_surface import IVSurface
+from desktop.engine.market_data_lines import LinePriority, MarketDataLineScheduler
+from desktop.engine.perf_timing import PerfRecorder, PerfRun
+from desktop.engine.reference_prices import CORE_REFERENCE_SYMBOLS, ReferencePriceService, ReferenceQuote
+from desktop.engine.write_behind import CoalescingWriter
 from desktop.models.strategy_reconstructor import StrategyGroup, StrategyReconstructor
 
 logger = logging.getLogger(__name__)
@@ -62,6 +71,18 @@ _FUT_SPX_MULTIPLIERS: dict[str, float] = {
     "SP":  250.0,  # Full-size S&P 500 (legacy)
 }  # Add more as needed; unknown symbols default to 0 (not SPX-correlated)
 
+# ── Futures root → listing exchange (used when IB does not supply one) ────
+_FUT_EXCHANGES: dict[str, str] = {
+    "ES": "CME",  "MES": "CME", "NQ": "CME",  "MNQ": "CME",
+    "RTY": "CME", "M2K": "CME", "SP": "CME",
+    "YM": "CBOT", "MYM": "CBOT",
+    "GC": "COMEX", "MGC": "COMEX", "SI": "COMEX", "HG": "COMEX",
+    "CL": "NYMEX", "QM": "NYMEX", "NG": "NYMEX", "PL": "NYMEX",
+    "ZB": "CBOT",  "ZN": "CBOT",  "ZF": "CBOT", "ZT": "CBOT",
+    "ZC": "CBOT",  "ZS": "CBOT",  "ZW": "CBOT",
+    "6E": "CME",  "6B": "CME",  "6J": "CME", "6A": "CME", "6C": "CME",
+}  # Unknown roots default to CME
+
 
 # ── Data containers emitted via signals ───────────────────────────────────
 
@@ -187,11 +208,14 @@ class IBEngine(QObject):
     positions_updated = Signal(list)                    # list[PositionRow]
     account_updated   = Signal(object)                  # AccountSummary
     risk_updated      = Signal(object)                  # PortfolioRiskSummary
+    strategies_updated = Signal(list)                   # list[StrategyGroup]
     chain_ready       = Signal(list)                    # list[ChainRow]
     order_filled      = Signal(dict)                    # fill details
     order_status      = Signal(dict)                    # status update
     orders_updated    = Signal(list)                    # list[OpenOrder]
     market_snapshot   = Signal(object)                  # MarketSnapshot
+    chain_ticks       = Signal(list)                    # list[int] conIds with fresh chain quotes
+    perf_updated      = Signal(str)                     # operation name with a new timing run
     error_occurred    = Signal(str)                     # error message
     connection_state  = Signal(str, str)                # state, detail
 
@@ -230,35 +254,122 @@ class IBEngine(QObject):
         # _expiry_cache: TTL 604800s (1 week) for available expirations.  Cleared on reconnect.
         # _strike_skeleton_cache: TTL 604800s (1 week) for strike contract specs w/o live prices.
         # _chain_cache: TTL 3600s (1 hour) for full chain with live prices. Cleared on reconnect.
-        self._expiry_cache: dict[str, tuple[float, list]] = {}   # key → (ts, [expiry strings])
-        self._strike_skeleton_cache: dict[str, tuple[float, list]] = {}   # key → (ts, [ChainRow skeletons])
-        self._chain_cache:  dict[str, tuple[float, list]] = {}   # key → (ts, [ChainRow w/ prices])
+        # All caches are LRU-bounded (bytes or entries, IB_*_CACHE_* env vars) so memory
+        # stays flat over multi-day sessions; see cache_stats().
+        _mb = 1024 * 1024
+        self._expiry_cache: BoundedCache = BoundedCache(   # key → (ts, [expiry strings])
+            "expiries",
+            max_entries=int(os.getenv("IB_EXPIRY_CACHE_MAX_ENTRIES", "256")),
+            ttl_s=604800,
+        )
+        self._strike_skeleton_cache: BoundedCache = BoundedCache(   # key → (ts, [ChainRow skeletons])
+            "chain_skeletons",
+            max_bytes=int(float(os.getenv("IB_SKELETON_CACHE_MAX_MB", "32")) * _mb),
+            max_entries=int(os.getenv("IB_SKELETON_CACHE_MAX_ENTRIES", "0")) or None,
+            ttl_s=604800,
+        )
+        self._chain_cache: BoundedCache = BoundedCache(   # key → (ts, [ChainRow w/ prices])
+            "chains",
+            max_bytes=int(float(os.getenv("IB_CHAIN_CACHE_MAX_MB", "32")) * _mb),
+            max_entries=int(os.getenv("IB_CHAIN_CACHE_MAX_ENTRIES", "0")) or None,
+            ttl_s=3600,
+        )
+        # ── Market-data line budget ──
+        # Every streaming reqMktData goes through this scheduler: tickers are shared
+        # per conId, and lower-priority lines (held > chain > watchlist > agents)
+        # are evicted when the session nears IB's concurrent-line cap.
+        self._lines = MarketDataLineScheduler(
+            lambda: self._ib,
+            max_lines=int(os.getenv("IB_MAX_MARKET_DATA_LINES", "100")),
+            headroom=int(os.getenv("IB_MARKET_DATA_LINE_HEADROOM", "5")),
+        )
+        self._lines.on_evicted("chain", self._on_chain_line_evicted)
+        self._lines.on_evicted("watchlist", self._on_watch_line_evicted)
         # ── Streaming subscriptions for live chain prices ──
         # conid → ib_async Ticker; cancelled when chain tab hidden / symbol changes
         self._chain_tickers: dict[int, Any] = {}
+        # (symbol, sec_type, exchange) → (contract, ticker) for the market tab watchlist
+        self._watch_tickers: dict[tuple[str, str, str], tuple[Any, Any]] = {}
+        # option_chain_cache persistence (coalesced per contract, bulk-written)
+        self._chain_cache_writer = CoalescingWriter(
+            "option_chain_cache",
+            self._write_chain_cache_rows,
+            delay_s=max(0.0, float(os.getenv("IB_CHAIN_CACHE_FLUSH_MS", "500")) / 1000.0),
+        )
+        # ── Stage timings (ring buffer; optional perf_events persistence) ──
+        self._perf = PerfRecorder(capacity=int(os.getenv("IB_PERF_RING_SIZE", "200")))
+        self._perf_events_db = os.getenv("IB_PERF_EVENTS_DB", "0").strip().lower() in {"1", "true", "yes", "on"}
+        self._perf_event_writer = CoalescingWriter("perf_events", self._write_perf_events, delay_s=5.0)
+        # refresh_positions results (latest snapshot per account, one transaction per flush)
+        self._refresh_writer = CoalescingWriter(
+            "refresh_snapshot",
+            self._write_refresh_snapshots,
+            delay_s=max(0.0, float(os.getenv("IB_REFRESH_PERSIST_DELAY_MS", "250")) / 1000.0),
+        )
+        # positions_cache retention: periodic thinning / partition drops while the DB is up
+        self._positions_cache_retention = SnapshotRetention.from_env()
+        self._cache_compaction_interval_s = max(60.0, float(os.getenv("IB_POSITIONS_CACHE_COMPACT_INTERVAL_S", "3600")))
+        self._cache_compaction_task: asyncio.Task | None = None
+        self._last_cache_compaction: dict[str, Any] | None = None
+        # Chain conIds ticked since the last flush; pendingTickersEvent bursts are
+        # coalesced into one chain_ticks emission per UI frame.
+        self._pending_chain_conids: set[int] = set()
+        self._chain_flush_handle: asyncio.TimerHandle | None = None
+        self._chain_tick_coalesce_s = max(0.0, float(os.getenv("IB_CHAIN_TICK_COALESCE_MS", "16")) / 1000.0)
         # ── Positions snapshot (refreshed on every portfolio update) ──
         # Used to supplement chain expiry picker with expiries from live positions
         self._positions_snapshot: list = []
         self._strategy_snapshot: list[StrategyGroup] = []
+        # Last emitted risk summary / open orders, so lazily built tabs can catch up
+        self._risk_snapshot: PortfolioRiskSummary | None = None
+        self._open_orders_snapshot: list[OpenOrder] = []
+        # Caches leg→group structure between refreshes; only Greeks are re-aggregated
+        self._strategy_reconstructor = StrategyReconstructor()
+        # Risk aggregation + reconstruction run here, off the qasync/GUI loop
+        self._compute = ComputeExecutor()
         # ── Latest account summary + market snapshots for agent workers ──
         self._last_account_summary = None
         self._market_snapshots: dict[str, dict] = {}
+        self._market_snapshot_events: dict[str, MarketSnapshot] = {}
         # ── Last-seen price cache: symbol.upper() → float
         # Populated from every price source so WhatIf/submit never see 0.0 ──
-        self._last_price_cache: dict[str, float] = {}
+        self._last_price_cache: BoundedCache = BoundedCache(
+            "last_prices", max_entries=int(os.getenv("IB_PRICE_CACHE_MAX_ENTRIES", "2000")),
+        )
         # ── Persistent option greeks cache: conId → greek dict
         # Keeps the last known non-empty greeks so positions that temporarily
         # fail to get live data (e.g. stock options, pre/post market) still
         # show sensible values rather than going blank.
-        self._greeks_cache: dict[int, dict] = {}
+        self._greeks_cache: BoundedCache = BoundedCache(
+            "greeks", max_entries=int(os.getenv("IB_GREEKS_CACHE_MAX_ENTRIES", "20000")),
+        )
         # Additional signature-keyed cache for cases where conId is missing/unstable.
         self._greeks_cache_by_contract: dict[tuple[str, str, float, str, str], dict[str, float | None]] = {}
+        # Per-underlying IV surfaces (symbol.upper() → IVSurface), fed by chain and
+        # position tickers; used to interpolate IV for legs that have none.
+        self._iv_surfaces: dict[str, IVSurface] = {}
         # Monotonic timestamp of the last *live* option greek fetch cycle.
         # Used to avoid re-requesting all option greeks too frequently.
         self._last_live_greeks_refresh_monotonic: float | None = None
-        # Track active option greek streaming subscriptions so they can be
-        # force-cancelled on disconnect/reconnect and never accumulate.
-        self._greek_tickers: dict[int, Any] = {}
+        # Long-lived option greek streams: one ticker per held option conId.
+        # Reconciled against positions on each live cycle and force-cancelled
+        # on disconnect/reconnect so they never accumulate.  IB_GREEKS_ROTATION_LINES
+        # lines stay out of the persistent pool so legs beyond it can rotate.
+        self._greek_rotation_lines = max(1, int(os.getenv("IB_GREEKS_ROTATION_LINES", "20")))
+        self._greek_streams = GreekSubscriptionManager(
+            self._lines,
+            os.getenv("IB_GREEKS_GENERIC_TICKS", "100,101,104,106"),
+            reserve_lines=min(self._greek_rotation_lines, self._lines.budget - 1),
+        )
+        # Qualified contracts keyed by (symbol, expiry, strike, right, secType, exchange);
+        # consulted before every qualifyContractsAsync and persisted to contract_registry.
+        self._contracts = ContractRegistry(lambda: self._ib)
+        # Always-on SPY/SPX/ES/VIX (+ held underlyings) streams; replaces per-refresh snapshots.
+        self._reference_prices = ReferencePriceService(self._lines, self._resolve_reference_contract)
+        self._reference_wait_s = max(0.0, float(os.getenv("IB_REFERENCE_PRICE_WAIT_SECONDS", "1.0")))
+        self._last_spx_proxy_price: float | None = None
+        # Futures root → exchange reported by held FOP positions (e.g. ZN → CBOT).
+        self._future_exchanges: dict[str, str] = {}
         
         # ── Track last data source for UI status indicators ──
         self._last_expiry_source: str = "unknown"  # "live", "memory", "database", or "unknown"
@@ -268,6 +379,7 @@ class IBEngine(QObject):
         self._ib.disconnectedEvent += self._on_ib_disconnected
         self._ib.errorEvent += self._on_ib_error
         self._ib.orderStatusEvent += self._on_order_status
+        self._ib.pendingTickersEvent += self._on_pending_tickers
 
     # ── lifecycle ─────────────────────────────────────────────────────────
 
@@ -283,6 +395,14 @@ class IBEngine(QObject):
         except Exception as exc:
             self._db_ok = False
             logger.warning("Database unavailable (continuing without): %s", exc)
+        if self._db_ok:
+            try:
+                warmed = self._contracts.warm(await self._db.load_contract_registry())
+                logger.info("Contract registry warmed with %d qualified contracts", warmed)
+            except Exception as exc:
+                logger.debug("Contract registry warm-up failed: %s", exc)
+            if self._cache_compaction_task is None or self._cache_compaction_task.done():
+                self._cache_compaction_task = asyncio.get_running_loop().create_task(self._run_cache_compaction())
 
         logger.info("Connecting to IB at %s:%d clientId=%d …", self._host, self._port, self._client_id)
         await self._ib.connectAsync(self._host, self._port, clientId=self._client_id, timeout=30)
@@ -292,6 +412,7 @@ class IBEngine(QObject):
         # IBKR-only greeks mode: do not preload any DB greek cache for portfolio calculations.
         self._greeks_cache.clear()
         self._greeks_cache_by_contract.clear()
+        self._iv_surfaces.clear()
         self._last_live_greeks_refresh_monotonic = None
         
         logger.info("IB connected — account %s", self._account_id)
@@ -304,15 +425,12 @@ class IBEngine(QObject):
         if self._reconnect_task and not self._reconnect_task.done():
             self._reconnect_task.cancel()
             self._reconnect_task = None
-        # ── Cancel all live chain market-data subscriptions ──────────────
-        for _conid, (c, _t) in list(getattr(self, "_chain_tickers", {}).items()):
-            try:
-                self._ib.cancelMktData(c)
-            except Exception:
-                pass
-        if hasattr(self, "_chain_tickers"):
-            self._chain_tickers.clear()
+        # ── Cancel all live market-data subscriptions ────────────────────
+        self._chain_tickers.clear()
+        self._watch_tickers.clear()
         self._cancel_greek_streaming()
+        self._reference_prices.cancel_all()
+        self._lines.cancel_all()
         # ── Cancel any pending reqSecDefOptParams / reqContractDetails ───
         # ib_async tracks these internally; calling cancelSecDefOptParams is
         # not needed — just let the IB object handle cleanup on disconnect.
@@ -328,12 +446,20 @@ class IBEngine(QObject):
             self._expiry_cache.clear()
         if hasattr(self, "_strike_skeleton_cache"):
             self._strike_skeleton_cache.clear()
+        if self._cache_compaction_task and not self._cache_compaction_task.done():
+            self._cache_compaction_task.cancel()
+        self._cache_compaction_task = None
         if self._db_ok:
+            await self._refresh_writer.close()
+            await self._chain_cache_writer.close()
+            await self._perf_event_writer.close()
             try:
                 await self._db.close()
             except Exception:
                 pass
             self._db_ok = False
+        # Stop the compute worker; run() starts a fresh one after a reconnect.
+        self._compute.shutdown()
         if not self._ib.isConnected():
             self.connection_state.emit("disconnected", "Disconnected from IBKR")
             self.disconnected.emit()
@@ -354,6 +480,14 @@ class IBEngine(QObject):
         """Return the latest reconstructed strategy groups."""
         return list(self._strategy_snapshot)
 
+    def risk_snapshot(self) -> PortfolioRiskSummary | None:
+        """Return the last emitted PortfolioRiskSummary, or None before the first refresh."""
+        return self._risk_snapshot
+
+    def open_orders_snapshot(self) -> list[OpenOrder]:
+        """Return the open orders from the last ``get_open_orders`` call."""
+        return list(self._open_orders_snapshot)
+
     def account_snapshot(self) -> "AccountSummary | None":
         """Return the last fetched AccountSummary, or None if not yet available."""
         return getattr(self, "_last_account_summary", None)
@@ -370,13 +504,24 @@ class IBEngine(QObject):
         """Return the cached market data dict for *symbol* if available."""
         return (getattr(self, "_market_snapshots", {}) or {}).get(symbol.upper())
 
+    def market_snapshots(self) -> list[MarketSnapshot]:
+        """Return the last emitted MarketSnapshot for every quoted symbol."""
+        return list(self._market_snapshot_events.values())
+
+    def reference_quote(self, symbol: str) -> ReferenceQuote | None:
+        """Return the live streamed quote for a reference symbol (SPY/SPX/ES/VIX or held underlying)."""
+        return self._reference_prices.quote(symbol)
+
     def last_price(self, symbol: str) -> float | None:
         """Return the best-known last price for *symbol* from any data source.
 
-        Sources polled in order: last_price_cache → market_snapshots.
+        Sources polled in order: reference streams → last_price_cache → market_snapshots.
         Returns None if no price has ever been seen.
         """
         sym = symbol.upper()
+        streamed = self._reference_prices.price(sym)
+        if streamed:
+            return streamed
         cached = (getattr(self, "_last_price_cache", {}) or {}).get(sym)
         if cached and cached > 0:
             return cached
@@ -389,24 +534,179 @@ class IBEngine(QObject):
 
     # ── helpers ───────────────────────────────────────────────────────────
 
-    def _register_greek_ticker(self, contract: Any, ticker: Any) -> None:
-        conid = int(getattr(contract, "conId", 0) or 0)
-        if conid > 0:
-            self._greek_tickers[conid] = (contract, ticker)
+    async def _qualify_contracts(self, contracts: list[Any], *, timeout: float | None = None) -> list[Any | None]:
+        """Qualify *contracts* through the registry; only misses reach IB.
 
-    def _forget_greek_ticker(self, contract: Any) -> None:
-        conid = int(getattr(contract, "conId", 0) or 0)
-        if conid > 0:
-            self._greek_tickers.pop(conid, None)
+        Returns a list aligned with *contracts* (``None`` where IB could not
+        qualify).  Newly qualified contracts are persisted in the background.
+        """
+        results = await self._contracts.qualify(contracts, timeout=timeout)
+        self._persist_contract_registry()
+        return results
+
+    def _persist_contract_registry(self) -> None:
+        if not self._db_ok:
+            return
+        rows = self._contracts.drain_pending()
+        if not rows:
+            return
+
+        async def _store() -> None:
+            try:
+                await self._db.store_contract_registry(rows)
+            except Exception as exc:
+                logger.debug("Failed to persist %d contract registry rows: %s", len(rows), exc)
+
+        try:
+            asyncio.get_running_loop().create_task(_store())
+        except RuntimeError:
+            pass
 
     def _cancel_greek_streaming(self) -> None:
         """Cancel any active option-greek streaming subscriptions."""
-        for _conid, (contract, _ticker) in list(self._greek_tickers.items()):
+        self._greek_streams.cancel_all()
+
+    async def _sync_greek_subscriptions(
+        self,
+        option_positions: list[Any],
+        batch_size: int,
+        *,
+        settle_timeout: float = 0.0,
+    ) -> list[int]:
+        """Reconcile long-lived greek streams with the held option legs.
+
+        Cancels streams for legs no longer held and subscribes legs that are new
+        since the last sweep.  New contracts are qualified in batches first:
+        IB position contracts are sometimes not fully qualified, which hurts
+        modelGreeks availability.  Batches are pipelined: up to
+        ``IB_GREEKS_BATCHES_IN_FLIGHT`` qualify concurrently, each batch is
+        subscribed as soon as it qualifies, and while it settles (up to
+        *settle_timeout*) the next batch is already qualifying.  Greeks are
+        merged into ``_greeks_cache_by_contract`` as each batch lands.
+        Returns the conIds that were newly subscribed.
+        """
+        held: dict[int, Any] = {}
+        for p in option_positions:
+            conid = int(getattr(p.contract, "conId", 0) or 0)
+            if conid > 0:
+                held[conid] = p.contract
+        dropped = self._greek_streams.retain(held)
+        to_add, _ = self._greek_streams.diff(held)
+        if dropped:
+            logger.info("Cancelled %d greek streams for closed positions", len(dropped))
+        if not to_add:
+            return []
+
+        # Largest legs get the persistent lines; the rest rotate (_rotate_overflow_greeks).
+        size_by_conid = {
+            int(getattr(p.contract, "conId", 0) or 0): abs(float(getattr(p, "position", 0.0) or 0.0))
+            for p in option_positions
+        }
+        ordered = sorted(to_add, key=lambda conid: size_by_conid.get(conid, 0.0), reverse=True)
+        pending = [held[conid] for conid in ordered[:self._greek_streams.free_slots]]
+        if not pending:
+            return []
+        batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        # pending is already capped at free_slots, so in-flight batches cannot overrun the budget.
+        in_flight = max(1, int(os.getenv("IB_GREEKS_BATCHES_IN_FLIGHT", "3")))
+        qualify_slots = asyncio.Semaphore(in_flight)
+        added: list[int] = []
+
+        async def _run_batch(batch: list[Any]) -> None:
+            qualified_by_conid: dict[int, Any] = {}
+            async with qualify_slots:
+                try:
+                    qualified = await self._qualify_contracts(batch, timeout=12)
+                    for qc in qualified:
+                        if qc is None:
+                            continue
+                        qid = int(getattr(qc, "conId", 0) or 0)
+                        if qid > 0:
+                            qualified_by_conid[qid] = qc
+                except Exception as exc:
+                    logger.debug("Greek contract qualification failed for batch: %s", exc)
+            # Slot released: the next batch qualifies while this one streams.
+            batch_added: list[int] = []
+            for orig_contract in batch:
+                conid = int(getattr(orig_contract, "conId", 0) or 0)
+                contract = qualified_by_conid.get(conid, orig_contract)
+                if self._greek_streams.subscribe(contract) is not None:
+                    batch_added.append(conid)
+            added.extend(batch_added)
+            if settle_timeout > 0 and batch_added:
+                collected = await self._greek_streams.wait_for_greeks(
+                    batch_added, settle_timeout, ready=self._ticker_has_greeks,
+                )
+                self._merge_streamed_greeks(collected.ready)
+
+        await asyncio.gather(*[_run_batch(batch) for batch in batches])
+        logger.info(
+            "Subscribed %d new greek streams (%d active, %d batch(es), %d in flight)",
+            len(added), len(self._greek_streams), len(batches), in_flight,
+        )
+        return added
+
+    async def _rotate_overflow_greeks(
+        self,
+        option_positions: list[Any],
+        batch_size: int,
+        wait_s: float,
+    ) -> dict[int, dict[str, float | None]]:
+        """Sample Greeks for held legs that have no persistent stream.
+
+        Legs that did not fit in the persistent pool are streamed in batches of at
+        most ``IB_GREEKS_ROTATION_LINES``, read once settled (or after *wait_s*)
+        and released, so every leg still gets live Greeks on each live cycle.
+        """
+        overflow = [
+            p.contract for p in option_positions
+            if int(getattr(p.contract, "conId", 0) or 0) > 0
+            and int(p.contract.conId) not in self._greek_streams
+        ]
+        if not overflow:
+            return {}
+        step = max(1, min(batch_size, self._greek_rotation_lines))
+        sampled: dict[int, dict[str, float | None]] = {}
+        for start in range(0, len(overflow), step):
+            batch = overflow[start:start + step]
             try:
-                self._ib.cancelMktData(contract)
-            except Exception:
-                pass
-        self._greek_tickers.clear()
+                qualified = [qc for qc in await self._qualify_contracts(batch, timeout=12) if qc is not None]
+            except Exception as exc:
+                logger.debug("Greek contract qualification failed for rotation batch: %s", exc)
+                qualified = []
+            by_conid = {int(getattr(qc, "conId", 0) or 0): qc for qc in qualified}
+            contracts = [by_conid.get(int(c.conId), c) for c in batch]
+            tickers = await self._greek_streams.sample(contracts, wait_s, ready=self._ticker_has_greeks)
+            for contract in contracts:
+                ticker = tickers.get(int(contract.conId))
+                if ticker is None:
+                    continue
+                g = self._extract_option_greeks_from_ticker(ticker)
+                sampled[int(contract.conId)] = g
+                self._record_iv(
+                    getattr(contract, "symbol", ""),
+                    getattr(contract, "lastTradeDateOrContractMonth", ""),
+                    getattr(contract, "strike", 0.0),
+                    g.get("iv"),
+                )
+                if any(g.get(k) is not None for k in ("delta", "gamma", "theta", "vega")):
+                    self._greeks_cache_by_contract[_option_signature(contract)] = g
+        logger.info(
+            "Rotated %d option legs beyond the %d persistent greek streams",
+            len(overflow), len(self._greek_streams),
+        )
+        return sampled
+
+    def _merge_streamed_greeks(self, conids: list[int]) -> None:
+        """Copy streamed Greeks for *conids* into the signature-keyed cache."""
+        for conid in conids:
+            ticker = self._greek_streams.ticker(conid)
+            contract = self._greek_streams.contract(conid)
+            if ticker is None or contract is None:
+                continue
+            g = self._extract_option_greeks_from_ticker(ticker)
+            if any(g.get(k) is not None for k in ("delta", "gamma", "theta", "vega")):
+                self._greeks_cache_by_contract[_option_signature(contract)] = g
 
     async def _qualify_underlying(self, symbol: str, sec_type: str, exchange: str) -> Contract:
         """Resolve an underlying contract, handling ambiguous FUT via reqContractDetails."""
@@ -437,8 +737,8 @@ class IBEngine(QObject):
                 und = Index(symbol=symbol.upper(), exchange="CBOE" if symbol.upper() in ("SPX", "VIX") else "SMART", currency="USD")
             else:
                 und = Stock(symbol=symbol, exchange=exchange or "SMART", currency="USD")
-            qualified = await self._ib.qualifyContractsAsync(und)
-            if not qualified or not qualified[0].conId:
+            qualified = await self._qualify_contracts([und])
+            if not qualified or qualified[0] is None or not qualified[0].conId:
                 raise ValueError(f"Cannot qualify contract: {symbol} {sec_type} {exchange}")
             return qualified[0]
 
@@ -485,19 +785,24 @@ class IBEngine(QObject):
     async def refresh_positions(self) -> list[PositionRow]:
         """Fetch live positions + PnL + Greeks from IB, persist to DB, emit signal.
 
-        Uses reqPnLSingle for per-position P&L and reqMktData snapshots for Greeks.
+        Uses portfolio items for per-position P&L and long-lived streaming
+        tickers (see ``GreekSubscriptionManager``) for option Greeks.
         """
         async with self._refresh_positions_lock:
+            run = self._perf.start("refresh_positions")
             ib_positions = self._ib.positions()
             rows: list[dict[str, Any]] = []
             result: list[PositionRow] = []
             spx_proxy_price = await self._spx_proxy_price_async()
             if spx_proxy_price and float(spx_proxy_price) > 0:
                 self._last_spx_proxy_price = float(spx_proxy_price)
+            run.lap("spx_proxy")
 
             # Gather dynamic betas
             unique_stocks = {p.contract.symbol for p in ib_positions if p.contract.secType in ("STK", "OPT", "FOP", "FUT")}
             await asyncio.gather(*[self._fetch_dynamic_beta(s) for s in unique_stocks])
+            run.lap("betas")
+            run.count("positions", len(ib_positions))
 
             # ── Step 1: Request portfolio PnL to get unrealized/realized PnL per contract
             portfolio_items = self._ib.portfolio(self._account_id) if self._account_id else []
@@ -517,7 +822,7 @@ class IBEngine(QObject):
                 if not c.exchange:
                     c.exchange = self._infer_exchange(c)
 
-            # ── Step 2: Request Greeks for option positions via batched streaming
+            # ── Step 2: Read Greeks for option positions from persistent streams
             option_positions = [
                 p for p in ib_positions
                 if p.contract.secType in ("OPT", "FOP")
@@ -532,17 +837,30 @@ class IBEngine(QObject):
                     continue
                 if getattr(p.contract, "secType", "") == "FOP":
                     option_underlyings[sym] = "FUT"
+                    if getattr(p.contract, "exchange", ""):
+                        self._future_exchanges[sym] = str(p.contract.exchange).upper()
                 else:
                     option_underlyings.setdefault(sym, "STK")
 
+            run.lap("portfolio_pnl")
+            if option_underlyings:
+                self._reference_prices.retain(option_underlyings)
+                added = await self._reference_prices.ensure(option_underlyings)
+                if added:
+                    run.count("reference_streams_opened", len(added))
+                    await self._reference_prices.wait_for(added, timeout=self._reference_wait_s)
+            run.lap("reference_streams")
+
             async def _prefetch_underlying_price(sym: str, und_sec_type: str) -> None:
+                # Streams cover the steady state; snapshot only symbols that cannot stream.
                 if self.last_price(sym):
                     return
+                run.count("underlying_snapshots")
                 try:
                     snap = await self.get_market_snapshot(
                         sym,
                         sec_type=und_sec_type,
-                        exchange="CME" if und_sec_type == "FUT" else "SMART",
+                        exchange=self._underlying_exchange(sym, und_sec_type),
                     )
                     best = snap.last or snap.bid or snap.ask or snap.close
                     if best and best > 0:
@@ -555,86 +873,35 @@ class IBEngine(QObject):
                     _prefetch_underlying_price(sym, und_type)
                     for sym, und_type in option_underlyings.items()
                 ])
+            run.lap("underlying_prefetch")
 
-            def _option_signature(contract: Any) -> tuple[str, str, float, str, str]:
-                expiry_raw = str(getattr(contract, "lastTradeDateOrContractMonth", "") or "").replace("-", "")[:8]
-                return (
-                    str(getattr(contract, "symbol", "") or "").upper(),
-                    expiry_raw,
-                    round(float(getattr(contract, "strike", 0.0) or 0.0), 4),
-                    str(getattr(contract, "right", "") or "").upper(),
-                    str(getattr(contract, "secType", "") or "").upper(),
-                )
-            greeks_generic_ticks = os.getenv("IB_GREEKS_GENERIC_TICKS", "100,101,104,106")
             batch_size = max(5, int(os.getenv("IB_GREEKS_BATCH_SIZE", "40")))
             batch_wait_s = max(0.5, float(os.getenv("IB_GREEKS_BATCH_WAIT_SECONDS", "1.8")))
-            retry_batch_size = max(5, int(os.getenv("IB_GREEKS_RETRY_BATCH_SIZE", "20")))
             retry_wait_s = max(0.5, float(os.getenv("IB_GREEKS_RETRY_WAIT_SECONDS", "1.2")))
             retry_max_contracts = max(0, int(os.getenv("IB_GREEKS_RETRY_MAX_CONTRACTS", "0")))
             greeks_refresh_seconds = max(10.0, float(os.getenv("IB_GREEKS_REFRESH_SECONDS", "60")))
 
-            async def collect_batch(batch_positions: list[Any], wait_s: float) -> dict[int, dict[str, float | None]]:
-                batch_greeks: dict[int, dict[str, float | None]] = {}
-                active_tickers: list[tuple[Any, Any]] = []
-                # IB position contracts are sometimes not fully qualified for greek snapshots.
-                # Qualify in batch first to improve modelGreeks availability.
-                contract_by_conid: dict[int, Any] = {
-                    int(getattr(p.contract, "conId", 0) or 0): p.contract for p in batch_positions
-                }
-                qualified_by_conid: dict[int, Any] = {}
-                try:
-                    qualified = await asyncio.wait_for(
-                        self._ib.qualifyContractsAsync(*list(contract_by_conid.values())),
-                        timeout=12,
+            def read_streamed_greeks(positions: list[Any]) -> dict[int, dict[str, float | None]]:
+                """Read greeks from the live streams; no IB requests, no waiting."""
+                streamed: dict[int, dict[str, float | None]] = {}
+                for p in positions:
+                    conid = int(getattr(p.contract, "conId", 0) or 0)
+                    ticker = self._greek_streams.ticker(conid)
+                    if ticker is None:
+                        continue
+                    g = self._extract_option_greeks_from_ticker(ticker)
+                    streamed[conid] = g
+                    self._record_iv(
+                        getattr(p.contract, "symbol", ""),
+                        getattr(p.contract, "lastTradeDateOrContractMonth", ""),
+                        getattr(p.contract, "strike", 0.0),
+                        g.get("iv"),
                     )
-                    for qc in qualified or []:
-                        if qc is None:
-                            continue
-                        qid = int(getattr(qc, "conId", 0) or 0)
-                        if qid > 0:
-                            qualified_by_conid[qid] = qc
-                except Exception as exc:
-                    logger.debug("Greek contract qualification failed for batch: %s", exc)
-
-                for batch_pos in batch_positions:
-                    orig_contract = batch_pos.contract
-                    contract = qualified_by_conid.get(int(getattr(orig_contract, "conId", 0) or 0), orig_contract)
-                    try:
-                        # Use streaming subscriptions for options; modelGreeks are often more
-                        # reliable here than snapshot mode for IBKR option contracts.
-                        ticker = self._ib.reqMktData(
-                            contract,
-                            genericTickList=greeks_generic_ticks,
-                            snapshot=False,
-                            regulatorySnapshot=False,
-                        )
-                        self._register_greek_ticker(contract, ticker)
-                        active_tickers.append((contract, ticker))
-                    except Exception as exc:
-                        logger.debug("Greeks request failed for %s: %s", getattr(contract, "localSymbol", "?"), exc)
-
-                try:
-                    if active_tickers:
-                        await asyncio.sleep(wait_s)
-
-                    for contract, ticker in active_tickers:
-                        g = self._extract_option_greeks_from_ticker(ticker)
-                        batch_greeks[contract.conId] = g
-                        # Persist non-empty Greeks to the long-lived in-memory cache and to
-                        # option_chain_cache in the database for cross-session fallback.
-                        if any(v is not None for v in (g.get("delta"), g.get("gamma"), g.get("theta"), g.get("vega"))):
-                            self._greeks_cache[contract.conId] = g
-                            # Intentionally avoid writing greek values to DB option cache here.
-                            # Portfolio greek path is IBKR-live/in-memory only.
-                finally:
-                    for contract, _ticker in active_tickers:
-                        try:
-                            self._ib.cancelMktData(contract)
-                        except Exception:
-                            pass
-                        self._forget_greek_ticker(contract)
-
-                return batch_greeks
+                    # Keep non-empty Greeks in the long-lived in-memory cache.
+                    # Portfolio greek path is IBKR-live/in-memory only (no DB writes here).
+                    if any(v is not None for v in (g.get("delta"), g.get("gamma"), g.get("theta"), g.get("vega"))):
+                        self._greeks_cache[conid] = g
+                return streamed
 
             now_monotonic = _time_mod.monotonic()
             last_live = self._last_live_greeks_refresh_monotonic
@@ -644,17 +911,44 @@ class IBEngine(QObject):
                 or not self._greeks_cache_by_contract
             )
 
+            new_stream_conids: set[int] = set()
+            rotated: dict[int, dict[str, float | None]] = {}
             if live_cycle_due:
-                for start in range(0, len(option_positions), batch_size):
-                    batch = option_positions[start:start + batch_size]
-                    option_greeks_by_conid.update(await collect_batch(batch, batch_wait_s))
+                new_stream_conids = set(await self._sync_greek_subscriptions(
+                    option_positions, batch_size, settle_timeout=batch_wait_s,
+                ))
+                if new_stream_conids:
+                    # Only freshly-opened streams need time to populate; returns as
+                    # soon as every new ticker has Greeks (batch_wait_s is the cap).
+                    collected = await self._greek_streams.wait_for_greeks(
+                        new_stream_conids, batch_wait_s, ready=self._ticker_has_greeks,
+                    )
+                    logger.info(
+                        "Greek streams settled: %d ready, %d pending after %.2fs",
+                        len(collected.ready), len(collected.timed_out), collected.elapsed_s,
+                    )
+                rotated = await self._rotate_overflow_greeks(option_positions, batch_size, batch_wait_s)
+                if rotated:
+                    run.count("greeks_rotated", len(rotated))
                 self._last_live_greeks_refresh_monotonic = _time_mod.monotonic()
             else:
+                # Closing streams costs no market-data request; new legs wait for the next sync.
+                dropped = self._greek_streams.retain(p.contract.conId for p in option_positions)
+                if dropped:
+                    logger.info("Cancelled %d greek streams for closed positions", len(dropped))
                 logger.info(
-                    "Skipping live greek sweep; cache age %.1fs < %.1fs refresh interval",
+                    "Skipping greek subscription sync; last sync %.1fs ago < %.1fs refresh interval",
                     (now_monotonic - last_live) if last_live else 0.0,
                     greeks_refresh_seconds,
                 )
+            option_greeks_by_conid.update(read_streamed_greeks(option_positions))
+            option_greeks_by_conid.update(rotated)
+            for conid, g in rotated.items():
+                if any(g.get(k) is not None for k in ("delta", "gamma", "theta", "vega")):
+                    self._greeks_cache[conid] = g
+            run.count("options", len(option_positions))
+            run.count("contracts_subscribed", len(new_stream_conids))
+            run.lap("greek_sweep")
 
             # Retry only options with no populated greek fields (common when data arrives late).
             def _has_any_greek_fields(payload: dict[str, Any] | None) -> bool:
@@ -662,25 +956,27 @@ class IBEngine(QObject):
                     return False
                 return any(payload.get(k) is not None for k in ("delta", "gamma", "theta", "vega", "iv"))
 
-            def _can_estimate_locally(contract: Any, payload: dict[str, Any] | None) -> bool:
-                if not self._enable_local_greeks:
-                    return False
+            def _estimable_conids(positions: list[Any]) -> set[int]:
+                """ConIds whose greeks can be estimated locally (one vectorised pass)."""
+                if not self._enable_local_greeks or not positions:
+                    return set()
                 try:
-                    return self._estimate_option_greeks(contract=contract, ticker_greeks=payload or {}) is not None
+                    estimates = self._estimate_option_greeks_batch(
+                        [(p.contract, option_greeks_by_conid.get(p.contract.conId, {})) for p in positions]
+                    )
                 except Exception:
-                    return False
+                    return set()
+                return {p.contract.conId for p, est in zip(positions, estimates) if est is not None}
 
+            estimable = _estimable_conids(option_positions)
             missing_positions = [
                 p for p in option_positions
                 if not _has_any_greek_fields(option_greeks_by_conid.get(p.contract.conId, {}))
                 and not _has_any_greek_fields(self._greeks_cache.get(p.contract.conId, {}))
-                and not _can_estimate_locally(p.contract, option_greeks_by_conid.get(p.contract.conId, {}))
+                and p.contract.conId not in estimable
             ]
             if option_positions:
-                estimable_count = sum(
-                    1 for p in option_positions
-                    if _can_estimate_locally(p.contract, option_greeks_by_conid.get(p.contract.conId, {}))
-                )
+                estimable_count = len(estimable)
                 cache_sig_count = sum(
                     1 for p in option_positions
                     if _has_any_greek_fields(self._greeks_cache_by_contract.get(_option_signature(p.contract), {}))
@@ -693,19 +989,29 @@ class IBEngine(QObject):
                     len(missing_positions),
                     "ibkr_only" if not self._enable_local_greeks else "ibkr_plus_local",
                 )
-            if missing_positions and live_cycle_due:
+            # Streams opened on earlier refreshes have had their chance; only give
+            # the freshly-subscribed ones a little more time to deliver.
+            missing_positions = [p for p in missing_positions if p.contract.conId in new_stream_conids]
+            if missing_positions:
                 missing_positions.sort(key=lambda p: abs(float(getattr(p, "position", 0.0))), reverse=True)
                 if retry_max_contracts > 0:
                     missing_positions = missing_positions[:retry_max_contracts]
-                logger.info("Retrying Greeks for %d/%d option positions", len(missing_positions), len(option_positions))
-                for start in range(0, len(missing_positions), retry_batch_size):
-                    retry_batch = missing_positions[start:start + retry_batch_size]
-                    option_greeks_by_conid.update(await collect_batch(retry_batch, retry_wait_s))
+                run.count("greek_retries", len(missing_positions))
+                logger.info("Waiting on Greeks for %d/%d option positions", len(missing_positions), len(option_positions))
+                # The settle wait already spent batch_wait_s; the retry gets retry_wait_s more.
+                await self._greek_streams.wait_for_greeks(
+                    [p.contract.conId for p in missing_positions],
+                    retry_wait_s,
+                    ready=self._ticker_has_greeks,
+                    from_now=True,
+                )
+                option_greeks_by_conid.update(read_streamed_greeks(missing_positions))
+                estimable_after_retry = _estimable_conids(missing_positions)
                 remaining_missing_positions = [
                     p for p in missing_positions
                     if not _has_any_greek_fields(option_greeks_by_conid.get(p.contract.conId, {}))
                     and not _has_any_greek_fields(self._greeks_cache.get(p.contract.conId, {}))
-                    and not _can_estimate_locally(p.contract, option_greeks_by_conid.get(p.contract.conId, {}))
+                    and p.contract.conId not in estimable_after_retry
                 ]
                 resolved_after_retry = len(missing_positions) - len(remaining_missing_positions)
                 logger.info(
@@ -725,11 +1031,23 @@ class IBEngine(QObject):
                         sample,
                         " …" if len(remaining_missing_positions) > 12 else "",
                     )
-            elif missing_positions:
-                logger.info(
-                    "Deferring live greek retry for %d positions until refresh interval elapses",
-                    len(missing_positions),
-                )
+
+            run.lap("greek_retry")
+
+            # ── Step 2b: Local estimates for legs with no live/cached greeks, priced in one batch
+            local_estimates: dict[int, dict[str, float | str]] = {}
+            if self._enable_local_greeks:
+                pending: list[tuple[Any, dict[str, Any]]] = []
+                for p in option_positions:
+                    live_g = option_greeks_by_conid.get(p.contract.conId, {})
+                    merged = {**self._greeks_cache.get(p.contract.conId, {}), **{k: v for k, v in live_g.items() if v is not None}}
+                    if not any(merged.get(k) is not None for k in ("delta", "gamma", "theta", "vega")):
+                        pending.append((p.contract, merged))
+                for (contract, _payload), estimated in zip(pending, self._estimate_option_greeks_batch(pending)):
+                    if estimated:
+                        local_estimates[contract.conId] = estimated
+
+            run.lap("local_estimates")
 
             # ── Step 3: Build PositionRow with PnL + Greeks
             for pos in ib_positions:
@@ -748,7 +1066,7 @@ class IBEngine(QObject):
                         greeks_source = "live"
 
                 if self._enable_local_greeks and c.secType in ("OPT", "FOP"):
-                    estimated = self._estimate_option_greeks(contract=c, ticker_greeks=ticker_greeks)
+                    estimated = local_estimates.get(c.conId)
                     if estimated and not any(ticker_greeks.get(k) is not None for k in ("delta", "gamma", "theta", "vega")):
                         ticker_greeks = {**ticker_greeks, **estimated}
                         greeks_source = str(estimated.get("source") or "estimated_bsm")
@@ -909,98 +1227,109 @@ class IBEngine(QObject):
 
             # Note: snapshot=True subscriptions auto-terminate after delivery.
             # No need to call cancelMktData — doing so causes Error 300 "Can't find EId".
-
-            # ── Step 4: Compute aggregate risk summary
-            native_total_delta = sum(r.delta or 0 for r in result)
-            total_gamma = sum(r.gamma or 0 for r in result)
-            total_theta = sum(r.theta or 0 for r in result)
-            total_vega = sum(r.vega or 0 for r in result)
-            total_spx_delta = sum(r.spx_delta or 0 for r in result)
-            # Keep aggregate delta in SPX-equivalent units to avoid mixed-unit
-            # totals across stocks/equity options/index options.
-            total_delta = total_spx_delta
-            gross_exposure = sum(abs(r.market_value or 0) for r in result)
-            net_exposure = sum(r.market_value or 0 for r in result)
-            opts = sum(1 for r in result if r.sec_type in ("OPT", "FOP"))
-            stks = sum(1 for r in result if r.sec_type == "STK")
-
-            risk = PortfolioRiskSummary(
-                total_positions=len(result),
-                total_value=sum(r.market_value or 0 for r in result),
-                total_spx_delta=total_spx_delta,
-                total_delta=total_delta,
-                total_gamma=total_gamma,
-                total_theta=total_theta,
-                total_vega=total_vega,
-                theta_vega_ratio=total_theta / total_vega if total_vega != 0 else 0.0,
-                gross_exposure=gross_exposure,
-                net_exposure=net_exposure,
-                options_count=opts,
-                stocks_count=stks,
-            )
+            run.count("greek_cache_hits", sum(1 for r in result if r.greeks_source == "cached"))
+            run.lap("build_rows")
+
+            # ── Step 4: Risk summary + strategy reconstruction (off the GUI loop)
+            if self._strategy_reconstructor.account_id != (self._account_id or "").strip():
+                self._strategy_reconstructor = StrategyReconstructor(account_id=self._account_id)
+            detections_before = self._strategy_reconstructor.detections
+            computed = await self._compute.run(compute_portfolio, result, self._strategy_reconstructor)
+            self._strategy_reconstructor = computed.reconstructor
+            if self._strategy_reconstructor.detections == detections_before:
+                run.count("strategy_layout_reused")
+            run.lap("compute")
+
+            risk = PortfolioRiskSummary(**computed.risk)
+            native_total_delta = computed.native_total_delta
+            total_delta = risk.total_delta
+            total_gamma = risk.total_gamma
+            total_theta = risk.total_theta
+            total_vega = risk.total_vega
+            total_spx_delta = risk.total_spx_delta
+            self._strategy_snapshot = computed.groups
+            self._risk_snapshot = risk
             self.risk_updated.emit(risk)
+            self.strategies_updated.emit(list(self._strategy_snapshot))
+            run.lap("emit_risk")
 
-            # Persist
-            self._strategy_snapshot = StrategyReconstructor(account_id=self._account_id).reconstruct(result)
             if self._db_ok:
-                try:
-                    await self._db.upsert_positions(self._account_id, rows)
-                    await self._db.replace_strategy_groups(self._account_id, self._strategy_snapshot)
-
-                    # ── Populate position/Greeks cache for LLM tools (60-second TTL) ──
-                    snapshot_id = str(uuid.uuid4())
-                    cache_positions = [
-                        {
-                            "conid": r.conid,
-                            "symbol": r.symbol,
-                            "sec_type": r.sec_type,
-                            "underlying": r.underlying or None,
-                            "expiry": r.expiry,
-                            "strike": r.strike,
-                            "option_right": r.right,
-                            "quantity": r.quantity,
-                            "market_price": r.market_price,
-                            "market_value": r.market_value,
-                            "unrealized_pnl": r.unrealized_pnl,
-                            "realized_pnl": r.realized_pnl,
-                            "underlying_price": r.underlying_price,
-                            "delta": r.delta,
-                            "gamma": r.gamma,
-                            "theta": r.theta,
-                            "vega": r.vega,
-                            "iv": r.iv,
-                            "spx_delta": r.spx_delta,
-                        }
-                        for r in result
-                    ]
-                    await self._db.cache_positions_snapshot(self._account_id, snapshot_id, cache_positions)
-                    await self._db.cache_portfolio_greeks(
-                        self._account_id,
-                        total_delta=total_delta,
-                        total_gamma=total_gamma,
-                        total_theta=total_theta,
-                        total_vega=total_vega,
-                        total_spx_delta=total_spx_delta,
-                        underlying_price=spx_proxy_price,
-                    )
-                    await self._db.cache_portfolio_metrics(
-                        self._account_id,
-                        self._build_portfolio_metrics_payload(risk),
+                # Write-behind: the latest snapshot per account wins and is written in
+                # one transaction, so UI signals never wait on DB round trips.
+                cache_positions = [
+                    {
+                        "conid": r.conid,
+                        "symbol": r.symbol,
+                        "sec_type": r.sec_type,
+                        "underlying": r.underlying or None,
+                        "expiry": r.expiry,
+                        "strike": r.strike,
+                        "option_right": r.right,
+                        "quantity": r.quantity,
+                        "market_price": r.market_price,
+                        "market_value": r.market_value,
+                        "unrealized_pnl": r.unrealized_pnl,
+                        "realized_pnl": r.realized_pnl,
+                        "underlying_price": r.underlying_price,
+                        "delta": r.delta,
+                        "gamma": r.gamma,
+                        "theta": r.theta,
+                        "vega": r.vega,
+                        "iv": r.iv,
+                        "spx_delta": r.spx_delta,
+                    }
+                    for r in result
+                ]
+                self._refresh_writer.submit(self._account_id, {
+                    "account_id": self._account_id,
+                    "positions": rows,
+                    "strategy_groups": self._strategy_snapshot,
+                    "snapshot_id": str(uuid.uuid4()),
+                    "cache_positions": cache_positions,
+                    "portfolio_greeks": {
+                        "total_delta": total_delta,
+                        "total_gamma": total_gamma,
+                        "total_theta": total_theta,
+                        "total_vega": total_vega,
+                        "total_spx_delta": total_spx_delta,
+                        "underlying_price": spx_proxy_price or None,
+                    },
+                    "portfolio_metrics": self._build_portfolio_metrics_payload(risk),
+                    "risk_snapshot": self._build_risk_snapshot_payload(risk),
+                })
+                if abs(native_total_delta - total_delta) > 1e-6:
+                    logger.debug(
+                        "Native delta %.4f differs from SPX-equivalent delta %.4f",
+                        native_total_delta,
+                        total_delta,
                     )
-                    await self._persist_portfolio_risk_snapshot(risk)
-                    if abs(native_total_delta - total_delta) > 1e-6:
-                        logger.debug(
-                            "Native delta %.4f differs from SPX-equivalent delta %.4f",
-                            native_total_delta,
-                            total_delta,
-                        )
-                    logger.debug("Cached %d positions + portfolio Greeks (snapshot_id=%s)", len(cache_positions), snapshot_id)
-                except Exception as exc:
-                    logger.warning("DB portfolio persistence failed: %s", exc)
+                run.count("persist_pending", len(self._refresh_writer))
+                run.count("persist_lag_ms", int(self._refresh_writer.lag_s() * 1000))
+                run.count("persist_failures", self._refresh_writer.failures)
+                run.lap("persist_queue")
             self._positions_snapshot = result
             self.positions_updated.emit(result)
+            run.lap("emit")
+            run.count("line_denials", self._lines.report_denials())
+            self._record_perf(run)
             return result
 
+    def _record_perf(self, run: PerfRun) -> None:
+        self._perf.record(run)
+        if self._perf_events_db and self._db_ok:
+            for event in run.events():
+                self._perf_event_writer.submit((event["run_id"], event["stage"]), event)
+        self.perf_updated.emit(run.operation)
+
+    def perf_stats(self, operation: str = "refresh_positions") -> dict[str, Any]:
+        """p50/p95/last stage timings (ms) and counters over recent *operation* runs."""
+        return self._perf.summary(operation)
+
+    async def _write_perf_events(self, rows: list[dict[str, Any]]) -> None:
+        if not self._db_ok:
+            return
+        await self._db.store_perf_events(rows)
+
     def _build_portfolio_metrics_payload(self, risk: PortfolioRiskSummary) -> dict[str, float | int | None]:
         account = self._last_account_summary
         return {
@@ -1039,26 +1368,68 @@ class IBEngine(QObject):
             return "elevated"
         return "normal"
 
-    async def _persist_portfolio_risk_snapshot(self, risk: PortfolioRiskSummary) -> None:
+    def _build_risk_snapshot_payload(self, risk: PortfolioRiskSummary) -> dict[str, Any] | None:
         account = self._last_account_summary
         if not account:
-            return
+            return None
         nlv = float(account.net_liquidation or 0.0)
         init_margin = float(account.init_margin or 0.0)
         vix = self._latest_vix_value()
-        await self._db.insert_risk_snapshot(
-            {
-                "account_id": self._account_id,
-                "spx_delta": risk.total_spx_delta,
-                "gamma": risk.total_gamma,
-                "theta": risk.total_theta,
-                "vega": risk.total_vega,
-                "vix": vix,
-                "regime": self._infer_regime_from_vix(vix),
-                "nlv": nlv,
-                "margin_used_pct": (init_margin / nlv) if nlv > 0 else None,
-            }
-        )
+        return {
+            "account_id": self._account_id,
+            "spx_delta": risk.total_spx_delta,
+            "gamma": risk.total_gamma,
+            "theta": risk.total_theta,
+            "vega": risk.total_vega,
+            "vix": vix,
+            "regime": self._infer_regime_from_vix(vix),
+            "nlv": nlv,
+            "margin_used_pct": (init_margin / nlv) if nlv > 0 else None,
+        }
+
+    async def _write_refresh_snapshots(self, snapshots: list[dict[str, Any]]) -> None:
+        if not self._db_ok:
+            return
+        for snap in snapshots:
+            await self._db.persist_refresh_snapshot(snap)
+            logger.debug(
+                "Persisted %d positions + portfolio Greeks (snapshot_id=%s)",
+                len(snap.get("cache_positions") or []), snap.get("snapshot_id"),
+            )
+
+    def persistence_stats(self) -> dict[str, dict[str, Any]]:
+        """Lag, coalescing and failure counters for each write-behind queue."""
+        return {
+            w.name: w.stats()
+            for w in (self._refresh_writer, self._chain_cache_writer, self._perf_event_writer)
+        }
+
+    async def _run_cache_compaction(self) -> None:
+        """Apply the positions_cache retention policy and refresh history rollups every interval."""
+        while True:
+            await asyncio.sleep(self._cache_compaction_interval_s)
+            if not self._db_ok:
+                continue
+            try:
+                result = await self._db.compact_positions_cache(self._positions_cache_retention)
+            except Exception as exc:
+                logger.warning("positions_cache compaction failed: %s", exc)
+            else:
+                self._last_cache_compaction = result
+                logger.info(
+                    "positions_cache compaction: thinned %d rows, expired %d rows, dropped %d partitions",
+                    result["thinned_rows"], result["expired_rows"], result["dropped_partitions"],
+                )
+            try:
+                rollups = await self._db.refresh_timeseries_rollups()
+            except Exception as exc:
+                logger.warning("timeseries rollup refresh failed: %s", exc)
+            else:
+                logger.debug("timeseries rollups refreshed: %s", rollups)
+
+    def _ticker_has_greeks(self, ticker: Any) -> bool:
+        g = self._extract_option_greeks_from_ticker(ticker)
+        return any(g.get(k) is not None for k in ("delta", "gamma", "theta", "vega"))
 
     def _extract_option_greeks_from_ticker(self, ticker: Any) -> dict[str, float | None]:
         """Extract option Greeks from model/bid/ask/last greeks in priority order.
@@ -1132,34 +1503,33 @@ class IBEngine(QObject):
         out["undPrice"] = up if up is not None and 0.0 < up < 10_000_000.0 else None
         return out
 
+    def _record_iv(self, symbol: str, expiry: str, strike: float, iv: float | None) -> None:
+        """Fold a live IV observation into the underlying's surface."""
+        if not iv or not symbol:
+            return
+        sym = str(symbol).upper()
+        surface = self._iv_surfaces.get(sym)
+        if surface is None:
+            surface = self._iv_surfaces[sym] = IVSurface()
+        surface.update(str(expiry or ""), float(strike or 0.0), float(iv))
+
     def _interpolate_iv_from_chain(self, contract: Any) -> float | None:
-        """Estimate IV for a contract by finding the nearest cached strike in _greeks_cache_by_contract.
+        """Estimate IV for a contract from the underlying's indexed IV surface.
 
-        Searches same underlying, preferring same expiry, then nearest-strike neighbour.
-        Falls back to a conservative 0.20 default IV when the cache has no data for
-        that underlying at all (e.g. individual stocks never fetched via chain).
+        Interpolates across strike within the same expiry and in total variance
+        across neighbouring expiries (see ``IVSurface``).  Falls back to a
+        conservative 0.20 default IV when no IV has been seen for that
+        underlying at all (e.g. individual stocks never fetched via chain).
         """
         sym = str(getattr(contract, "symbol", "") or "").upper()
         expiry = str(getattr(contract, "lastTradeDateOrContractMonth", "") or "").replace("-", "")[:8]
         strike = float(getattr(contract, "strike", 0.0) or 0.0)
 
-        same_exp: list[tuple[float, float]] = []
-        any_exp: list[tuple[float, float]] = []
-        for (s, e, k, _r, _st), data in self._greeks_cache_by_contract.items():
-            if s != sym:
-                continue
-            iv_val = self._finite_or_none(data.get("iv"))
-            if not iv_val or iv_val <= 0:
-                continue
-            if e == expiry:
-                same_exp.append((abs(k - strike), iv_val))
-            else:
-                any_exp.append((abs(k - strike), iv_val))
-
-        candidates = same_exp or any_exp
-        if candidates:
-            candidates.sort(key=lambda x: x[0])
-            return candidates[0][1]
+        surface = self._iv_surfaces.get(sym)
+        if surface is not None:
+            iv = surface.iv_at(expiry, strike)
+            if iv and iv > 0:
+                return iv
 
         # No chain data at all for this underlying — use a conservative default.
         # 0.20 (20% annualised) is a reasonable fallback for both equity options
@@ -1168,13 +1538,59 @@ class IBEngine(QObject):
         return 0.20
 
     def _estimate_option_greeks(self, *, contract: Any, ticker_greeks: dict[str, Any]) -> dict[str, float | str] | None:
-        """Estimate missing option Greeks from last known underlying price and IV.
+        """Estimate missing option Greeks from last known underlying price and IV."""
+        return self._estimate_option_greeks_batch([(contract, ticker_greeks)])[0]
+
+    def _estimate_option_greeks_batch(
+        self,
+        items: list[tuple[Any, dict[str, Any]]],
+    ) -> list[dict[str, float | str] | None]:
+        """Estimate Greeks for many ``(contract, ticker_greeks)`` pairs in one vectorised pass.
+
+        Inputs are resolved per contract (see :meth:`_local_greek_inputs`), then
+        priced together via ``GreeksEngine.estimate_batch`` (Black-76 for FOP).
+        Result order matches *items*; unpriceable entries are None.
+        """
+        results: list[dict[str, float | str] | None] = [None] * len(items)
+        priced: list[tuple[int, Any, float, float]] = []
+        for index, (contract, ticker_greeks) in enumerate(items):
+            inputs = self._local_greek_inputs(contract, ticker_greeks)
+            if inputs is not None:
+                priced.append((index, contract, *inputs))
+        if not priced:
+            return results
+
+        batch = self._greeks_engine.estimate_batch(
+            underlying_price=[und for _i, _c, _iv, und in priced],
+            strike=[float(getattr(c, "strike", 0.0) or 0.0) for _i, c, _iv, _und in priced],
+            expiry=[self._parse_expiry(getattr(c, "lastTradeDateOrContractMonth", None)) for _i, c, _iv, _und in priced],
+            right=[str(getattr(c, "right", "C") or "C") for _i, c, _iv, _und in priced],
+            iv=[iv for _i, _c, iv, _und in priced],
+            sec_type=[str(getattr(c, "secType", "") or "") for _i, c, _iv, _und in priced],
+        )
+        for row, (index, _contract, _iv, und_price) in enumerate(priced):
+            estimate = batch.row(row)
+            if estimate is None:
+                continue
+            results[index] = {
+                "delta": estimate.delta,
+                "gamma": estimate.gamma,
+                "theta": estimate.theta,
+                "vega": estimate.vega,
+                "iv": estimate.iv,
+                "undPrice": und_price,
+                "source": estimate.source,
+            }
+        return results
+
+    def _local_greek_inputs(self, contract: Any, ticker_greeks: dict[str, Any]) -> tuple[float, float] | None:
+        """Resolve ``(iv, underlying_price)`` for local estimation, or None.
 
         IV resolution order:
           1. live ticker_greeks["iv"]
           2. conId cache (_greeks_cache)
           3. contract-signature cache (_greeks_cache_by_contract, populated from option_chain_cache)
-          4. nearest-strike interpolation across the same underlying
+          4. IV-surface interpolation across strike/expiry for the same underlying
           5. conservative 0.20 (20%) default when nothing else is available
         """
         iv = self._finite_or_none(ticker_greeks.get("iv"))
@@ -1183,17 +1599,10 @@ class IBEngine(QObject):
             iv = self._finite_or_none(self._greeks_cache[getattr(contract, "conId", 0)].get("iv"))
         # 2. contract-signature cache (loaded from option_chain_cache on startup)
         if iv is None:
-            sig = (
-                str(getattr(contract, "symbol", "") or "").upper(),
-                str(getattr(contract, "lastTradeDateOrContractMonth", "") or "").replace("-", "")[:8],
-                round(float(getattr(contract, "strike", 0.0) or 0.0), 4),
-                str(getattr(contract, "right", "") or "").upper(),
-                str(getattr(contract, "secType", "") or "").upper(),
-            )
-            cached_sig = self._greeks_cache_by_contract.get(sig)
+            cached_sig = self._greeks_cache_by_contract.get(_option_signature(contract))
             if cached_sig:
                 iv = self._finite_or_none(cached_sig.get("iv"))
-        # 3. nearest-strike interpolation + default fallback
+        # 3. IV-surface interpolation + default fallback
         if iv is None or iv <= 0:
             iv = self._interpolate_iv_from_chain(contract)
         if iv is None or iv <= 0:
@@ -1209,25 +1618,7 @@ class IBEngine(QObject):
         if und_price is None or und_price <= 0:
             return None
 
-        expiry = self._parse_expiry(getattr(contract, "lastTradeDateOrContractMonth", None))
-        estimate = self._greeks_engine.estimate(
-            underlying_price=und_price,
-            strike=float(getattr(contract, "strike", 0.0) or 0.0),
-            expiry=expiry,
-            right=str(getattr(contract, "right", "C") or "C"),
-            iv=iv,
-        )
-        if estimate is None:
-            return None
-        return {
-            "delta": estimate.delta,
-            "gamma": estimate.gamma,
-            "theta": estimate.theta,
-            "vega": estimate.vega,
-            "iv": estimate.iv,
-            "undPrice": und_price,
-            "source": estimate.source,
-        }
+        return iv, und_price
 
     @staticmethod
     def _finite_or_none(value: Any) -> float | None:
@@ -1296,18 +1687,38 @@ class IBEngine(QObject):
         beta = self._symbol_beta(symbol)
         return float(underlying_delta) * float(quantity) * beta * (float(price) / spx_proxy) * float(multiplier)
 
+    def _underlying_exchange(self, symbol: str, sec_type: str) -> str:
+        """Exchange for an underlying: held-position exchange, then the futures table."""
+        if sec_type not in ("FUT", "FOP"):
+            return "SMART"
+        root = str(symbol or "").upper()
+        return self._future_exchanges.get(root) or _FUT_EXCHANGES.get(root, "CME")
+
+    async def _resolve_reference_contract(self, symbol: str, sec_type: str) -> Contract:
+        return await self._qualify_underlying(symbol, sec_type, self._underlying_exchange(symbol, sec_type))
+
     async def _spx_proxy_price_async(self) -> float:
-        """Best-effort SPX proxy from live SPY quote (×10), fallback to 6000."""
+        """SPX level from the reference streams (SPX, SPY×10, ES).
+
+        Opens the streams on first use and waits briefly for a first tick;
+        afterwards this is a dictionary read.  Falls back to the last known
+        proxy, and returns 0.0 (no price scaling) if none was ever seen.
+        """
         try:
-            spy = Stock(symbol="SPY", exchange="SMART", currency="USD")
-            ticker = self._ib.reqMktData(spy, genericTickList="", snapshot=True, regulatorySnapshot=False)
-            await asyncio.sleep(1)
-            price = float(getattr(ticker, "last", 0.0) or getattr(ticker, "close", 0.0) or 0.0)
-            if price > 0:
-                return price * 10.0
-        except Exception:
-            pass
-        return 6000.0
+            added = await self._reference_prices.ensure(CORE_REFERENCE_SYMBOLS)
+            price = self._reference_prices.spx_price()
+            if price is None and added:
+                await self._reference_prices.wait_for(("SPX", "SPY", "ES"), self._reference_wait_s, require_all=False)
+                price = self._reference_prices.spx_price()
+            if price:
+                return price
+        except Exception as exc:
+            logger.debug("SPX reference price unavailable: %s", exc)
+        if self._last_spx_proxy_price:
+            logger.info("Using last known SPX proxy %.2f (no live reference price)", self._last_spx_proxy_price)
+            return self._last_spx_proxy_price
+        logger.warning("No SPX reference price available; SPX-weighted deltas are unscaled")
+        return 0.0
 
     # ── account summary ───────────────────────────────────────────────────
 
@@ -1694,10 +2105,7 @@ class IBEngine(QObject):
         for batch_start in range(0, len(contracts), batch_size):
             batch = contracts[batch_start:batch_start + batch_size]
             try:
-                q = await asyncio.wait_for(
-                    self._ib.qualifyContractsAsync(*batch),
-                    timeout=15,
-                )
+                q = await self._qualify_contracts(batch, timeout=15)
                 qualified.extend([c for c in q if c is not None and c.conId > 0])
             except asyncio.TimeoutError:
                 logger.warning("Chain qualify batch timed out (batch %d)", batch_start)
@@ -1717,13 +2125,11 @@ class IBEngine(QObject):
         chain_generic_ticks = os.getenv("IB_CHAIN_GENERIC_TICKS", "100,101,104,106")
         tickers = []
         for c in qualified:
-            t = self._ib.reqMktData(
-                c,
-                genericTickList=chain_generic_ticks,
-                snapshot=False,
-                regulatorySnapshot=False,
-            )
-            tickers.append((c, t))
+            t = self._lines.acquire(c, "chain", LinePriority.CHAIN, chain_generic_ticks)
+            if t is not None:
+                tickers.append((c, t))
+        if len(tickers) < len(qualified):
+            logger.warning("Chain: %d/%d strikes streaming (market-data line budget)", len(tickers), len(qualified))
 
         # Let streams populate for initial render
         await asyncio.sleep(2)
@@ -1743,6 +2149,7 @@ class IBEngine(QObject):
                 open_interest = 0
 
             greeks = self._extract_option_greeks_from_ticker(t)
+            self._record_iv(underlying, c.lastTradeDateOrContractMonth, c.strike, greeks["iv"])
             result.append(ChainRow(
                 underlying=underlying,
                 expiry=c.lastTradeDateOrContractMonth,
@@ -1774,49 +2181,42 @@ class IBEngine(QObject):
         logger.info("chain cache stored: %d strikes for %s %s (skeleton+prices)", 
                    len(result), underlying, expiry_key)
         
-        # Store Greeks in database for offline fallback (when market is closed)
+        # Store Greeks in database for offline fallback (when market is closed).
+        # Write-behind: rows coalesce per contract and flush as one bulk UPSERT.
         if self._db_ok:
-            try:
-                for row in result:
-                    c = row.underlying if isinstance(row, ChainRow) else row[0]  # underlying
-                    e = row.expiry if isinstance(row, ChainRow) else row[1]  # expiry
-                    s = row.strike if isinstance(row, ChainRow) else row[2]  # strike
-                    r = row.right if isinstance(row, ChainRow) else row[3]  # right
-                    cn = row.conid if isinstance(row, ChainRow) else row[4]  # conid
-                    b = row.bid if isinstance(row, ChainRow) else row[5]  # bid
-                    a = row.ask if isinstance(row, ChainRow) else row[6]  # ask
-                    l = row.last if isinstance(row, ChainRow) else row[7]  # last
-                    v = row.volume if isinstance(row, ChainRow) else (row[8] if len(row) > 8 else None)  # volume
-                    oi = row.open_interest if isinstance(row, ChainRow) else (row[9] if len(row) > 9 else None)  # open_interest
-                    iv = row.iv if isinstance(row, ChainRow) else (row[10] if len(row) > 10 else None)  # iv
-                    d = row.delta if isinstance(row, ChainRow) else (row[11] if len(row) > 11 else None)  # delta
-                    g = row.gamma if isinstance(row, ChainRow) else (row[12] if len(row) > 12 else None)  # gamma
-                    th = row.theta if isinstance(row, ChainRow) else (row[13] if len(row) > 13 else None)  # theta
-                    ve = row.vega if isinstance(row, ChainRow) else (row[14] if len(row) > 14 else None)  # vega
-                    
-                    asyncio.create_task(self._db.store_cached_greeks(
-                        underlying=c,
-                        expiry=e,
-                        strike=float(s) if s else None,
-                        option_right=r,
-                        conid=cn,
-                        bid=float(b) if b else None,
-                        ask=float(a) if a else None,
-                        last=float(l) if l else None,
-                        volume=int(v) if v else None,
-                        open_interest=int(oi) if oi else None,
-                        iv=float(iv) if iv else None,
-                        delta=float(d) if d else None,
-                        gamma=float(g) if g else None,
-                        theta=float(th) if th else None,
-                        vega=float(ve) if ve else None,
-                    ))
-            except Exception as exc:
-                logger.debug("Failed to store Greeks in database: %s", exc)
+            self._queue_chain_cache_rows(result)
         
         self.chain_ready.emit(result)
         return result
 
+    def _queue_chain_cache_rows(self, rows: list) -> None:
+        for row in rows:
+            if not isinstance(row, ChainRow):
+                continue
+            key = (row.underlying, row.expiry, row.strike, row.right)
+            self._chain_cache_writer.submit(key, {
+                "underlying": row.underlying,
+                "expiry": row.expiry,
+                "strike": float(row.strike) if row.strike else None,
+                "option_right": row.right,
+                "conid": row.conid,
+                "bid": float(row.bid) if row.bid else None,
+                "ask": float(row.ask) if row.ask else None,
+                "last": float(row.last) if row.last else None,
+                "volume": int(row.volume) if row.volume else None,
+                "open_interest": int(row.open_interest) if row.open_interest else None,
+                "iv": float(row.iv) if row.iv else None,
+                "delta": float(row.delta) if row.delta else None,
+                "gamma": float(row.gamma) if row.gamma else None,
+                "theta": float(row.theta) if row.theta else None,
+                "vega": float(row.vega) if row.vega else None,
+            })
+
+    async def _write_chain_cache_rows(self, rows: list[dict[str, Any]]) -> None:
+        if not self._db_ok:
+            return
+        await self._db.store_cached_chain(rows)
+
     def read_chain_from_live_tickers(self, rows: list) -> list:
         """Return updated ChainRows with the latest bid/ask/greeks from live IB tickers.
 
@@ -1843,6 +2243,7 @@ class IBEngine(QObject):
                 return fallback
 
             greeks = self._extract_option_greeks_from_ticker(ticker)
+            self._record_iv(row.underlying, row.expiry, row.strike, greeks["iv"])
             updated.append(ChainRow(
                 underlying=row.underlying,
                 expiry=row.expiry,
@@ -1867,12 +2268,57 @@ class IBEngine(QObject):
 
         Call this when the chain tab is hidden or the underlying / expiry changes.
         """
-        for _conid, (c, _) in list(self._chain_tickers.items()):
-            try:
-                self._ib.cancelMktData(c)
-            except Exception:
-                pass
+        self._lines.release_consumer("chain")
         self._chain_tickers.clear()
+        self._pending_chain_conids.clear()
+        if self._chain_flush_handle is not None:
+            self._chain_flush_handle.cancel()
+            self._chain_flush_handle = None
+
+    def _on_chain_line_evicted(self, conid: int) -> None:
+        self._chain_tickers.pop(conid, None)
+
+    def _on_watch_line_evicted(self, conid: int) -> None:
+        for key, (contract, _ticker) in list(self._watch_tickers.items()):
+            if int(getattr(contract, "conId", 0) or 0) == conid:
+                del self._watch_tickers[key]
+
+    def cache_stats(self) -> list[dict[str, Any]]:
+        """Hit/miss/eviction counters and size for each bounded engine cache."""
+        caches = (
+            self._chain_cache, self._strike_skeleton_cache, self._expiry_cache,
+            self._greeks_cache, self._last_price_cache,
+        )
+        return [c.stats() for c in caches if isinstance(c, BoundedCache)]
+
+    def market_data_line_stats(self) -> dict[str, Any]:
+        """Line budget usage: lines, budget, per-priority counts, evictions, denials."""
+        return self._lines.stats()
+
+    def _on_pending_tickers(self, tickers) -> None:
+        """Collect chain conIds from an ib_async pendingTickersEvent burst."""
+        if not self._chain_tickers:
+            return
+        for ticker in tickers or ():
+            conid = int(getattr(getattr(ticker, "contract", None), "conId", 0) or 0)
+            if conid in self._chain_tickers:
+                self._pending_chain_conids.add(conid)
+        if not self._pending_chain_conids or self._chain_flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_chain_ticks()
+            return
+        self._chain_flush_handle = loop.call_later(self._chain_tick_coalesce_s, self._flush_chain_ticks)
+
+    def _flush_chain_ticks(self) -> None:
+        self._chain_flush_handle = None
+        if not self._pending_chain_conids:
+            return
+        conids = sorted(self._pending_chain_conids)
+        self._pending_chain_conids.clear()
+        self.chain_ticks.emit(conids)
 
     async def _fallback_fop_contracts_for_expiry(
         self,
@@ -2230,7 +2676,7 @@ class IBEngine(QObject):
             try:
                 unresolved_items = [(idx, c) for idx, c in enumerate(contracts) if getattr(c, "conId", 0) <= 0]
                 unresolved_contracts = [c for _, c in unresolved_items]
-                qualified = await self._ib.qualifyContractsAsync(*unresolved_contracts)
+                qualified = await self._qualify_contracts(unresolved_contracts)
                 qualified_by_index: dict[int, Any] = {}
                 qualified_by_key: dict[tuple[str, str, float, str], Any] = {}
 
@@ -2653,6 +3099,11 @@ class IBEngine(QObject):
             except Exception:
                 pass
 
+        # snapshot=True auto-terminates — no cancelMktData needed
+        return self._publish_market_snapshot(symbol, ticker)
+
+    def _publish_market_snapshot(self, symbol: str, ticker: Any) -> MarketSnapshot:
+        """Build a MarketSnapshot from *ticker*, update price caches and emit it."""
         snap = MarketSnapshot(
             symbol=symbol,
             last=ticker.last if ticker.last and ticker.last > 0 else None,
@@ -2664,11 +3115,11 @@ class IBEngine(QObject):
             volume=int(ticker.volume) if ticker.volume and ticker.volume >= 0 else 0,
             timestamp=datetime.now(timezone.utc).isoformat(),
         )
-        # snapshot=True auto-terminates — no cancelMktData needed
         self._market_snapshots[symbol.upper()] = {
             "last": snap.last, "bid": snap.bid, "ask": snap.ask,
             "close": snap.close, "volume": snap.volume,
         }
+        self._market_snapshot_events[symbol.upper()] = snap
         # ── update last-price cache ──────────────────────────────────────
         best_price = snap.last or snap.bid or snap.ask or snap.close
         if best_price and best_price > 0:
@@ -2676,6 +3127,33 @@ class IBEngine(QObject):
         self.market_snapshot.emit(snap)
         return snap
 
+    async def watch_quote(self, symbol: str, sec_type: str = "STK", exchange: str = "SMART") -> MarketSnapshot | None:
+        """Quote *symbol* from a streaming watchlist line (opened on first call).
+
+        Subsequent calls read the live ticker without any IB request.  Falls
+        back to :meth:`get_market_snapshot` when no line is available (budget
+        full of higher-priority lines).  Returns None until the first tick.
+        """
+        key = (symbol.upper(), sec_type, exchange)
+        entry = self._watch_tickers.get(key)
+        if entry is None:
+            contract = await self._qualify_underlying(symbol, sec_type, exchange)
+            ticker = self._lines.acquire(contract, "watchlist", LinePriority.WATCHLIST)
+            if ticker is None:
+                return await self.get_market_snapshot(symbol, sec_type, exchange)
+            entry = (contract, ticker)
+            self._watch_tickers[key] = entry
+        ticker = entry[1]
+        if not any((_safe_float(getattr(ticker, f, None)) or 0.0) > 0 for f in ("last", "bid", "ask", "close")):
+            return None
+        return self._publish_market_snapshot(symbol, ticker)
+
+    def unwatch_quote(self, symbol: str, sec_type: str = "STK", exchange: str = "SMART") -> None:
+        """Release the watchlist line for *symbol* (no-op if not watched)."""
+        entry = self._watch_tickers.pop((symbol.upper(), sec_type, exchange), None)
+        if entry is not None:
+            self._lines.release(int(getattr(entry[0], "conId", 0) or 0), "watchlist")
+
     def _build_simple_contract(self, symbol: str, sec_type: str, exchange: str) -> Contract:
         """Build a simple contract for market data requests."""
         if sec_type == "FUT":
@@ -2702,9 +3180,9 @@ class IBEngine(QObject):
             bid: float | None = None
             ask: float | None = None
 
-            # 1. Chain ticker cache (fast path)
-            if conid and conid in self._chain_tickers:
-                _, t = self._chain_tickers[conid]
+            # 1. Any live line — chain or held-position stream (fast path)
+            t = self._lines.ticker(conid) if conid else None
+            if t is not None:
                 b = t.bid if (t.bid and t.bid > 0) else None
                 a = t.ask if (t.ask and t.ask > 0) else None
                 if b or a:
@@ -2768,6 +3246,7 @@ class IBEngine(QObject):
                 avg_fill_price=float(os_.avgFillPrice),
             ))
 
+        self._open_orders_snapshot = list(result)
         self.orders_updated.emit(result)
         return result
 
@@ -2881,12 +3360,10 @@ class IBEngine(QObject):
         """Infer the correct exchange for a contract lacking one."""
         sec = getattr(contract, "secType", "")
         sym = getattr(contract, "symbol", "")
-        if sec == "FOP":
-            return "CME"   # ES, MES, NQ, MNQ, etc.
+        if sec in ("FOP", "FUT"):
+            return _FUT_EXCHANGES.get(str(sym or "").upper(), "CME")
         if sec == "OPT":
             return "SMART"
-        if sec == "FUT":
-            return "CME"
         if sec == "STK":
             return "SMART"
         return "SMART"
@@ -3048,6 +3525,10 @@ class IBEngine(QObject):
     def _on_ib_disconnected(self) -> None:
         logger.warning("IB disconnected event")
         self._cancel_greek_streaming()
+        self._reference_prices.cancel_all()
+        self._chain_tickers.clear()
+        self._watch_tickers.clear()
+        self._lines.cancel_all()
         self.connection_state.emit("disconnected", "IB Gateway connection lost")
         self.disconnected.emit()
         if self._manual_disconnect_requested:
@@ -3089,6 +3570,18 @@ class IBEngine(QObject):
         self.order_status.emit(info)
 
 
+def _option_signature(contract: Any) -> tuple[str, str, float, str, str]:
+    """(symbol, YYYYMMDD, strike, right, secType) key for ``_greeks_cache_by_contract``."""
+    expiry_raw = str(getattr(contract, "lastTradeDateOrContractMonth", "") or "").replace("-", "")[:8]
+    return (
+        str(getattr(contract, "symbol", "") or "").upper(),
+        expiry_raw,
+        round(float(getattr(contract, "strike", 0.0) or 0.0), 4),
+        str(getattr(contract, "right", "") or "").upper(),
+        str(getattr(contract, "secType", "") or "").upper(),
+    )
+
+
 def _safe_float(val: Any) -> float | None:
     """Convert IB's string margin values to float, handling empty/None."""
     if val is None:
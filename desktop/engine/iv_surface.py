@@ -0,0 +1,102 @@
+"""desktop/engine/iv_surface.py — Indexed implied-volatility surface per underlying.
+
+Each :class:`IVSurface` keeps one strike-sorted smile per expiry and is updated
+in place as chain / position tickers deliver IV.  Lookups bisect the smile and
+interpolate linearly across strike, then interpolate total variance (σ²·t)
+across neighbouring expiries, so a missing-IV fallback is O(log n) instead of a
+scan over every cached contract.
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from datetime import date
+
+
+class IVSurface:
+    """Strike × expiry implied-volatility surface for a single underlying."""
+
+    def __init__(self) -> None:
+        # expiry (YYYYMMDD) → (sorted strikes, ivs aligned with strikes)
+        self._smiles: dict[str, tuple[list[float], list[float]]] = {}
+        self._expiries: list[str] = []
+
+    def __len__(self) -> int:
+        return sum(len(strikes) for strikes, _ivs in self._smiles.values())
+
+    @property
+    def expiries(self) -> list[str]:
+        return list(self._expiries)
+
+    def update(self, expiry: str, strike: float, iv: float) -> None:
+        """Insert or replace the IV for ``(expiry, strike)``; ignores invalid values."""
+        expiry = str(expiry or "").replace("-", "")[:8]
+        strike = float(strike or 0.0)
+        iv = float(iv or 0.0)
+        if len(expiry) != 8 or strike <= 0 or not (0.0 < iv <= 10.0):
+            return
+        smile = self._smiles.get(expiry)
+        if smile is None:
+            smile = ([], [])
+            self._smiles[expiry] = smile
+            pos = bisect_left(self._expiries, expiry)
+            self._expiries.insert(pos, expiry)
+        strikes, ivs = smile
+        i = bisect_left(strikes, strike)
+        if i < len(strikes) and strikes[i] == strike:
+            ivs[i] = iv
+        else:
+            strikes.insert(i, strike)
+            ivs.insert(i, iv)
+
+    def iv_at(self, expiry: str, strike: float, valuation_date: date | None = None) -> float | None:
+        """Interpolated IV at ``(expiry, strike)``, or None when the surface is empty."""
+        if not self._expiries:
+            return None
+        expiry = str(expiry or "").replace("-", "")[:8]
+        strike = float(strike or 0.0)
+        if expiry in self._smiles:
+            return self._smile_iv(expiry, strike)
+
+        i = bisect_left(self._expiries, expiry)
+        if i == 0:
+            return self._smile_iv(self._expiries[0], strike)
+        if i == len(self._expiries):
+            return self._smile_iv(self._expiries[-1], strike)
+
+        near, far = self._expiries[i - 1], self._expiries[i]
+        t = _years_to(expiry, valuation_date)
+        t_near = _years_to(near, valuation_date)
+        t_far = _years_to(far, valuation_date)
+        iv_near = self._smile_iv(near, strike)
+        iv_far = self._smile_iv(far, strike)
+        if t is None or t_near is None or t_far is None or t_far <= t_near:
+            return iv_near
+        w_near = iv_near * iv_near * t_near
+        w_far = iv_far * iv_far * t_far
+        w = w_near + (w_far - w_near) * (t - t_near) / (t_far - t_near)
+        if w <= 0 or t <= 0:
+            return iv_near
+        return math.sqrt(w / t)
+
+    def _smile_iv(self, expiry: str, strike: float) -> float:
+        strikes, ivs = self._smiles[expiry]
+        i = bisect_left(strikes, strike)
+        if i == 0:
+            return ivs[0]
+        if i == len(strikes):
+            return ivs[-1]
+        lo_k, hi_k = strikes[i - 1], strikes[i]
+        lo_iv, hi_iv = ivs[i - 1], ivs[i]
+        if strikes[i] == strike:
+            return hi_iv
+        return lo_iv + (hi_iv - lo_iv) * (strike - lo_k) / (hi_k - lo_k)
+
+
+def _years_to(expiry: str, valuation_date: date | None) -> float | None:
+    try:
+        exp = date(int(expiry[:4]), int(expiry[4:6]), int(expiry[6:8]))
+    except (ValueError, IndexError):
+        return None
+    today = valuation_date or date.today()
+    return max((exp - today).days, 1) / 365.0
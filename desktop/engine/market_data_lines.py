@@ -0,0 +1,244 @@
+"""desktop/engine/market_data_lines.py — Central market-data line budget.
+
+IB caps the number of concurrent streaming market-data lines per session.
+Every streaming consumer in the engine (held-position Greeks, the visible
+option chain, reference prices, the watchlist, background agents) acquires
+its lines through one :class:`MarketDataLineScheduler`, which
+
+* shares one ticker per conId between consumers, reference-counted by
+  consumer name, and only cancels the IB subscription when the last holder
+  releases it;
+* enforces the line budget, evicting the lowest-priority, least recently
+  acquired line when a higher-priority request arrives at the cap; and
+* notifies the evicted consumers so they can drop stale tickers.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class LinePriority(IntEnum):
+    """Higher value wins when the line budget is exhausted."""
+    AGENT = 0
+    WATCHLIST = 1
+    CHAIN = 2
+    HELD = 3
+
+
+@dataclass
+class _Line:
+    contract: Any
+    ticker: Any
+    generic_ticks: frozenset[str]
+    holders: dict[str, LinePriority] = field(default_factory=dict)
+    acquired_at: float = 0.0
+
+    @property
+    def priority(self) -> LinePriority:
+        return max(self.holders.values())
+
+
+def _ticks(generic_ticks: str) -> frozenset[str]:
+    return frozenset(t.strip() for t in str(generic_ticks or "").split(",") if t.strip())
+
+
+class MarketDataLineScheduler:
+    """Owns every streaming ``reqMktData`` line opened by the engine.
+
+    The IB client is looked up through *ib_provider* on every call so the
+    engine (and tests) can swap ``IBEngine._ib`` after construction.
+    """
+
+    def __init__(self, ib_provider: Callable[[], Any], max_lines: int = 100, headroom: int = 5):
+        self._ib_provider = ib_provider
+        self._budget = max(1, int(max_lines) - max(0, int(headroom)))
+        self._lines: dict[int, _Line] = {}
+        self._eviction_listeners: dict[str, Callable[[int], None]] = {}
+        self.evictions = 0
+        self.denials = 0
+        self._unreported_denials = 0
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __contains__(self, conid: object) -> bool:
+        return conid in self._lines
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    def on_evicted(self, consumer: str, callback: Callable[[int], None]) -> None:
+        """Register *callback(conid)* to run when *consumer* loses a line to eviction."""
+        self._eviction_listeners[consumer] = callback
+
+    def ticker(self, conid: int) -> Any | None:
+        """Return the live ticker for *conid* regardless of which consumer opened it."""
+        line = self._lines.get(int(conid or 0))
+        return line.ticker if line else None
+
+    def holders(self, conid: int) -> set[str]:
+        line = self._lines.get(int(conid or 0))
+        return set(line.holders) if line else set()
+
+    def held_by(self, *consumers: str) -> int:
+        """Number of lines that any of *consumers* currently holds."""
+        wanted = set(consumers)
+        return sum(1 for line in self._lines.values() if wanted & line.holders.keys())
+
+    def acquire(
+        self,
+        contract: Any,
+        consumer: str,
+        priority: LinePriority,
+        generic_ticks: str = "",
+    ) -> Any | None:
+        """Return a streaming ticker for *contract* held on behalf of *consumer*.
+
+        Returns None when the contract has no conId, the request fails, or the
+        budget is full of lines with equal or higher priority.
+        """
+        conid = int(getattr(contract, "conId", 0) or 0)
+        if conid <= 0:
+            return None
+        wanted_ticks = _ticks(generic_ticks)
+        line = self._lines.get(conid)
+        if line is not None:
+            if not wanted_ticks <= line.generic_ticks:
+                # Widen the existing subscription rather than opening a second line.
+                merged = line.generic_ticks | wanted_ticks
+                ticker = self._request(line.contract, merged, cancel_first=True)
+                if ticker is not None:
+                    line.generic_ticks = merged
+                else:
+                    # The old subscription is already cancelled: restore it, or
+                    # drop the line so no holder keeps a dead ticker.
+                    ticker = self._request(line.contract, line.generic_ticks)
+                    if ticker is None:
+                        self._lines.pop(conid, None)
+                        self._notify_evicted(conid, line)
+                        return None
+                line.ticker = ticker
+            line.holders[consumer] = max(priority, line.holders.get(consumer, priority))
+            return line.ticker
+
+        if len(self._lines) >= self._budget and not self._evict_below(priority):
+            self.denials += 1
+            self._unreported_denials += 1
+            logger.debug(
+                "Market-data line budget exhausted (%d/%d); denied %s line for %s",
+                len(self._lines), self._budget, priority.name, getattr(contract, "localSymbol", None) or conid,
+            )
+            return None
+        ticker = self._request(contract, wanted_ticks)
+        if ticker is None:
+            return None
+        self._lines[conid] = _Line(
+            contract=contract,
+            ticker=ticker,
+            generic_ticks=wanted_ticks,
+            holders={consumer: priority},
+            acquired_at=time.monotonic(),
+        )
+        return ticker
+
+    def release(self, conid: int, consumer: str) -> None:
+        """Drop *consumer*'s hold on *conid*; the IB line closes with its last holder."""
+        conid = int(conid or 0)
+        line = self._lines.get(conid)
+        if line is None or consumer not in line.holders:
+            return
+        del line.holders[consumer]
+        if not line.holders:
+            self._close(conid)
+
+    def release_consumer(self, consumer: str) -> None:
+        for conid in [c for c, line in self._lines.items() if consumer in line.holders]:
+            self.release(conid, consumer)
+
+    def cancel_all(self) -> None:
+        """Close every line (disconnect / reconnect)."""
+        for conid in list(self._lines):
+            self._close(conid)
+
+    def stats(self) -> dict[str, Any]:
+        by_priority = {p.name.lower(): 0 for p in LinePriority}
+        for line in self._lines.values():
+            by_priority[line.priority.name.lower()] += 1
+        return {
+            "lines": len(self._lines),
+            "budget": self._budget,
+            "by_priority": by_priority,
+            "evictions": self.evictions,
+            "denials": self.denials,
+        }
+
+    def report_denials(self) -> int:
+        """Log one summary of the denials since the last report; returns their count.
+
+        Called once per refresh cycle so a full budget produces one warning per
+        cycle rather than one per denied request.
+        """
+        count, self._unreported_denials = self._unreported_denials, 0
+        if count:
+            logger.warning(
+                "Market-data line budget exhausted (%d/%d); denied %d line request(s) since last report",
+                len(self._lines), self._budget, count,
+            )
+        return count
+
+    def _evict_below(self, priority: LinePriority) -> bool:
+        candidates = [
+            (line.priority, line.acquired_at, conid)
+            for conid, line in self._lines.items()
+            if line.priority < priority
+        ]
+        if not candidates:
+            return False
+        _prio, _ts, conid = min(candidates)
+        line = self._lines[conid]
+        self._close(conid)
+        self.evictions += 1
+        logger.info("Evicted %s market-data line %d for a %s request", line.priority.name, conid, priority.name)
+        self._notify_evicted(conid, line)
+        return True
+
+    def _notify_evicted(self, conid: int, line: _Line) -> None:
+        for consumer in line.holders:
+            callback = self._eviction_listeners.get(consumer)
+            if callback is None:
+                continue
+            try:
+                callback(conid)
+            except Exception as exc:
+                logger.debug("Eviction listener for %s failed: %s", consumer, exc)
+
+    def _request(self, contract: Any, generic_ticks: frozenset[str], *, cancel_first: bool = False) -> Any | None:
+        ib = self._ib_provider()
+        try:
+            if cancel_first:
+                ib.cancelMktData(contract)
+            return ib.reqMktData(
+                contract,
+                genericTickList=",".join(sorted(generic_ticks)),
+                snapshot=False,
+                regulatorySnapshot=False,
+            )
+        except Exception as exc:
+            logger.debug("Market-data request failed for %s: %s", getattr(contract, "localSymbol", "?"), exc)
+            return None
+
+    def _close(self, conid: int) -> None:
+        line = self._lines.pop(conid, None)
+        if line is None:
+            return
+        try:
+            self._ib_provider().cancelMktData(line.contract)
+        except Exception:
+            pass
@@ -0,0 +1,144 @@
+"""desktop/engine/perf_timing.py — Stage-level timing for expensive engine calls.
+
+``IBEngine.refresh_positions`` records one :class:`PerfRun` per call, with
+the wall-clock duration of each stage (beta gather, Greek sweep, row build,
+DB writes, …) and a few counters (contracts subscribed, cache hits,
+retries).  :class:`PerfRecorder` keeps the last *capacity* runs per
+operation in a ring buffer and summarises them as p50/p95 per stage for the
+desktop timing panel and ``IBEngine.perf_stats()``.
+"""
+from __future__ import annotations
+
+import math
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile (``q`` in 0..100) of *values*; None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class PerfRun:
+    """Timings and counters for one invocation of an instrumented operation."""
+    operation: str
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    stages: dict[str, float] = field(default_factory=dict)   # stage → seconds (in execution order)
+    counts: dict[str, int] = field(default_factory=dict)
+    total_s: float | None = None
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+    _lap_t: float = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._lap_t = self._t0
+
+    def lap(self, name: str) -> float:
+        """Close the stage that ran since the previous lap (or start); returns its seconds.
+
+        Lets long linear coroutines be instrumented without re-nesting their
+        bodies; repeated stage names accumulate.
+        """
+        now = time.perf_counter()
+        elapsed = now - self._lap_t
+        self._lap_t = now
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed
+        return elapsed
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block; repeated stages accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start)
+            self._lap_t = time.perf_counter()
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + int(value)
+
+    def finish(self) -> PerfRun:
+        if self.total_s is None:
+            self.total_s = time.perf_counter() - self._t0
+        return self
+
+    def report(self) -> str:
+        """One-line ``stage 12ms · stage 3ms · total 15ms`` summary for logs."""
+        parts = [f"{name} {seconds * 1000.0:.0f}ms" for name, seconds in self.stages.items()]
+        if self.total_s is not None:
+            parts.append(f"total {self.total_s * 1000.0:.0f}ms")
+        return " · ".join(parts)
+
+    def events(self) -> list[dict[str, Any]]:
+        """Flatten into ``perf_events`` rows (one per stage plus the total)."""
+        base = {"run_id": self.run_id, "operation": self.operation, "recorded_at": self.started_at}
+        rows = [
+            {**base, "stage": name, "duration_ms": seconds * 1000.0, "counts": None}
+            for name, seconds in self.stages.items()
+        ]
+        rows.append({**base, "stage": "total", "duration_ms": (self.total_s or 0.0) * 1000.0, "counts": dict(self.counts)})
+        return rows
+
+
+class PerfRecorder:
+    """Ring buffer of recent :class:`PerfRun` objects, per operation."""
+
+    def __init__(self, capacity: int = 200):
+        self._capacity = max(1, int(capacity))
+        self._runs: dict[str, deque[PerfRun]] = {}
+
+    def start(self, operation: str) -> PerfRun:
+        return PerfRun(operation=operation)
+
+    def record(self, run: PerfRun) -> None:
+        run.finish()
+        self._runs.setdefault(run.operation, deque(maxlen=self._capacity)).append(run)
+
+    def runs(self, operation: str) -> list[PerfRun]:
+        return list(self._runs.get(operation, ()))
+
+    def last(self, operation: str) -> PerfRun | None:
+        runs = self._runs.get(operation)
+        return runs[-1] if runs else None
+
+    def summary(self, operation: str) -> dict[str, Any]:
+        """p50/p95/last (ms) per stage and mean/last per counter over the buffer."""
+        runs = self.runs(operation)
+        stage_names: list[str] = []
+        for run in runs:
+            for name in run.stages:
+                if name not in stage_names:
+                    stage_names.append(name)
+        stages: dict[str, dict[str, float | int | None]] = {}
+        for name in stage_names + ["total"]:
+            samples = [
+                (run.total_s if name == "total" else run.stages[name]) * 1000.0
+                for run in runs
+                if (run.total_s is not None if name == "total" else name in run.stages)
+            ]
+            stages[name] = {
+                "n": len(samples),
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+                "last_ms": samples[-1] if samples else None,
+            }
+        counter_names = sorted({n for run in runs for n in run.counts})
+        counts = {
+            name: {
+                "last": runs[-1].counts.get(name, 0),
+                "mean": sum(run.counts.get(name, 0) for run in runs) / len(runs),
+            }
+            for name in counter_names
+        }
+        return {"operation": operation, "runs": len(runs), "stages": stages, "counts": counts}
@@ -0,0 +1,184 @@
+"""desktop/engine/reference_prices.py — Always-on reference-price streams.
+
+Keeps one streaming ``reqMktData`` subscription per reference instrument
+(SPY, SPX, ES, VIX by default, plus the underlyings of held options) and
+serves last/bid/ask with update timestamps straight from the live tickers.
+``IBEngine.refresh_positions`` uses it for the SPX proxy and underlying
+prices, and agents use it for regime detection, so none of them pay for a
+snapshot request and a fixed sleep per call.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from desktop.engine.market_data_lines import LinePriority, MarketDataLineScheduler
+
+logger = logging.getLogger(__name__)
+
+CONSUMER = "reference"
+
+# symbol → underlying secType understood by IBEngine._qualify_underlying
+CORE_REFERENCE_SYMBOLS: dict[str, str] = {"SPY": "STK", "SPX": "IND", "ES": "FUT", "VIX": "IND"}
+
+
+def _price(value: Any) -> float | None:
+    if isinstance(value, (int, float)) and math.isfinite(value) and value > 0:
+        return float(value)
+    return None
+
+
+@dataclass(frozen=True)
+class ReferenceQuote:
+    """Latest streamed quote for a reference instrument."""
+    symbol: str
+    last: float | None
+    bid: float | None
+    ask: float | None
+    close: float | None
+    updated_at: float | None  # epoch seconds of the last tick, None before the first
+
+    @property
+    def mid(self) -> float | None:
+        if self.bid is not None and self.ask is not None:
+            return (self.bid + self.ask) / 2.0
+        return None
+
+    @property
+    def price(self) -> float | None:
+        """Best available price: last, then mid, then prior close."""
+        return self.last or self.mid or self.close
+
+    def age(self, now: float | None = None) -> float | None:
+        if self.updated_at is None:
+            return None
+        return max(0.0, (now if now is not None else time.time()) - self.updated_at)
+
+
+class ReferencePriceService:
+    """Registry of streaming reference tickers keyed by symbol.
+
+    *resolve_contract* turns ``(symbol, sec_type)`` into a qualified contract
+    (``IBEngine._qualify_underlying``).  Symbols that fail to resolve are not
+    retried for *retry_after_s* so a bad symbol cannot stall every refresh.
+    Lines are held at ``LinePriority.HELD`` through the engine's scheduler.
+    """
+
+    def __init__(
+        self,
+        lines: MarketDataLineScheduler,
+        resolve_contract: Callable[[str, str], Awaitable[Any]],
+        *,
+        retry_after_s: float = 300.0,
+    ):
+        self._lines = lines
+        self._resolve_contract = resolve_contract
+        self._retry_after_s = retry_after_s
+        self._tickers: dict[str, tuple[Any, Any]] = {}
+        self._failed: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    def __contains__(self, symbol: object) -> bool:
+        return str(symbol or "").upper() in self._tickers
+
+    @property
+    def symbols(self) -> set[str]:
+        return set(self._tickers)
+
+    async def ensure(self, symbols: dict[str, str]) -> list[str]:
+        """Subscribe any of *symbols* (symbol → secType) not already streaming.
+
+        Returns the symbols that were newly subscribed.
+        """
+        async with self._lock:
+            now = time.monotonic()
+            added: list[str] = []
+            for raw_symbol, sec_type in symbols.items():
+                symbol = str(raw_symbol or "").upper()
+                if not symbol or symbol in self._tickers:
+                    continue
+                failed_at = self._failed.get(symbol)
+                if failed_at is not None and now - failed_at < self._retry_after_s:
+                    continue
+                try:
+                    contract = await self._resolve_contract(symbol, sec_type)
+                    ticker = self._lines.acquire(contract, CONSUMER, LinePriority.HELD)
+                    if ticker is None:
+                        raise RuntimeError("no market-data line")
+                except Exception as exc:
+                    self._failed[symbol] = now
+                    logger.debug("Reference stream for %s (%s) unavailable: %s", symbol, sec_type, exc)
+                    continue
+                self._failed.pop(symbol, None)
+                self._tickers[symbol] = (contract, ticker)
+                added.append(symbol)
+            if added:
+                logger.info("Reference price streams opened: %s", ", ".join(added))
+            return added
+
+    def quote(self, symbol: str) -> ReferenceQuote | None:
+        entry = self._tickers.get(str(symbol or "").upper())
+        if entry is None:
+            return None
+        ticker = entry[1]
+        quote_time = getattr(ticker, "time", None)
+        updated_at = quote_time.timestamp() if hasattr(quote_time, "timestamp") else None
+        return ReferenceQuote(
+            symbol=str(symbol).upper(),
+            last=_price(getattr(ticker, "last", None)),
+            bid=_price(getattr(ticker, "bid", None)),
+            ask=_price(getattr(ticker, "ask", None)),
+            close=_price(getattr(ticker, "close", None)),
+            updated_at=updated_at,
+        )
+
+    def price(self, symbol: str) -> float | None:
+        quote = self.quote(symbol)
+        return quote.price if quote is not None else None
+
+    def spx_price(self) -> float | None:
+        """SPX level from the best available stream: SPX, then SPY×10, then ES."""
+        spx = self.price("SPX")
+        if spx:
+            return spx
+        spy = self.price("SPY")
+        if spy:
+            return spy * 10.0
+        return self.price("ES")
+
+    async def wait_for(self, symbols: Iterable[str], timeout: float, *, require_all: bool = True) -> bool:
+        """Wait until the streaming *symbols* have a price (all, or any) or *timeout* passes."""
+        wanted = [s.upper() for s in symbols if s and s.upper() in self._tickers]
+        if not wanted:
+            return False
+        ready = all if require_all else any
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            if ready(self.price(s) for s in wanted):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+
+    def retain(self, symbols: Iterable[str]) -> set[str]:
+        """Cancel streams not in *symbols* (core symbols are always kept)."""
+        keep = {str(s).upper() for s in symbols} | set(CORE_REFERENCE_SYMBOLS)
+        dropped = set(self._tickers) - keep
+        for symbol in dropped:
+            self._cancel(symbol)
+        return dropped
+
+    def cancel_all(self) -> None:
+        for symbol in list(self._tickers):
+            self._cancel(symbol)
+        self._failed.clear()
+
+    def _cancel(self, symbol: str) -> None:
+        entry = self._tickers.pop(symbol, None)
+        if entry is None:
+            return
+        self._lines.release(int(getattr(entry[0], "conId", 0) or 0), CONSUMER)
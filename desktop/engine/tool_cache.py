@@ -0,0 +1,166 @@
+"""desktop/engine/tool_cache.py — Result cache for the AI assistant's data tools.
+
+The LLM tool loop in ``AIRiskTab`` asks for the same positions, Greeks and
+quotes many times per conversation.  :class:`ToolResultCache` keeps those
+answers in a :class:`BoundedCache` (LRU, bounded by entries and estimated
+bytes) with a per-call TTL, collapses concurrent fetches of the same key into
+one producer call, and drops whole tool families on demand so event-driven
+invalidation (``positions_updated``, ``risk_updated``…) never lets a
+portfolio answer outlive the data it was computed from.
+
+Keys are ``"<tool>"`` or ``"<tool>:<payload>"``; the part before the first
+colon is the *family* that :meth:`ToolResultCache.invalidate` matches on.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from desktop.engine.bounded_cache import BoundedCache, approx_size
+
+
+@dataclass
+class _ToolCacheEntry:
+    value: Any
+    fetched_at: float
+
+
+def _family(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+class ToolResultCache:
+    """Bounded, invalidation-aware cache of tool results.
+
+    A fetch that was in flight when its family was invalidated still returns
+    its value to the caller but is not stored, so a slow producer cannot
+    repopulate the cache with pre-invalidation data.
+    """
+
+    def __init__(
+        self,
+        name: str = "ai_tools",
+        *,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries is None:
+            max_entries = int(os.getenv("IB_AI_TOOL_CACHE_ENTRIES", "256"))
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("IB_AI_TOOL_CACHE_MB", "16")) * 1024 * 1024)
+        self._clock = clock
+        self._store = BoundedCache(
+            name,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            sizeof=lambda entry: approx_size(entry.value),
+            clock=clock,
+        )
+        self._inflight: dict[str, asyncio.Task] = {}
+        # Bumped on every invalidation of a family; a fetch only stores its
+        # result if the family's generation is unchanged since it started.
+        self._generations: Counter[str] = Counter()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.discarded = 0
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._store
+
+    def keys(self) -> list[str]:
+        return list(self._store)
+
+    def get(self, key: str, *, ttl_seconds: float) -> tuple[bool, Any]:
+        """``(True, value)`` for a live entry younger than *ttl_seconds*, else ``(False, None)``."""
+        entry: _ToolCacheEntry | None = self._store.get(key)
+        if entry is None or self._clock() - entry.fetched_at > ttl_seconds:
+            return False, None
+        return True, entry.value
+
+    def put(self, key: str, value: Any) -> None:
+        self._store[key] = _ToolCacheEntry(value=value, fetched_at=self._clock())
+
+    async def get_or_fetch(self, key: str, *, ttl_seconds: float, producer: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a cached value for *key* or await *producer* (once per key) and cache it."""
+        found, value = self.get(key, ttl_seconds=ttl_seconds)
+        if found:
+            self.hits += 1
+            return value
+        if key in self._store:
+            self.stale += 1
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await inflight
+        self.misses += 1
+
+        family = _family(key)
+        started = (self._epoch, self._generations[family])
+
+        async def _run_producer() -> Any:
+            result = await producer()
+            if (self._epoch, self._generations[family]) == started:
+                self.put(key, result)
+            else:
+                self.discarded += 1
+            return result
+
+        task = asyncio.create_task(_run_producer())
+        self._inflight[key] = task
+        try:
+            return await task
+        finally:
+            if self._inflight.get(key) is task:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, *families: str) -> int:
+        """Drop every entry of the given tool *families*; returns the number removed."""
+        if not families:
+            return 0
+        wanted = set(families)
+        for family in wanted:
+            self._generations[family] += 1
+        # Later callers must not join a fetch that started before invalidation.
+        for key in [key for key in self._inflight if _family(key) in wanted]:
+            self._inflight.pop(key, None)
+        doomed = [key for key in self._store if _family(key) in wanted]
+        for key in doomed:
+            del self._store[key]
+        self.invalidations += 1
+        return len(doomed)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._inflight.clear()
+        self._store.clear()
+
+    def stats(self) -> dict[str, Any]:
+        store = self._store.stats()
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "name": store["name"],
+            "entries": store["entries"],
+            "bytes": store["bytes"],
+            "max_entries": store["max_entries"],
+            "max_bytes": store["max_bytes"],
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits / lookups) if lookups else None,
+            "evictions": store["evictions"],
+            "invalidations": self.invalidations,
+            "discarded": self.discarded,
+        }
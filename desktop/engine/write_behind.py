@@ -0,0 +1,138 @@
+"""desktop/engine/write_behind.py — Coalescing write-behind queue for DB persistence.
+
+Callers :meth:`CoalescingWriter.submit` items under a key and return
+immediately.  Items accumulate for *delay_s*, repeated submissions for the same
+key collapse to the latest one, and the whole batch is handed to a single bulk
+*flush* coroutine, so a burst of updates costs one round-trip instead of one
+pool connection per row.  Failures are logged and counted, never raised into
+the submitting code path.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescingWriter:
+    """Batch and coalesce writes; at most one flush runs at a time."""
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[list[Any]], Awaitable[Any]],
+        *,
+        delay_s: float = 0.5,
+        max_batch: int = 2000,
+    ):
+        self.name = name
+        self._flush_fn = flush
+        self._delay_s = max(0.0, delay_s)
+        self._max_batch = max(1, int(max_batch))
+        self._pending: dict[Hashable, Any] = {}
+        self._oldest_pending: float | None = None
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self.submitted = 0
+        self.coalesced = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self.last_flush_s: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, key: Hashable, item: Any) -> None:
+        """Queue *item* under *key*, replacing any not-yet-written item for that key."""
+        if key in self._pending:
+            self.coalesced += 1
+        elif self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+        self._pending[key] = item
+        self.submitted += 1
+        self._schedule()
+
+    def submit_many(self, items: list[tuple[Hashable, Any]]) -> None:
+        for key, item in items:
+            self.submit(key, item)
+
+    async def flush(self) -> int:
+        """Write everything queued now; returns the number of items written."""
+        written = 0
+        async with self._lock:
+            while self._pending:
+                batch_keys = list(self._pending)[: self._max_batch]
+                batch = [self._pending.pop(k) for k in batch_keys]
+                if not self._pending:
+                    self._oldest_pending = None
+                started = time.monotonic()
+                try:
+                    await self._flush_fn(batch)
+                except Exception as exc:
+                    self.failures += 1
+                    self.last_error = str(exc)
+                    logger.warning("%s write-behind flush of %d item(s) failed: %s", self.name, len(batch), exc)
+                    continue
+                finally:
+                    self.last_flush_s = time.monotonic() - started
+                self.batches += 1
+                self.written += len(batch)
+                written += len(batch)
+        return written
+
+    def lag_s(self) -> float:
+        """Age of the oldest unwritten item (0 when the queue is empty)."""
+        if self._oldest_pending is None:
+            return 0.0
+        return time.monotonic() - self._oldest_pending
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "pending": len(self._pending),
+            "lag_s": self.lag_s(),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_flush_s": self.last_flush_s,
+        }
+
+    async def close(self) -> None:
+        """Finish any in-flight flush, then write whatever is still queued.
+
+        A flush that is still waiting out *delay_s* is cancelled; one that is
+        already writing is awaited, because its batch has left the queue.
+        """
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            if self._lock.locked():
+                await asyncio.gather(task, return_exceptions=True)
+            else:
+                task.cancel()
+        await self.flush()
+
+    def discard(self) -> None:
+        """Drop queued items without writing them (e.g. DB became unavailable)."""
+        self._pending.clear()
+        self._oldest_pending = None
+
+    def _schedule(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop (sync tests / shutdown) — items wait for an explicit flush()
+        self._task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self._delay_s)
+        await self.flush()
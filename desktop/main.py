@@ -25,6 +25,11 @@ if __package__ in (None, ""):
     if str(_project_root) not in sys.path:
         sys.path.insert(0, str(_project_root))
 
+from desktop.engine.perf_timing import PerfRun
+
+# Startup timing starts here: cold launch → first painted portfolio view.
+_STARTUP = PerfRun(operation="startup")
+
 # Load .env BEFORE anything reads os.environ
 _dotenv_path = Path(__file__).resolve().parents[1] / ".env"
 load_dotenv(_dotenv_path)
@@ -40,6 +45,8 @@ from desktop.engine.ib_engine import IBEngine
 from desktop.engine.token_manager import TokenManager
 from desktop.ui.main_window import MainWindow
 
+_STARTUP.lap("imports")
+
 logger = logging.getLogger("desktop")
 
 
@@ -217,6 +224,7 @@ def main() -> None:
     # Create the qasync event loop (bridges Qt ↔ asyncio)
     loop = qasync.QEventLoop(app)
     asyncio.set_event_loop(loop)
+    _STARTUP.lap("qapp")
 
     # Create engine + main window
     token_manager = TokenManager()
@@ -227,8 +235,11 @@ def main() -> None:
         client_id=args.client_id,
         db_dsn=args.db,
     )
-    window = MainWindow(engine, token_manager=token_manager)
+    _STARTUP.lap("engine")
+    # MainWindow laps "main_window" and closes the run on its first paint
+    window = MainWindow(engine, token_manager=token_manager, startup=_STARTUP)
     window.show()
+    _STARTUP.lap("show")
 
     logger.info("Desktop app started")
 
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import hashlib
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from dataclasses import dataclass
-from itertools import combinations
 from typing import Any, Iterable, Sequence
 
 
@@ -88,13 +88,84 @@ class _VerticalCandidate:
     long_strike: float
 
 
+@dataclass(slots=True)
+class _GroupLayout:
+    """Structure of one detected group, independent of prices and Greeks."""
+    association_id: str
+    strategy_name: str
+    underlying: str
+    matched_by: str
+    expiry_label: str
+    strategy_family: str | None
+    leg_conids: tuple[int, ...]
+
+
 class StrategyReconstructor:
-    """Re-associate raw positions into human-friendly options strategies."""
+    """Re-associate raw positions into human-friendly options strategies.
+
+    Structure detection is cached under a fingerprint of the position set
+    (conId and quantity per leg).  While the fingerprint is unchanged,
+    :meth:`reconstruct` only rebuilds the cached groups around the new rows so
+    their net Greeks and P&L are re-aggregated; detection re-runs when legs are
+    opened, closed or resized.
+    """
 
     def __init__(self, *, account_id: str | None = None) -> None:
         self.account_id = (account_id or "").strip()
+        self._layout_fingerprint: str | None = None
+        self._layout: list[_GroupLayout] = []
+        self.detections = 0
+        self.reaggregations = 0
 
     def reconstruct(self, positions: Sequence[Any]) -> list[StrategyGroup]:
+        fingerprint = _position_set_fingerprint(self.account_id, positions)
+        if fingerprint is not None and fingerprint == self._layout_fingerprint:
+            groups = self._reaggregate(positions)
+            if groups is not None:
+                self.reaggregations += 1
+                return groups
+
+        groups = self._detect(positions)
+        self.detections += 1
+        self._layout_fingerprint = fingerprint
+        self._layout = [
+            _GroupLayout(
+                association_id=group.association_id,
+                strategy_name=group.strategy_name,
+                underlying=group.underlying,
+                matched_by=group.matched_by,
+                expiry_label=group.expiry_label,
+                strategy_family=group.strategy_family,
+                leg_conids=tuple(group.leg_ids),
+            )
+            for group in groups
+        ] if fingerprint is not None else []
+        return groups
+
+    def invalidate(self) -> None:
+        """Forget the cached structure; the next call re-runs detection."""
+        self._layout_fingerprint = None
+        self._layout = []
+
+    def _reaggregate(self, positions: Sequence[Any]) -> list[StrategyGroup] | None:
+        by_conid = {int(getattr(row, "conid", 0) or 0): row for row in positions}
+        groups: list[StrategyGroup] = []
+        for layout in self._layout:
+            legs = [by_conid.get(conid) for conid in layout.leg_conids]
+            if any(leg is None for leg in legs):
+                return None
+            groups.append(StrategyGroup(
+                association_id=layout.association_id,
+                strategy_name=layout.strategy_name,
+                underlying=layout.underlying,
+                legs=legs,
+                matched_by=layout.matched_by,
+                expiry_label=layout.expiry_label,
+                strategy_family=layout.strategy_family,
+            ))
+        return groups
+
+    def _detect(self, positions: Sequence[Any]) -> list[StrategyGroup]:
         by_underlying: dict[str, list[Any]] = defaultdict(list)
         for row in positions:
             by_underlying[_underlying(row)].append(row)
@@ -273,34 +344,49 @@ class StrategyReconstructor:
 
         for right, right_legs in by_right.items():
             ordered = sorted(right_legs, key=lambda leg: (_strike(leg), abs(_quantity(leg))))
-            strikes = [_strike(leg) for leg in ordered]
-            if len(ordered) < 3 or any(strike is None for strike in strikes):
+            if len(ordered) < 3 or any(_strike(leg) is None for leg in ordered):
                 continue
-            local_used: set[int] = set()
-            for combo in combinations(ordered, 3):
-                if any(id(leg) in local_used or id(leg) in used for leg in combo):
-                    continue
-                sorted_combo = sorted(combo, key=_strike_sort_key)
-                a, b, c = sorted_combo
-                if not _same_expiry(sorted_combo):
-                    continue
-                if not _is_butterfly_ratio(sorted_combo):
-                    continue
-                strike_a, strike_b, strike_c = (_strike(a), _strike(b), _strike(c))
-                if strike_a is None or strike_b is None or strike_c is None:
+            # Strike-indexed: for each lower wing, bodies come from a (sign, size)
+            # bucket and the upper wing is a hash lookup at the mirrored strike.
+            # Visiting wings, bodies and upper wings in strike order claims the
+            # same legs as scanning every 3-combination in order.
+            bodies: dict[tuple, list[Any]] = defaultdict(list)
+            wings: dict[tuple, list[Any]] = defaultdict(list)
+            for leg in ordered:
+                qty = _quantity(leg)
+                if qty == 0:
                     continue
-                if abs((strike_b - strike_a) - (strike_c - strike_b)) > 1e-9:
+                bodies[_size_key(leg)].append(leg)
+                wings[(*_size_key(leg), _strike_key(_strike(leg)))].append(leg)
+            body_strikes = {key: [_strike(leg) or 0.0 for leg in bucket] for key, bucket in bodies.items()}
+            for a in ordered:
+                qty_a = _quantity(a)
+                if qty_a == 0 or id(a) in used:
                     continue
-                strategy_name = f"{_right_label(right)} Butterfly".strip()
-                groups.append(self._build_group(
-                    underlying=underlying,
-                    strategy_name=strategy_name or "Butterfly",
-                    legs=sorted_combo,
-                    matched_by="butterfly",
-                    strategy_family="butterfly",
-                ))
-                local_used.update(id(leg) for leg in sorted_combo)
-                used.update(id(leg) for leg in sorted_combo)
+                strike_a = _strike(a) or 0.0
+                sign_a = 1 if qty_a > 0 else -1
+                body_key = (_expiry(a), -sign_a, _qty_key(2 * abs(qty_a)))
+                body_bucket = bodies.get(body_key, [])
+                first_body = bisect_right(body_strikes.get(body_key, []), strike_a)
+                for b in body_bucket[first_body:]:
+                    if id(b) in used:
+                        continue
+                    strike_b = _strike(b) or 0.0
+                    wing_key = (_expiry(a), sign_a, _qty_key(abs(qty_a)), _strike_key(2 * strike_b - strike_a))
+                    c = next((leg for leg in wings.get(wing_key, []) if id(leg) not in used), None)
+                    if c is None:
+                        continue
+                    sorted_combo = [a, b, c]
+                    strategy_name = f"{_right_label(right)} Butterfly".strip()
+                    groups.append(self._build_group(
+                        underlying=underlying,
+                        strategy_name=strategy_name or "Butterfly",
+                        legs=sorted_combo,
+                        matched_by="butterfly",
+                        strategy_family="butterfly",
+                    ))
+                    used.update(id(leg) for leg in sorted_combo)
+                    break
         return groups
 
     def _extract_vertical_candidates(
@@ -323,12 +409,25 @@ class StrategyReconstructor:
                 [leg for leg in right_legs if _strike(leg) is not None],
                 key=lambda leg: (_strike(leg), abs(_quantity(leg))),
             )
+            # The narrowest partner is the next unclaimed leg of opposite sign and
+            # equal size in strike order, so each leg only looks at its own bucket.
+            by_size: dict[tuple, list[Any]] = defaultdict(list)
+            size_positions: dict[tuple, list[int]] = defaultdict(list)
+            for idx, leg in enumerate(ordered):
+                by_size[_size_key(leg)].append(leg)
+                size_positions[_size_key(leg)].append(idx)
             local_used: set[int] = set()
             for idx, leg in enumerate(ordered):
                 if id(leg) in local_used or id(leg) in used:
                     continue
+                qty = _quantity(leg)
+                if qty == 0:
+                    continue
+                partner_key = (_expiry(leg), -1 if qty > 0 else 1, _qty_key(abs(qty)))
+                partners = by_size.get(partner_key, [])
+                start = bisect_right(size_positions.get(partner_key, []), idx)
                 best: _VerticalCandidate | None = None
-                for other in ordered[idx + 1:]:
+                for other in partners[start:]:
                     if id(other) in local_used or id(other) in used:
                         continue
                     if not _is_balanced_pair(leg, other):
@@ -345,7 +444,7 @@ class StrategyReconstructor:
                     long_leg = low_leg if _quantity(low_leg) > 0 else high_leg if _quantity(high_leg) > 0 else None
                     if short_leg is None or long_leg is None:
                         continue
-                    candidate = _VerticalCandidate(
+                    best = _VerticalCandidate(
                         legs=(leg, other),
                         strategy_name=strategy_name,
                         matched_by="vertical_spread",
@@ -358,8 +457,7 @@ class StrategyReconstructor:
                         short_strike=_strike(short_leg) or 0.0,
                         long_strike=_strike(long_leg) or 0.0,
                     )
-                    if best is None or (candidate.higher_strike - candidate.lower_strike) < (best.higher_strike - best.lower_strike):
-                        best = candidate
+                    break
                 if best is not None:
                     candidates.append(best)
                     local_used.update(id(leg) for leg in best.legs)
@@ -374,27 +472,23 @@ class StrategyReconstructor:
         groups: list[StrategyGroup] = []
         consumed: set[int] = set()
         put_spreads = [candidate for candidate in verticals if candidate.right == "P"]
-        call_spreads = [candidate for candidate in verticals if candidate.right == "C"]
+        # Credit call spreads by (expiry, size), in verticals order (ascending lower
+        # strike), so the first one above a put spread is found by bisection.
+        call_spreads: dict[tuple, list[_VerticalCandidate]] = defaultdict(list)
+        for candidate in verticals:
+            if candidate.right == "C" and candidate.short_strike < candidate.long_strike:
+                call_spreads[(candidate.expiry, _qty_key(candidate.quantity))].append(candidate)
+        call_lower_strikes = {key: [c.lower_strike for c in bucket] for key, bucket in call_spreads.items()}
 
         for put_spread in put_spreads:
             if id(put_spread) in consumed:
                 continue
             if not put_spread.short_strike > put_spread.long_strike:
                 continue
-            best_call: _VerticalCandidate | None = None
-            for call_spread in call_spreads:
-                if id(call_spread) in consumed:
-                    continue
-                if call_spread.expiry != put_spread.expiry:
-                    continue
-                if abs(call_spread.quantity - put_spread.quantity) > 1e-9:
-                    continue
-                if not call_spread.short_strike < call_spread.long_strike:
-                    continue
-                if put_spread.higher_strike > call_spread.lower_strike:
-                    continue
-                best_call = call_spread
-                break
+            key = (put_spread.expiry, _qty_key(put_spread.quantity))
+            bucket = call_spreads.get(key, [])
+            start = bisect_left(call_lower_strikes.get(key, []), put_spread.higher_strike)
+            best_call = next((c for c in bucket[start:] if id(c) not in consumed), None)
             if best_call is None:
                 continue
             legs = [*put_spread.legs, *best_call.legs]
@@ -464,22 +558,26 @@ class StrategyReconstructor:
         for expiry, expiry_legs in sorted(by_expiry.items()):
             calls = sorted([leg for leg in expiry_legs if _right(leg) == "C"], key=_strike_sort_key)
             puts = sorted([leg for leg in expiry_legs if _right(leg) == "P"], key=_strike_sort_key)
+            # Puts by (sign, size) in strike order; claimed puts are skipped once via
+            # a per-bucket cursor, so each call's match is an amortised O(1) lookup.
+            puts_by_size: dict[tuple, list[Any]] = defaultdict(list)
+            for put in puts:
+                if _quantity(put) != 0:
+                    puts_by_size[_size_key(put)].append(put)
+            cursors: dict[tuple, int] = defaultdict(int)
             local_used: set[int] = set()
             for call in calls:
-                if id(call) in used or id(call) in local_used:
+                if id(call) in used or id(call) in local_used or _quantity(call) == 0:
                     continue
-                match = next(
-                    (
-                        put for put in puts
-                        if id(put) not in used
-                        and id(put) not in local_used
-                        and _same_sign(call, put)
-                        and _same_abs_quantity(call, put)
-                    ),
-                    None,
-                )
-                if match is None:
+                key = _size_key(call)
+                bucket = puts_by_size.get(key, [])
+                cursor = cursors[key]
+                while cursor < len(bucket) and (id(bucket[cursor]) in used or id(bucket[cursor]) in local_used):
+                    cursor += 1
+                cursors[key] = cursor
+                if cursor >= len(bucket):
                     continue
+                match = bucket[cursor]
                 same_strike = abs((_strike(call) or 0.0) - (_strike(match) or 0.0)) < 1e-9
                 side = "Short" if _quantity(call) < 0 else "Long"
                 strategy_name = f"{side} {'Straddle' if same_strike else 'Strangle'}"
@@ -550,16 +648,26 @@ class StrategyReconstructor:
 
             remaining = [leg for leg in right_legs if id(leg) not in used]
             ordered = sorted(remaining, key=lambda leg: (_expiry_sort_key(_expiry(leg)), _strike(leg) or 0.0))
+            # Partners by (sign, size) in (expiry, strike) order; bisecting on the
+            # expiry key jumps straight past legs that share this leg's expiry.
+            by_size: dict[tuple, list[Any]] = defaultdict(list)
+            for leg in ordered:
+                if _quantity(leg) != 0:
+                    by_size[_signed_size_key(leg)].append(leg)
+            expiry_keys = {key: [_expiry_sort_key(_expiry(leg)) for leg in bucket] for key, bucket in by_size.items()}
             local_used = set()
-            for idx, leg in enumerate(ordered):
-                if id(leg) in used or id(leg) in local_used:
+            for leg in ordered:
+                if id(leg) in used or id(leg) in local_used or _quantity(leg) == 0:
                     continue
+                sign, size = _signed_size_key(leg)
+                key = (-sign, size)
+                bucket = by_size.get(key, [])
+                start = bisect_right(expiry_keys.get(key, []), _expiry_sort_key(_expiry(leg)))
                 best = next(
                     (
-                        other for other in ordered[idx + 1:]
+                        other for other in bucket[start:]
                         if id(other) not in used
                         and id(other) not in local_used
-                        and _is_balanced_pair(leg, other)
                         and _expiry(leg) != _expiry(other)
                         and _strike(leg) != _strike(other)
                     ),
@@ -698,6 +806,21 @@ def _association_id(*, account_id: str, underlying: str, strategy_name: str, leg
     return hashlib.sha1(seed.encode("utf-8")).hexdigest()[:24]
 
 
+def _position_set_fingerprint(account_id: str, positions: Sequence[Any]) -> str | None:
+    """Hash of (conId, quantity) over *positions*; None when conIds cannot key legs."""
+    keys: list[tuple[int, float]] = []
+    for row in positions:
+        conid = int(getattr(row, "conid", 0) or 0)
+        if conid <= 0:
+            return None
+        keys.append((conid, _quantity(row)))
+    keys.sort()
+    if any(left[0] == right[0] for left, right in zip(keys, keys[1:])):
+        return None
+    payload = "|".join(f"{conid}:{quantity:.8f}" for conid, quantity in keys)
+    return hashlib.sha1(f"{account_id}|{payload}".encode("utf-8")).hexdigest()
+
+
 def _combo_strategy_name(leg: Any) -> str:
     combo = str(getattr(leg, "combo_description", "") or "").strip()
     return combo or "Broker Combo"
@@ -749,17 +872,26 @@ def _expiry(leg: Any) -> str | None:
     return digits[:8] if len(digits) >= 8 else text
 
 
-def _expiry_sort_key(expiry: str | None) -> tuple[int, str]:
-    return (0, expiry) if expiry else (1, "99999999")
+def _qty_key(quantity: float) -> float:
+    return round(float(quantity), 6)
+
 
+def _strike_key(strike: float | None) -> float | None:
+    return round(float(strike), 6) if strike is not None else None
 
-def _same_expiry(legs: Sequence[Any]) -> bool:
-    expiries = {_expiry(leg) for leg in legs}
-    return len(expiries) == 1
 
+def _signed_size_key(leg: Any) -> tuple[int, float]:
+    qty = _quantity(leg)
+    return (1 if qty > 0 else -1, _qty_key(abs(qty)))
 
-def _same_sign(left: Any, right: Any) -> bool:
-    return _quantity(left) * _quantity(right) > 0
+
+def _size_key(leg: Any) -> tuple[str | None, int, float]:
+    """(expiry, sign, |quantity|) bucket used for strike-indexed structure matching."""
+    return (_expiry(leg), *_signed_size_key(leg))
+
+
+def _expiry_sort_key(expiry: str | None) -> tuple[int, str]:
+    return (0, expiry) if expiry else (1, "99999999")
 
 
 def _same_abs_quantity(left: Any, right: Any) -> bool:
@@ -770,17 +902,6 @@ def _is_balanced_pair(left: Any, right: Any) -> bool:
     return _same_abs_quantity(left, right) and (_quantity(left) * _quantity(right) < 0)
 
 
-def _is_butterfly_ratio(legs: Sequence[Any]) -> bool:
-    ordered = sorted(legs, key=_strike_sort_key)
-    qtys = [abs(_quantity(leg)) for leg in ordered]
-    if min(qtys) <= 0:
-        return False
-    smallest = min(qtys)
-    normalized = [round(qty / smallest, 6) for qty in qtys]
-    signs = [1 if _quantity(leg) > 0 else -1 for leg in ordered]
-    return (normalized == [1.0, 2.0, 1.0] and signs in ([1, -1, 1], [-1, 1, -1]))
-
-
 def _vertical_strategy_name(left: Any, right: Any) -> str | None:
     if _right(left) != _right(right) or _expiry(left) != _expiry(right) or not _is_balanced_pair(left, right):
         return None
@@ -6,6 +6,7 @@ owns the data and emits change signals.  No raw lists-of-dicts in the view.
 from __future__ import annotations
 
 import dataclasses
+from bisect import bisect_left
 from collections import defaultdict
 from datetime import date
 from typing import Any
@@ -26,6 +27,19 @@ _POS_HEADERS = [
 # Column indices for the Greeks (used in group row rendering)
 _COL_DELTA, _COL_GAMMA, _COL_THETA, _COL_VEGA, _COL_IV, _COL_SPX = 13, 14, 15, 16, 17, 18
 
+# PositionRow field → columns that render it (drives column-limited dataChanged).
+_POS_FIELD_COLS: dict[str, tuple[int, ...]] = {
+    "symbol": (0,), "sec_type": (1,), "underlying": (2,), "quantity": (3,), "avg_cost": (4,),
+    "market_price": (5,), "market_value": (6,), "unrealized_pnl": (7,), "underlying_price": (8,),
+    "strike": (9,), "right": (10,), "expiry": (11, 12),
+    "delta": (_COL_DELTA,), "gamma": (_COL_GAMMA,), "theta": (_COL_THETA,), "vega": (_COL_VEGA,),
+    "iv": (_COL_IV,), "spx_delta": (_COL_SPX,),
+}
+_GROUP_FIELD_COLS: dict[str, tuple[int, ...]] = {
+    "count": (0,), "delta": (_COL_DELTA,), "gamma": (_COL_GAMMA,), "theta": (_COL_THETA,),
+    "vega": (_COL_VEGA,), "spx_delta": (_COL_SPX,),
+}
+
 # Background colour used for expiry-group header rows
 _GROUP_BG  = QColor(30, 50, 80)    # dark blue
 _GROUP_FG  = QColor(200, 220, 255)  # light text
@@ -56,6 +70,7 @@ class PositionsTableModel(QAbstractTableModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._rows: list[Any] = []  # mix of PositionRow and _ExpiryGroupRow
+        self._keys: list[tuple] = []  # parallel to _rows; see _position_row_keys
         self._sort_metric: str = "none"
         self._sort_desc: bool = True
         self._sort_abs: bool = True
@@ -63,14 +78,22 @@ class PositionsTableModel(QAbstractTableModel):
     # ── public ────────────────────────────────────────────────────────────
 
     def set_data(self, rows: list) -> None:
-        """Rebuild display list: options grouped by expiry, then stocks/futures."""
-        self.beginResetModel()
-
+        """Show *rows*: options grouped by expiry, then stocks/futures.
+
+        Rows are keyed by (conId, expiry group), so a refresh is applied as a
+        diff: rows that disappeared are removed, new ones inserted, reordering
+        goes through a layout change, and surviving rows only emit dataChanged
+        for the columns whose values changed.  Selection and scroll position
+        survive refreshes.
+        """
         if self._sort_metric != "none":
-            self._rows = self._sort_rows(rows)
-            self.endResetModel()
-            return
+            display = self._sort_rows(rows)
+        else:
+            display = self._group_by_expiry(rows)
+        self._apply_display(display)
 
+    @staticmethod
+    def _group_by_expiry(rows: list) -> list[Any]:
         options = [r for r in rows if getattr(r, "sec_type", "") in ("OPT", "FOP")]
         non_options = [r for r in rows if getattr(r, "sec_type", "") not in ("OPT", "FOP")]
 
@@ -101,9 +124,70 @@ class PositionsTableModel(QAbstractTableModel):
 
         # Non-options (stocks/futures) at end
         display.extend(non_options)
+        return display
+
+    def _apply_display(self, display: list[Any]) -> None:
+        new_keys = _position_row_keys(display)
+        if not self._rows or not display:
+            # Nothing to preserve: a reset is the cheapest correct update.
+            self.beginResetModel()
+            self._rows = list(display)
+            self._keys = new_keys
+            self.endResetModel()
+            return
 
-        self._rows = display
-        self.endResetModel()
+        # 1. Remove rows whose key is gone (contiguous runs, bottom-up).
+        wanted = set(new_keys)
+        gone = [i for i, key in enumerate(self._keys) if key not in wanted]
+        for first, last in reversed(_index_runs(gone)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first:last + 1]
+            del self._keys[first:last + 1]
+            self.endRemoveRows()
+
+        # 2. Reorder survivors to their new relative order (e.g. metric sorting).
+        new_pos = {key: i for i, key in enumerate(new_keys)}
+        reordered = sorted(range(len(self._keys)), key=lambda i: new_pos[self._keys[i]])
+        if reordered != list(range(len(self._keys))):
+            self.layoutAboutToBeChanged.emit()
+            old_keys = self._keys
+            self._rows = [self._rows[i] for i in reordered]
+            self._keys = [old_keys[i] for i in reordered]
+            moved_to = {key: i for i, key in enumerate(self._keys)}
+            persistent = self.persistentIndexList()
+            self.changePersistentIndexList(
+                persistent,
+                [self.index(moved_to[old_keys[idx.row()]], idx.column()) for idx in persistent],
+            )
+            self.layoutChanged.emit()
+
+        # 3. Insert new keys in runs at their final positions.
+        survivors = set(self._keys)
+        i = 0
+        while i < len(new_keys):
+            if new_keys[i] in survivors:
+                i += 1
+                continue
+            run_end = i
+            while run_end < len(new_keys) and new_keys[run_end] not in survivors:
+                run_end += 1
+            self.beginInsertRows(QModelIndex(), i, run_end - 1)
+            self._rows[i:i] = display[i:run_end]
+            self._keys[i:i] = new_keys[i:run_end]
+            self.endInsertRows()
+            i = run_end
+
+        # 4. Swap in the new row objects; notify only columns that changed.
+        changes: list[tuple[int, list[int]]] = []
+        for row_idx, (old, new) in enumerate(zip(self._rows, display)):
+            if old is not new:
+                cols = _changed_position_columns(old, new)
+                if cols:
+                    changes.append((row_idx, cols))
+        self._rows = list(display)
+        for row_idx, cols in changes:
+            for first, last in _index_runs(cols):
+                self.dataChanged.emit(self.index(row_idx, first), self.index(row_idx, last))
 
     def set_sorting(self, metric: str = "none", *, descending: bool = True, absolute: bool = True) -> None:
         self._sort_metric = (metric or "none").strip().lower()
@@ -168,7 +252,7 @@ class PositionsTableModel(QAbstractTableModel):
         )
         is_estimated_greeks = (
             getattr(row, "sec_type", "") in ("OPT", "FOP")
-            and getattr(row, "greeks_source", None) == "estimated_bsm"
+            and str(getattr(row, "greeks_source", None) or "").startswith("estimated_")
         )
         
         if role == Qt.ItemDataRole.BackgroundRole:
@@ -264,6 +348,50 @@ class PositionsTableModel(QAbstractTableModel):
             case _: return ""
 
 
+def _position_row_keys(display: list[Any]) -> list[tuple]:
+    """Stable identity per display row: (conId, expiry group) or the group header."""
+    keys: list[tuple] = []
+    seen: dict[tuple, int] = defaultdict(int)
+    for row in display:
+        if isinstance(row, _ExpiryGroupRow):
+            key: tuple = ("group", row.expiry)
+        else:
+            key = ("position", getattr(row, "conid", None), getattr(row, "expiry", None) or "")
+        seen[key] += 1
+        keys.append(key + (seen[key],) if seen[key] > 1 else key)
+    return keys
+
+
+def _changed_position_columns(old: Any, new: Any) -> list[int]:
+    if isinstance(new, _ExpiryGroupRow):
+        field_cols = _GROUP_FIELD_COLS
+    else:
+        field_cols = _POS_FIELD_COLS
+        # Row colour/italics depend on these, so repaint the whole row.
+        if (
+            getattr(old, "sec_type", None) != getattr(new, "sec_type", None)
+            or getattr(old, "greeks_source", None) != getattr(new, "greeks_source", None)
+            or (getattr(old, "delta", None) is None) != (getattr(new, "delta", None) is None)
+        ):
+            return list(range(len(_POS_HEADERS)))
+    cols: set[int] = set()
+    for name, field_columns in field_cols.items():
+        if getattr(old, name, None) != getattr(new, name, None):
+            cols.update(field_columns)
+    return sorted(cols)
+
+
+def _index_runs(indices: list[int]) -> list[tuple[int, int]]:
+    """Collapse sorted *indices* into inclusive (first, last) runs."""
+    runs: list[tuple[int, int]] = []
+    for idx in indices:
+        if runs and idx == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], idx)
+        else:
+            runs.append((idx, idx))
+    return runs
+
+
 # ── Option Chain ──────────────────────────────────────────────────────────
 
 _CHAIN_CALL_HEADERS = ["Bid", "Ask", "Last", "Vol", "OI", "IV", "Δ", "Γ"]
@@ -271,6 +399,14 @@ _CHAIN_CENTER       = ["Strike"]
 _CHAIN_PUT_HEADERS  = ["Δ", "Γ", "IV", "OI", "Vol", "Last", "Ask", "Bid"]
 CHAIN_HEADERS       = _CHAIN_CALL_HEADERS + _CHAIN_CENTER + _CHAIN_PUT_HEADERS
 
+# ChainRow field → column offset within its side (see _format_chain_cell).
+_CHAIN_CALL_FIELD_COLS = {
+    "bid": 0, "ask": 1, "last": 2, "volume": 3, "open_interest": 4, "iv": 5, "delta": 6, "gamma": 7,
+}
+_CHAIN_PUT_FIELD_COLS = {
+    "delta": 0, "gamma": 1, "iv": 2, "open_interest": 3, "volume": 4, "last": 5, "ask": 6, "bid": 7,
+}
+
 
 class ChainTableModel(QAbstractTableModel):
     """Options chain matrix: calls on the left, puts on the right, strikes in the middle.
@@ -284,31 +420,49 @@ class ChainTableModel(QAbstractTableModel):
         self._rows: list[tuple] = []  # (ChainRow|None, float, ChainRow|None)
         self._underlying_price: float | None = None
         self._underlying_row_idx: int | None = None
+        self._strikes: list[float] = []  # parallel to _rows, ascending
+        self._conid_pos: dict[int, tuple[int, str]] = {}  # conid → (row, 'C'|'P')
 
     def set_underlying_price(self, price: float | None) -> None:
+        """Move the ATM marker; only the rows whose styling changes are repainted.
+
+        A tick that keeps the same nearest strike refreshes just that row's
+        tooltip; a tick that crosses to a new strike repaints the old and new
+        marker rows.
+        """
         self._underlying_price = float(price) if isinstance(price, (int, float)) else None
+        old_idx = self._underlying_row_idx
         self._recompute_underlying_row_idx()
-        if self.rowCount() > 0 and self.columnCount() > 0:
-            self.dataChanged.emit(
-                self.index(0, 0),
-                self.index(self.rowCount() - 1, self.columnCount() - 1),
-                [
-                    Qt.ItemDataRole.BackgroundRole,
-                    Qt.ItemDataRole.ForegroundRole,
-                    Qt.ItemDataRole.FontRole,
-                    Qt.ItemDataRole.ToolTipRole,
-                ],
-            )
+        new_idx = self._underlying_row_idx
+        if old_idx == new_idx:
+            if new_idx is not None:
+                self._emit_row_changed(new_idx, [Qt.ItemDataRole.ToolTipRole])
+            return
+        roles = [
+            Qt.ItemDataRole.BackgroundRole,
+            Qt.ItemDataRole.ForegroundRole,
+            Qt.ItemDataRole.FontRole,
+            Qt.ItemDataRole.ToolTipRole,
+        ]
+        for row_idx in (old_idx, new_idx):
+            if row_idx is not None and row_idx < len(self._rows):
+                self._emit_row_changed(row_idx, roles)
+
+    def _emit_row_changed(self, row_idx: int, roles: list) -> None:
+        self.dataChanged.emit(self.index(row_idx, 0), self.index(row_idx, self.columnCount() - 1), roles)
 
     def _recompute_underlying_row_idx(self) -> None:
-        if self._underlying_price is None or not self._rows:
+        if self._underlying_price is None or not self._strikes:
             self._underlying_row_idx = None
             return
-        underlying_price = float(self._underlying_price)
-        self._underlying_row_idx = min(
-            range(len(self._rows)),
-            key=lambda idx: abs(float(self._rows[idx][1]) - underlying_price),
-        )
+        price = float(self._underlying_price)
+        # Nearest strike by bisection; ties go to the lower strike.
+        idx = bisect_left(self._strikes, price)
+        if idx >= len(self._strikes):
+            idx = len(self._strikes) - 1
+        elif idx > 0 and price - self._strikes[idx - 1] <= self._strikes[idx] - price:
+            idx -= 1
+        self._underlying_row_idx = idx
 
     def set_data(self, chain_rows: list) -> None:
         """Organize flat ChainRow list into call/put pairs per strike."""
@@ -326,9 +480,47 @@ class ChainTableModel(QAbstractTableModel):
             (by_strike[s]["C"], s, by_strike[s]["P"])
             for s in sorted(by_strike.keys())
         ]
+        self._strikes = [float(strike) for _call, strike, _put in self._rows]
+        self._conid_pos = {}
+        for row_idx, (call, _strike, put) in enumerate(self._rows):
+            for side, cr in (("C", call), ("P", put)):
+                conid = int(getattr(cr, "conid", 0) or 0)
+                if conid > 0:
+                    self._conid_pos[conid] = (row_idx, side)
         self._recompute_underlying_row_idx()
         self.endResetModel()
 
+    def update_rows(self, chain_rows: list) -> int:
+        """Replace rows in place by conid and emit ``dataChanged`` for changed cells only.
+
+        Unlike :meth:`set_data` this never resets the model, so selection and
+        scroll position survive streaming updates.  Rows whose conid is not
+        displayed are ignored.  Returns the number of rows that changed.
+        """
+        n_call = len(_CHAIN_CALL_HEADERS)
+        put_base = n_call + len(_CHAIN_CENTER)
+        changed = 0
+        for cr in chain_rows:
+            pos = self._conid_pos.get(int(getattr(cr, "conid", 0) or 0))
+            if pos is None:
+                continue
+            row_idx, side = pos
+            call, strike, put = self._rows[row_idx]
+            old = call if side == "C" else put
+            field_cols = _CHAIN_CALL_FIELD_COLS if side == "C" else _CHAIN_PUT_FIELD_COLS
+            cols = [col for field, col in field_cols.items() if getattr(old, field, None) != getattr(cr, field, None)]
+            self._rows[row_idx] = (cr, strike, put) if side == "C" else (call, strike, cr)
+            if not cols:
+                continue
+            base = 0 if side == "C" else put_base
+            changed += 1
+            self.dataChanged.emit(
+                self.index(row_idx, base + min(cols)),
+                self.index(row_idx, base + max(cols)),
+                [Qt.ItemDataRole.DisplayRole],
+            )
+        return changed
+
     def rowCount(self, parent=QModelIndex()) -> int:
         return len(self._rows)
 
@@ -50,6 +50,7 @@ class TradeGroupsModel(QAbstractTableModel):
         super().__init__(parent)
         self._rows: list[_TradeRow] = []
         self._groups: list[StrategyGroup] = []
+        self._reconstructor = StrategyReconstructor()
         self._sort_metric: str = "none"
         self._sort_desc: bool = True
         self._sort_abs: bool = True
@@ -60,11 +61,15 @@ class TradeGroupsModel(QAbstractTableModel):
         self._sort_abs = bool(absolute)
 
     def set_data(self, positions: list, *, account_id: str | None = None) -> None:
+        if self._reconstructor.account_id != (account_id or "").strip():
+            self._reconstructor = StrategyReconstructor(account_id=account_id)
+        self.set_groups(self._reconstructor.reconstruct(positions or []) if positions else [])
+
+    def set_groups(self, groups: list[StrategyGroup]) -> None:
+        """Show already-reconstructed *groups* (e.g. from ``IBEngine.strategies_updated``)."""
         self.beginResetModel()
         self._rows = []
-        reconstructor = StrategyReconstructor(account_id=account_id)
-        self._groups = reconstructor.reconstruct(positions or []) if positions else []
-        self._groups = self._sort_groups(self._groups)
+        self._groups = self._sort_groups(list(groups))
         for group in self._groups:
             self._rows.append(_TradeRow(is_header=True, group=group))
             for idx, leg in enumerate(group.legs):
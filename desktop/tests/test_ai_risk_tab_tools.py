@@ -449,6 +449,26 @@ async def test_tool_get_portfolio_greeks_prefers_cached_db_aggregates(ai_risk_ta
     mock_engine.refresh_positions.assert_not_awaited()
 
 
+@pytest.mark.asyncio
+async def test_positions_update_reseeds_positions_used_by_greeks_tool(ai_risk_tab, mock_engine):
+    """Test positions_updated replaces cached positions instead of leaving them stale."""
+    row = PositionRow(
+        conid=456, symbol="MES", sec_type="FOP", underlying="MES", strike=5700, right="C",
+        expiry="20260320", quantity=-2, avg_cost=25.0, market_price=23.0, market_value=-4600.0,
+        unrealized_pnl=400.0, realized_pnl=0.0, delta=-65.0, gamma=0.2, theta=-25.0, vega=16.6,
+        iv=0.20, spx_delta=-6.5,
+    )
+    mock_engine.refresh_positions = AsyncMock(return_value=[row])
+    await ai_risk_tab._tool_get_portfolio_greeks()
+
+    ai_risk_tab._on_positions_updated([row, row])
+    second = await ai_risk_tab._tool_get_portfolio_greeks()
+
+    assert second["total_gamma"] == pytest.approx(0.4)
+    mock_engine.refresh_positions.assert_awaited_once()
+    assert ai_risk_tab.tool_cache_stats()["invalidations"] == 1
+
+
 @pytest.mark.asyncio
 async def test_tool_get_portfolio_metrics(ai_risk_tab, mock_engine):
     """Test aggregate portfolio metrics tool combines positions and account data."""
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import pytest
+
+from desktop.engine.bounded_cache import BoundedCache, approx_size
+from desktop.engine.ib_engine import IBEngine
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@dataclass
+class _Row:
+    strike: float
+    bid: float | None = None
+    note: str = ""
+
+
+def test_lru_eviction_by_entry_count_respects_recent_use():
+    cache = BoundedCache("t", max_entries=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1  # a becomes most recently used
+    cache["c"] = 3
+
+    assert "b" not in cache
+    assert set(cache) == {"a", "c"}
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_ttl_expiry_counts_and_skips_expired_entries():
+    clock = _Clock()
+    cache = BoundedCache("t", ttl_s=60, clock=clock)
+    cache["old"] = (clock.now, [1])
+    clock.now += 30
+    cache["new"] = (clock.now, [2])
+    clock.now += 45
+
+    assert cache.get("old") is None
+    assert [k for k, _v in cache.items()] == ["new"]
+    assert cache.stats()["expirations"] == 1
+
+
+def test_byte_budget_evicts_oldest_and_keeps_single_oversized_value():
+    rows = [_Row(strike=float(k), bid=1.0, note="x" * 20) for k in range(100)]
+    per_value = approx_size(rows)
+    cache = BoundedCache("chains", max_bytes=int(per_value * 2.5))
+    for key in "abc":
+        cache[key] = list(rows)
+
+    assert list(cache) == ["b", "c"]
+    assert cache.nbytes <= cache.max_bytes
+
+    tiny = BoundedCache("tiny", max_bytes=10)
+    tiny["big"] = rows
+    assert "big" in tiny and len(tiny) == 1
+
+
+def test_engine_caches_are_bounded_and_report_stats():
+    engine = IBEngine()
+    engine._chain_cache["SPY|20260618|OPT|SMART"] = (0.0, [_Row(strike=500.0)])
+    assert engine.chain_snapshot()[0].strike == 500.0
+
+    names = {s["name"] for s in engine.cache_stats()}
+    assert names == {"chains", "chain_skeletons", "expiries", "greeks", "last_prices"}
+    assert all(s["max_bytes"] or s["max_entries"] for s in engine.cache_stats())
+    assert approx_size([]) > 0
+    with pytest.raises(KeyError):
+        engine._greeks_cache[123]
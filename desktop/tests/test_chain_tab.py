@@ -5,9 +5,17 @@ Verifies:
   - Sec type ↔ exchange auto-sync
   - Chain table populates from signal
   - Double-click emits chain_row_selected signal
+  - Live chain ticks update cells in place
 """
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
 from PySide6.QtCore import Qt, QModelIndex
 from PySide6.QtWidgets import QComboBox
 
@@ -78,10 +86,10 @@ class TestChainTabLayout:
         qtbot.addWidget(tab)
         assert tab._cmb_sd_range.currentText() in {"±1σ", "±2σ", "±3σ"}
 
-    def test_stream_refresh_interval_is_5_seconds(self, qtbot, mock_engine):
+    def test_live_updates_are_event_driven(self, qtbot, mock_engine):
         tab = ChainTab(mock_engine)
         qtbot.addWidget(tab)
-        assert tab._stream_timer.interval() == 5_000
+        assert not hasattr(tab, "_stream_timer")
 
     def test_table_starts_empty(self, qtbot, mock_engine):
         tab = ChainTab(mock_engine)
@@ -230,6 +238,70 @@ class TestChainTabData:
         assert tab._model.rowCount() == 0
 
 
+class TestChainTabStreaming:
+    """Live chain ticks update cells in place without resetting the model."""
+
+    def _ticked_engine(self, mock_engine, bid_by_conid: dict[int, float]):
+        def _read(rows):
+            return [
+                dataclasses.replace(r, bid=bid_by_conid.get(r.conid, r.bid))
+                for r in rows
+            ]
+        mock_engine.read_chain_from_live_tickers = MagicMock(side_effect=_read)
+        return mock_engine
+
+    def test_chain_ticks_update_only_changed_cells(self, qtbot, mock_engine):
+        tab = ChainTab(mock_engine)
+        qtbot.addWidget(tab)
+        mock_engine.chain_ready.emit(_sample_chain_rows())
+        self._ticked_engine(mock_engine, {55001: 10.75})
+
+        resets: list[int] = []
+        changes: list[tuple[int, int, int, int]] = []
+        tab._model.modelReset.connect(lambda: resets.append(1))
+        tab._model.dataChanged.connect(
+            lambda tl, br, _roles=None: changes.append((tl.row(), tl.column(), br.row(), br.column()))
+        )
+
+        mock_engine.chain_ticks.emit([55001, 55002])
+
+        assert resets == []
+        assert changes == [(0, 0, 0, 0)]  # call bid of the 5500 strike only
+        assert "10.75" in str(tab._model.data(tab._model.index(0, 0)))
+        assert tab._full_chain_rows[0].bid == 10.75
+        rows_read = mock_engine.read_chain_from_live_tickers.call_args.args[0]
+        assert [r.conid for r in rows_read] == [55001, 55002]
+
+    def test_chain_ticks_preserve_selection(self, qtbot, mock_engine):
+        tab = ChainTab(mock_engine)
+        qtbot.addWidget(tab)
+        mock_engine.chain_ready.emit(_sample_chain_rows())
+        tab._table.selectRow(1)
+        self._ticked_engine(mock_engine, {56002: 3.5})
+
+        mock_engine.chain_ticks.emit([56002])
+
+        assert [i.row() for i in tab._table.selectionModel().selectedRows()] == [1]
+        assert "3.50" in str(tab._model.data(tab._model.index(1, 16)))
+
+    @pytest.mark.asyncio
+    async def test_engine_coalesces_pending_tickers_into_one_emission(self, mock_engine):
+        contract = SimpleNamespace(conId=55001)
+        mock_engine._chain_tickers = {55001: (contract, MagicMock())}
+        mock_engine._chain_tick_coalesce_s = 0.0
+        emitted: list[list[int]] = []
+        mock_engine.chain_ticks.connect(emitted.append)
+
+        ticker = SimpleNamespace(contract=contract)
+        other = SimpleNamespace(contract=SimpleNamespace(conId=999))
+        mock_engine._on_pending_tickers([ticker, other])
+        mock_engine._on_pending_tickers([ticker])
+        assert emitted == []
+        await asyncio.sleep(0.01)
+
+        assert emitted == [[55001]]
+
+
 class TestChainTabLegClicks:
     """Test single-click bid/ask direct leg staging signal."""
 
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import pickle
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from desktop.engine.compute import ComputeExecutor, compute_portfolio
+from desktop.engine.ib_engine import IBEngine, PositionRow
+from desktop.models.strategy_reconstructor import StrategyReconstructor
+
+
+def _row(conid: int, *, sec_type: str = "OPT", strike: float = 100.0, quantity: float = 1.0, **kw) -> PositionRow:
+    base = dict(
+        conid=conid, symbol="SPY", sec_type=sec_type, underlying="SPY",
+        strike=strike if sec_type == "OPT" else None, right="C" if sec_type == "OPT" else None,
+        expiry="20260417" if sec_type == "OPT" else None, quantity=quantity, avg_cost=1.0,
+        market_price=1.0, market_value=100.0 * quantity, unrealized_pnl=0.0, realized_pnl=0.0,
+        delta=10.0 * quantity, gamma=1.0, theta=-2.0, vega=4.0, iv=0.2, spx_delta=5.0 * quantity,
+    )
+    base.update(kw)
+    return PositionRow(**base)
+
+
+def test_compute_portfolio_aggregates_risk_and_groups():
+    rows = [
+        _row(1, strike=100.0, quantity=1.0),
+        _row(2, strike=105.0, quantity=-1.0),
+        _row(3, sec_type="STK", quantity=10.0, market_value=-50.0),
+    ]
+
+    computed = compute_portfolio(rows, StrategyReconstructor(account_id="U1"))
+
+    assert computed.risk["total_positions"] == 3
+    assert computed.risk["options_count"] == 2 and computed.risk["stocks_count"] == 1
+    assert computed.risk["total_spx_delta"] == pytest.approx(50.0)
+    assert computed.risk["total_delta"] == computed.risk["total_spx_delta"]
+    assert computed.risk["gross_exposure"] == pytest.approx(250.0)
+    assert computed.risk["net_exposure"] == pytest.approx(-50.0)
+    assert computed.native_total_delta == pytest.approx(100.0)
+    assert "Bull Call Spread" in {g.strategy_name for g in computed.groups}
+
+
+def test_compute_result_survives_a_process_boundary():
+    computed = compute_portfolio([_row(1), _row(2, strike=105.0, quantity=-1.0)], StrategyReconstructor())
+
+    restored = pickle.loads(pickle.dumps(computed))
+
+    assert restored.risk == computed.risk
+    assert [g.association_id for g in restored.groups] == [g.association_id for g in computed.groups]
+    assert restored.reconstructor.detections == 1
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_runs_off_the_loop_thread():
+    executor = ComputeExecutor("thread")
+    try:
+        worker = await executor.run(threading.get_ident)
+    finally:
+        executor.shutdown()
+
+    assert worker != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_engine_disconnect_shuts_down_the_compute_worker():
+    engine = IBEngine()
+    engine._ib = MagicMock()
+    engine._ib.isConnected.return_value = False
+    await engine._compute.run(threading.get_ident)
+    executor = engine._compute._executor
+    assert executor is not None
+
+    await engine.disconnect()
+
+    assert engine._compute._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(threading.get_ident)
+    assert await engine._compute.run(threading.get_ident) != threading.get_ident()
+    engine._compute.shutdown()
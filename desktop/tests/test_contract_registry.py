@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from desktop.engine.contract_registry import ContractRegistry, contract_key, registry_key
+from desktop.engine.ib_engine import IBEngine
+
+
+def _option(strike: float, right: str = "C", conid: int = 0, exchange: str = "SMART"):
+    return SimpleNamespace(
+        conId=conid,
+        symbol="SPY",
+        secType="OPT",
+        lastTradeDateOrContractMonth="20260618",
+        strike=strike,
+        right=right,
+        exchange=exchange,
+        currency="USD",
+        multiplier="100",
+        localSymbol="",
+        tradingClass="SPY",
+    )
+
+
+@pytest.mark.asyncio
+async def test_qualify_only_sends_registry_misses_to_ib():
+    ib = MagicMock()
+    ib.qualifyContractsAsync = AsyncMock(side_effect=lambda *cs: [_option(c.strike, c.right, conid=int(c.strike)) for c in cs])
+    registry = ContractRegistry(lambda: ib)
+
+    first = await registry.qualify([_option(500.0), _option(510.0)])
+    assert [c.conId for c in first] == [500, 510]
+    assert ib.qualifyContractsAsync.await_count == 1
+
+    second = await registry.qualify([_option(500.0), _option(520.0)])
+    assert [c.conId for c in second] == [500, 520]
+    assert ib.qualifyContractsAsync.await_count == 2
+    sent = ib.qualifyContractsAsync.await_args.args
+    assert [c.strike for c in sent] == [520.0]
+    assert registry.hits == 1 and registry.misses == 3
+
+
+@pytest.mark.asyncio
+async def test_qualify_aligns_results_when_ib_drops_contracts():
+    ib = MagicMock()
+    ib.qualifyContractsAsync = AsyncMock(return_value=[_option(510.0, conid=42)])
+    registry = ContractRegistry(lambda: ib)
+
+    results = await registry.qualify([_option(500.0), _option(510.0)])
+
+    assert results[0] is None
+    assert results[1].conId == 42
+    assert len(registry) >= 1
+
+
+def test_drain_and_warm_round_trip():
+    source = ContractRegistry(lambda: None)
+    source.store(_option(500.0, conid=777), key=registry_key("SPY", "20260618", 500.0, "C", "OPT", "SMART"))
+    rows = source.drain_pending()
+    assert rows and all(row["conid"] == 777 for row in rows)
+    assert source.drain_pending() == []
+
+    warmed = ContractRegistry(lambda: None)
+    assert warmed.warm(rows) == len(rows)
+    hit = warmed.lookup(_option(500.0))
+    assert hit is not None and hit.conId == 777
+    assert warmed.lookup(SimpleNamespace(conId=777)).conId == 777
+    assert warmed.drain_pending() == []
+
+
+def test_store_keeps_a_copy_of_the_callers_contract():
+    registry = ContractRegistry(lambda: None)
+    contract = _option(500.0, conid=777)
+    registry.store(contract)
+
+    contract.exchange = "CBOE"
+    contract.tradingClass = ""
+
+    stored = registry.lookup(SimpleNamespace(conId=777))
+    assert stored is not contract
+    assert stored.exchange == "SMART" and stored.tradingClass == "SPY"
+
+
+def test_lookups_hand_out_copies_of_the_stored_contract():
+    registry = ContractRegistry(lambda: None)
+    registry.store(_option(500.0, conid=777))
+
+    by_conid = registry.lookup(SimpleNamespace(conId=777))
+    by_conid.exchange = "CBOE"
+    by_key = registry.lookup_key(contract_key(_option(500.0)))
+    by_key.tradingClass = ""
+
+    fresh = registry.lookup(SimpleNamespace(conId=777))
+    assert fresh is not by_conid and fresh is not by_key
+    assert fresh.exchange == "SMART" and fresh.tradingClass == "SPY"
+
+
+@pytest.mark.asyncio
+async def test_resolve_contracts_reuses_registry_across_calls():
+    engine = IBEngine()
+    engine._ib = MagicMock()
+    engine._db_ok = False
+    engine._chain_cache = {}
+    engine._positions_snapshot = []
+    qualified = _option(450.0, conid=123456)
+    engine._ib.qualifyContractsAsync = AsyncMock(return_value=[qualified])
+    leg = {"symbol": "SPY", "action": "SELL", "qty": 1, "sec_type": "OPT", "expiry": "20260618", "strike": 450.0, "right": "C"}
+
+    first = await engine._resolve_contracts([dict(leg)])
+    second = await engine._resolve_contracts([dict(leg)])
+
+    assert [c.conId for c in first] == [123456]
+    assert [c.conId for c in second] == [123456]
+    assert engine._ib.qualifyContractsAsync.await_count == 1
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from desktop.db.database import (
+    _GREEKS_SERIES,
+    Database,
+    SnapshotRetention,
+    _partition_day,
+    positions_cache_partition_name,
+    timeseries_bucket,
+)
+
+
+def test_partition_names_round_trip_to_their_day():
+    day = date(2026, 3, 9)
+
+    assert positions_cache_partition_name(day) == "positions_cache_p20260309"
+    assert _partition_day(positions_cache_partition_name(day)) == day
+    assert _partition_day("positions_cache_legacy") is None
+    assert _partition_day("positions_cache_p2026") is None
+
+
+def test_retention_policy_reads_env(monkeypatch):
+    monkeypatch.setenv("IB_POSITIONS_CACHE_FULL_HOURS", "6")
+    monkeypatch.setenv("IB_POSITIONS_CACHE_THIN_MINUTES", "15")
+    monkeypatch.setenv("IB_POSITIONS_CACHE_RETENTION_DAYS", "7")
+
+    policy = SnapshotRetention.from_env()
+
+    assert policy == SnapshotRetention(
+        full_history=timedelta(hours=6), thin_bucket=timedelta(minutes=15), max_age=timedelta(days=7),
+    )
+
+
+class _RecordingConn:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, tuple]] = []
+        self.copied: list[tuple[str, list, list]] = []
+
+    async def fetch(self, sql, *args):
+        self.calls.append((sql, args))
+        return []
+
+    async def fetchrow(self, sql, *args):
+        self.calls.append((sql, args))
+        return None
+
+    async def fetchval(self, sql, *args):
+        self.calls.append((sql, args))
+        return True
+
+    async def execute(self, sql, *args):
+        self.calls.append((sql, args))
+        return "INSERT 0 1"
+
+    async def copy_records_to_table(self, table, *, records, columns):
+        self.copied.append((table, list(columns), list(records)))
+
+    def is_in_transaction(self):
+        return False
+
+    def transaction(self):
+        return _NoopTransaction()
+
+    def acquire(self):
+        return _Acquired(self)
+
+
+class _Acquired:
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _NoopTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_legacy_positions_cache_is_copied_in_full_into_daily_partitions():
+    old_day, recent_day = date(2025, 1, 15), datetime.now(timezone.utc).date()
+
+    class _Conn(_RecordingConn):
+        async def fetch(self, sql, *args):
+            self.calls.append((sql, args))
+            return [{"day": old_day}, {"day": recent_day}] if "positions_cache_legacy" in sql else []
+
+        async def fetchval(self, sql, *args):
+            self.calls.append((sql, args))
+            return "r" if "relkind" in sql else False
+
+    db = Database("postgresql://unused")
+    conn = _Conn()
+
+    await db._ensure_positions_cache_table(conn)
+
+    statements = [sql for sql, _ in conn.calls]
+    assert statements[1] == "ALTER TABLE positions_cache RENAME TO positions_cache_legacy"
+    created = [sql for sql in statements if "PARTITION OF positions_cache" in sql]
+    assert any(positions_cache_partition_name(old_day) in sql for sql in created)
+    assert any(positions_cache_partition_name(recent_day) in sql for sql in created)
+    [(insert, insert_args)] = [(sql, args) for sql, args in conn.calls if "INSERT INTO positions_cache" in sql]
+    assert "FROM positions_cache_legacy" in insert and "WHERE" not in insert
+    assert insert_args == ()
+    assert statements[-1] == "DROP TABLE positions_cache_legacy"
+
+
+@pytest.mark.asyncio
+async def test_compaction_drops_expired_days_and_thins_older_history():
+    now = datetime(2026, 3, 31, 12, 0, tzinfo=timezone.utc)
+    latest_at = now - timedelta(days=40)
+    days = [latest_at.date(), (now - timedelta(days=35)).date(), (now - timedelta(days=1)).date()]
+
+    class _Conn(_RecordingConn):
+        async def fetch(self, sql, *args):
+            self.calls.append((sql, args))
+            if "FROM latest_snapshot" in sql:
+                return [{"snapshot_id": "snap-latest", "cached_at": latest_at}]
+            if "pg_inherits" in sql:
+                return [{"relname": positions_cache_partition_name(day)} for day in days]
+            return []
+
+        async def execute(self, sql, *args):
+            self.calls.append((sql, args))
+            return "DELETE 4" if sql.lstrip().startswith("DELETE") else "DROP TABLE"
+
+    db = Database("postgresql://unused")
+    db._pool = conn = _Conn()
+    retention = SnapshotRetention(
+        full_history=timedelta(hours=24), thin_bucket=timedelta(hours=1), max_age=timedelta(days=30),
+    )
+
+    result = await db.compact_positions_cache(retention, now=now)
+
+    assert result == {"thinned_rows": 4, "expired_rows": 4, "dropped_partitions": 1}
+    drops = [sql for sql, _ in conn.calls if sql.startswith("DROP TABLE")]
+    assert drops == [f"DROP TABLE IF EXISTS {positions_cache_partition_name(days[1])}"]
+    expired_args, thinned_args = [args for sql, args in conn.calls if sql.lstrip().startswith("DELETE")]
+    assert expired_args == (now - timedelta(days=30), ["snap-latest"])
+    assert thinned_args == (now - timedelta(days=30), now - timedelta(hours=24), ["snap-latest"], 3600.0)
+
+
+@pytest.mark.asyncio
+async def test_ensure_schema_skips_indexes_for_tables_it_does_not_own():
+    class _Conn(_RecordingConn):
+        async def fetchval(self, sql, *args):
+            self.calls.append((sql, args))
+            if "relkind" in sql:
+                return "p"
+            return "account_snapshots" not in sql and "risk_snapshots" not in sql
+
+    db = Database("postgresql://unused")
+    db._pool = conn = _Conn()
+
+    await db.ensure_schema()
+
+    statements = [sql for sql, _ in conn.calls]
+    assert any("to_regclass('account_snapshots')" in sql for sql in statements)
+    assert not any("ON account_snapshots" in sql for sql in statements)
+    assert any("to_regclass('risk_snapshots')" in sql for sql in statements)
+    assert not any("ON risk_snapshots" in sql for sql in statements)
+
+
+@pytest.mark.asyncio
+async def test_cache_readers_use_range_predicates_on_the_raw_column():
+    db = Database("postgresql://unused")
+    db._pool = conn = _RecordingConn()
+
+    await db.get_cached_positions("U1", max_age_seconds=60)
+    await db.get_cached_positions_by_date("U1", max_age_seconds=60)
+    await db.get_cached_portfolio_greeks("U1", max_age_seconds=60)
+    await db.get_cached_portfolio_metrics("U1", max_age_seconds=60)
+    await db.get_cached_account_snapshot("U1", max_age_seconds=60)
+
+    assert len(conn.calls) == 5
+    for sql, args in conn.calls:
+        assert "EXTRACT" not in sql
+        assert any(isinstance(arg, datetime) for arg in args)
+    assert all("latest_snapshot" in sql for sql, _ in conn.calls[:2])
+
+
+@pytest.mark.asyncio
+async def test_positions_snapshot_write_moves_the_latest_pointer():
+    db = Database("postgresql://unused")
+    conn = _RecordingConn()
+
+    written = await db.cache_positions_snapshot("U1", "snap-1", [{"conid": 1, "symbol": "SPY", "quantity": 1}], conn=conn)
+
+    assert written == 1
+    sql, args = conn.calls[-1]
+    assert "INSERT INTO latest_snapshot" in sql
+    assert args[:3] == ("U1", "positions", "snap-1")
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_copy_into_a_staging_table_then_upsert_once():
+    db = Database("postgresql://unused")
+    conn = _RecordingConn()
+    rows = [{"conid": conid, "symbol": "SPY", "quantity": 1} for conid in range(1000)]
+    rows.append({"conid": 7, "symbol": "SPY", "quantity": -3})
+
+    written = await db.upsert_positions("U1", rows, conn=conn)
+
+    assert written == 1000
+    [(stage, columns, records)] = conn.copied
+    assert stage == "_stage_positions" and columns[:2] == ["account_id", "conid"]
+    assert [rec[columns.index("quantity")] for rec in records if rec[1] == 7] == [-3.0]
+    statements = [sql for sql, _ in conn.calls]
+    assert len(statements) == 3
+    assert statements[0].startswith("CREATE TEMP TABLE _stage_positions ON COMMIT DROP")
+    assert "ON CONFLICT (account_id, conid) DO UPDATE SET" in statements[1]
+    assert "exchange = EXCLUDED" not in statements[1]
+
+
+def test_bucket_ladder_keeps_windows_under_the_point_budget():
+    assert timeseries_bucket(timedelta(hours=6), 1000) == timedelta(minutes=1)
+    assert timeseries_bucket(timedelta(days=7), 1000) == timedelta(minutes=15)
+    assert timeseries_bucket(timedelta(days=30), 1000) == timedelta(hours=1)
+    assert timeseries_bucket(timedelta(days=365), 1000) == timedelta(days=1)
+    assert timeseries_bucket(timedelta(days=3650), 10) == timedelta(days=1)
+
+
+@pytest.mark.asyncio
+async def test_long_windows_read_rollups_and_aggregate_only_the_newest_bucket_live():
+    end = datetime(2026, 3, 31, 12, 30, tzinfo=timezone.utc)
+    start = end - timedelta(days=30)
+    hours = [end.replace(minute=0) - timedelta(hours=n) for n in range(3)]
+
+    class _Conn(_RecordingConn):
+        async def fetch(self, sql, *args):
+            self.calls.append((sql, args))
+            if "timeseries_rollup" in sql:
+                return [
+                    {"account_id": "U1", "bucket_start": h, "samples": 60, "stats": json.dumps({"total_delta": float(n)})}
+                    for n, h in enumerate(hours)
+                ]
+            return [{"account_id": "U1", "cached_at": hours[0], "samples": 31, "total_delta": -1.0}]
+
+    db = Database("postgresql://unused")
+    db._pool = conn = _Conn()
+
+    rows = await db.get_downsampled_timeseries(_GREEKS_SERIES, "U1", start, end, max_points=1000)
+
+    assert [(r["cached_at"], r["total_delta"]) for r in rows] == [
+        (hours[0], -1.0), (hours[1], 1.0), (hours[2], 2.0),
+    ]
+    rollup_args, live_args = conn.calls[0][1], conn.calls[1][1]
+    assert rollup_args == ("portfolio_greeks", "hour", start, end, "U1")
+    # The newest rollup bucket is re-aggregated live, per account.
+    assert live_args == (start, end, 3600.0, ["U1"], [hours[0]], "U1")
+
+
+@pytest.mark.asyncio
+async def test_rollup_refresh_resumes_each_account_from_its_own_newest_bucket():
+    class _Conn(_RecordingConn):
+        async def fetchval(self, sql, *args):
+            self.calls.append((sql, args))
+            return args[0] != "account_snapshots"
+
+    db = Database("postgresql://unused")
+    db._pool = conn = _Conn()
+
+    written = await db.refresh_timeseries_rollups()
+
+    assert set(written) == {
+        f"{name}:{res}"
+        for name in ("portfolio_greeks", "portfolio_metrics", "risk_snapshots")
+        for res in ("hour", "day")
+    }
+    inserts = [sql for sql, _ in conn.calls if "INSERT INTO timeseries_rollup" in sql]
+    assert len(inserts) == 6
+    for sql in inserts:
+        assert "max(bucket_start) AS resume_at" in sql and "GROUP BY account_id" in sql
+        assert "LEFT JOIN resume r ON r.account_id = s.account_id" in sql
+    assert any("s.timestamp >= r.resume_at" in sql for sql in inserts)
+
+
+@pytest.mark.asyncio
+async def test_bucketed_snapshots_read_rollups_and_carry_account_values_forward():
+    end = datetime(2026, 3, 31, 0, 0, tzinfo=timezone.utc)
+    start = end - timedelta(days=60)
+    days = [start + timedelta(days=n) for n in range(4)]
+
+    def _rollup(account, day, stats):
+        return {"account_id": account, "bucket_start": day, "samples": 24, "stats": json.dumps(stats)}
+
+    class _Conn(_RecordingConn):
+        async def fetch(self, sql, *args):
+            self.calls.append((sql, args))
+            if "FROM timeseries_rollup" in sql and args[0] == "risk_snapshots":
+                return [
+                    _rollup("U1", days[n], {"spx_delta": 10.0 + n, "spx_delta_min": 5.0, "theta": -5.0, "vega": 2.0})
+                    for n in range(4)
+                ][::-1]
+            if "FROM timeseries_rollup" in sql and args[0] == "account_snapshots":
+                return [_rollup("U1", days[1], {"net_liquidation": 101.0, "total_cash": 9.0}), _rollup("U1", days[0], {"net_liquidation": 100.0})]
+            if "CROSS JOIN LATERAL" in sql:
+                return [{"account_id": "U1", "net_liquidation": 99.0, "total_cash": 8.0}]
+            if "FROM account_snapshots s" in sql:  # newest account bucket, re-aggregated from raw rows
+                return [{"account_id": "U1", "cached_at": days[1], "samples": 3, "net_liquidation": 101.0, "total_cash": 9.0}]
+            return []  # no raw risk rows after the newest rollup bucket
+
+    db = Database("postgresql://unused")
+    db._pool = conn = _Conn()
+
+    rows = await db.query_snapshots(
+        start_dt=start.isoformat(), end_dt=end.isoformat(), account_id="U1", max_points=1000,
+    )
+
+    assert [r["captured_at"] for r in rows] == days[:3]  # newest rollup bucket comes from raw rows
+    assert [r["net_liquidation"] for r in rows] == [100.0, 101.0, 101.0]
+    assert [r["cash_balance"] for r in rows] == [8.0, 9.0, 9.0]
+    assert rows[0]["spx_delta"] == 10.0 and rows[0]["spx_delta_min"] == 5.0
+    assert rows[0]["delta_theta_ratio"] == pytest.approx(-0.5)
+    sources = [args[0] for sql, args in conn.calls if "FROM timeseries_rollup" in sql]
+    assert sources == ["risk_snapshots", "account_snapshots"]
+    assert not any("DISTINCT ON" in sql for sql, _ in conn.calls)
+
+
+@pytest.mark.asyncio
+async def test_query_snapshots_pairs_account_rows_with_one_as_of_pass():
+    db = Database("postgresql://unused")
+    db._pool = conn = _RecordingConn()
+
+    await db.query_snapshots(start_dt="2026-03-01T00:00:00Z", account_id="U1", limit=500)
+
+    [(sql, args)] = conn.calls
+    assert "LATERAL" not in sql
+    assert "PARTITION BY account_id, acct_seq" in sql
+    assert args[1:] == ("U1", 500)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from desktop.engine.greeks_engine import GreeksEngine
+
+
+VALUATION = date(2026, 1, 2)
+
+
+def test_estimate_batch_matches_scalar_black_scholes():
+    engine = GreeksEngine(risk_free_rate=0.03)
+    legs = [
+        (600.0, 580.0, date(2026, 3, 20), "C", 0.18),
+        (600.0, 620.0, date(2026, 2, 20), "P", 0.22),
+        (150.0, 150.0, date(2026, 6, 18), "C", 0.35),
+    ]
+
+    batch = engine.estimate_batch(
+        underlying_price=[leg[0] for leg in legs],
+        strike=[leg[1] for leg in legs],
+        expiry=[leg[2] for leg in legs],
+        right=[leg[3] for leg in legs],
+        iv=[leg[4] for leg in legs],
+        valuation_date=VALUATION,
+    )
+
+    assert len(batch) == 3
+    for index, (s, k, exp, right, iv) in enumerate(legs):
+        scalar = engine.estimate(underlying_price=s, strike=k, expiry=exp, right=right, iv=iv, valuation_date=VALUATION)
+        row = batch.row(index)
+        assert scalar is not None and row is not None
+        assert row.source == "estimated_bsm"
+        assert row.delta == pytest.approx(scalar.delta, abs=1e-6)
+        assert row.gamma == pytest.approx(scalar.gamma, rel=1e-6)
+        assert row.theta == pytest.approx(scalar.theta, rel=1e-5)
+        assert row.vega == pytest.approx(scalar.vega, rel=1e-6)
+
+
+def test_estimate_batch_uses_black76_for_futures_options():
+    engine = GreeksEngine(risk_free_rate=0.04)
+    batch = engine.estimate_batch(
+        underlying_price=[6000.0, 6000.0],
+        strike=[6000.0, 6000.0],
+        expiry=[date(2026, 4, 2), date(2026, 4, 2)],
+        right=["C", "P"],
+        iv=[0.16, 0.16],
+        sec_type=["FOP", "FOP"],
+        valuation_date=VALUATION,
+    )
+
+    call, put = batch.row(0), batch.row(1)
+    assert call is not None and put is not None
+    assert call.source == put.source == "estimated_black76"
+    # Black-76 deltas satisfy call - put = exp(-rT).
+    discount = np.exp(-0.04 * 90 / 365.0)
+    assert call.delta - put.delta == pytest.approx(discount, abs=1e-6)
+    assert call.gamma == pytest.approx(put.gamma)
+    assert call.vega == pytest.approx(put.vega)
+
+
+def test_estimate_batch_marks_unpriceable_rows_invalid():
+    engine = GreeksEngine()
+    batch = engine.estimate_batch(
+        underlying_price=[0.0, 600.0, 600.0, 600.0],
+        strike=[600.0, 600.0, 600.0, 600.0],
+        expiry=[date(2026, 3, 20), None, date(2026, 3, 20), date(2026, 3, 20)],
+        right=["C", "C", "C", "P"],
+        iv=[0.2, 0.2, 0.0, 0.2],
+        valuation_date=VALUATION,
+    )
+
+    assert batch.valid.tolist() == [False, False, False, True]
+    assert batch.row(0) is None
+    assert np.isnan(batch.delta[:3]).all()
+    assert batch.row(3) is not None
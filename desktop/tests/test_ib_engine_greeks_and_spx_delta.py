@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from types import SimpleNamespace
 from typing import Any, cast
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from desktop.engine.greek_subscriptions import GreekSubscriptionManager
 from desktop.engine.ib_engine import IBEngine
+from desktop.engine.market_data_lines import LinePriority, MarketDataLineScheduler
 
 
 @pytest.mark.asyncio
@@ -228,15 +232,10 @@ async def test_refresh_positions_persists_greek_fields_to_db_rows():
     engine._account_id = "U123"
     engine._db_ok = True
     db_mock = SimpleNamespace(
-        upsert_positions=AsyncMock(),
-        replace_strategy_groups=AsyncMock(),
-        cache_positions_snapshot=AsyncMock(),
-        cache_portfolio_greeks=AsyncMock(),
-        cache_portfolio_metrics=AsyncMock(),
+        persist_refresh_snapshot=AsyncMock(),
         store_cached_greeks=AsyncMock(),
     )
     engine._db = cast(Any, db_mock)
-    engine._persist_portfolio_risk_snapshot = AsyncMock()
     engine._spx_proxy_price_async = AsyncMock(return_value=7000.0)
 
     opt_contract = SimpleNamespace(
@@ -270,11 +269,12 @@ async def test_refresh_positions_persists_greek_fields_to_db_rows():
     )
 
     await engine.refresh_positions()
+    await engine._refresh_writer.flush()
 
-    upsert_positions = cast(AsyncMock, db_mock.upsert_positions)
-    upsert_positions.assert_awaited_once()
-    assert upsert_positions.await_args is not None
-    persisted_rows = upsert_positions.await_args.args[1]
+    persist = cast(AsyncMock, db_mock.persist_refresh_snapshot)
+    persist.assert_awaited_once()
+    assert persist.await_args is not None
+    persisted_rows = persist.await_args.args[0]["positions"]
     assert len(persisted_rows) == 1
     persisted = persisted_rows[0]
     assert persisted["delta"] == pytest.approx(60.0)
@@ -457,15 +457,110 @@ async def test_disconnect_cancels_active_greek_streams():
     engine._ib = MagicMock()
     engine._manual_disconnect_requested = False
     contract = SimpleNamespace(conId=9001, localSymbol="SPY  260320C00600000", secType="OPT")
-    ticker = SimpleNamespace()
-    engine._greek_tickers = {9001: (contract, ticker)}
+    engine._ib.reqMktData.return_value = SimpleNamespace()
+    engine._greek_streams.subscribe(contract)
     engine._chain_tickers = {}
     engine._ib.isConnected.return_value = False
 
     await engine.disconnect()
 
     engine._ib.cancelMktData.assert_called_once_with(contract)
-    assert engine._greek_tickers == {}
+    assert len(engine._greek_streams) == 0
+
+
+def _make_option_engine(conids: list[int]):
+    engine = IBEngine()
+    engine._ib = MagicMock()
+    engine._account_id = "U123"
+    engine._spx_proxy_price_async = AsyncMock(return_value=7000.0)
+    engine._ib.qualifyContractsAsync = AsyncMock(return_value=[])
+    engine._ib.portfolio.return_value = []
+    engine._ib.reqMktData.return_value = SimpleNamespace(
+        modelGreeks=SimpleNamespace(delta=0.30, gamma=0.02, theta=-1.0, vega=5.0, impliedVol=0.20, undPrice=600.0),
+        bidGreeks=None,
+        askGreeks=None,
+        lastGreeks=None,
+    )
+    engine._ib.positions.return_value = [_option_position(conid) for conid in conids]
+    return engine
+
+
+def _option_position(conid: int):
+    contract = SimpleNamespace(
+        conId=conid,
+        secType="OPT",
+        symbol="SPY",
+        localSymbol=f"SPY  260320C00{conid:03d}000",
+        exchange="SMART",
+        currency="USD",
+        strike=float(conid),
+        right="C",
+        lastTradeDateOrContractMonth="20260320",
+        multiplier="100",
+    )
+    return SimpleNamespace(contract=contract, position=1.0, avgCost=10.0)
+
+
+@pytest.mark.asyncio
+async def test_refresh_positions_reuses_greek_streams_across_refreshes(monkeypatch):
+    monkeypatch.setenv("IB_GREEKS_BATCH_WAIT_SECONDS", "0.5")
+    engine = _make_option_engine([601, 602])
+
+    await engine.refresh_positions()
+    engine._last_live_greeks_refresh_monotonic = None  # force the next sync
+    rows = await engine.refresh_positions()
+
+    assert engine._ib.reqMktData.call_count == 2
+    engine._ib.cancelMktData.assert_not_called()
+    assert engine._greek_streams.conids == {601, 602}
+    assert all(row.greeks_source == "live" for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_refresh_positions_only_subscribes_new_and_cancels_closed_legs(monkeypatch):
+    monkeypatch.setenv("IB_GREEKS_BATCH_WAIT_SECONDS", "0.5")
+    engine = _make_option_engine([601, 602])
+    await engine.refresh_positions()
+
+    engine._ib.positions.return_value = [_option_position(602), _option_position(603)]
+    engine._last_live_greeks_refresh_monotonic = None
+    await engine.refresh_positions()
+
+    assert engine._ib.reqMktData.call_count == 3
+    assert engine._ib.cancelMktData.call_count == 1
+    assert engine._ib.cancelMktData.call_args.args[0].conId == 601
+    assert engine._greek_streams.conids == {602, 603}
+
+
+@pytest.mark.asyncio
+async def test_legs_beyond_the_line_budget_rotate_through_the_reserve(monkeypatch):
+    monkeypatch.setenv("IB_GREEKS_BATCH_WAIT_SECONDS", "0.5")
+    monkeypatch.setenv("IB_MAX_MARKET_DATA_LINES", "12")
+    monkeypatch.setenv("IB_MARKET_DATA_LINE_HEADROOM", "0")
+    monkeypatch.setenv("IB_GREEKS_ROTATION_LINES", "4")
+    engine = _make_option_engine(list(range(601, 616)))
+
+    rows = await engine.refresh_positions()
+
+    assert 0 < len(engine._greek_streams) < 15
+    assert len(engine._lines) <= engine._lines.budget - 4
+    assert engine._lines.stats()["denials"] == 0
+    assert all(row.greeks_source == "live" for row in rows)
+    assert len(engine._iv_surfaces["SPY"]) == 15  # rotated legs feed the surface too
+
+
+def test_held_streams_evict_chain_lines_instead_of_counting_them_against_the_reserve():
+    engine = _make_option_engine([])
+    lines = MarketDataLineScheduler(lambda: engine._ib, max_lines=10, headroom=0)
+    streams = GreekSubscriptionManager(lines, reserve_lines=2)
+    for conid in range(901, 911):
+        assert lines.acquire(_option_position(conid).contract, "chain", LinePriority.CHAIN) is not None
+    assert streams.free_slots == 8
+
+    assert streams.subscribe(_option_position(601).contract) is not None
+    assert lines.evictions == 1
+    assert len(lines) == 10
+    assert streams.free_slots == 7
 
 
 @pytest.mark.asyncio
@@ -605,3 +700,97 @@ async def test_unknown_futures_spx_delta_is_none():
     rows = await engine.refresh_positions()
     row = rows[0]
     assert row.spx_delta is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_positions_returns_as_soon_as_new_streams_have_greeks(monkeypatch):
+    monkeypatch.setenv("IB_GREEKS_BATCH_WAIT_SECONDS", "5")
+    engine = _make_option_engine([601, 602])
+
+    started = time.monotonic()
+    rows = await engine.refresh_positions()
+
+    assert time.monotonic() - started < 1.0
+    assert all(row.greeks_source == "live" for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_wait_for_greeks_reports_per_contract_timeouts():
+    engine = _make_option_engine([])
+    silent = SimpleNamespace(modelGreeks=None, bidGreeks=None, askGreeks=None, lastGreeks=None)
+    engine._ib.reqMktData.side_effect = [engine._ib.reqMktData.return_value, silent]
+    engine._greek_streams.subscribe(_option_position(701).contract)
+    engine._greek_streams.subscribe(_option_position(702).contract)
+
+    collected = await engine._greek_streams.wait_for_greeks([701, 702], 0.1, ready=engine._ticker_has_greeks)
+
+    assert collected.ready == [701]
+    assert collected.timed_out == [702]
+    assert not collected.complete
+    assert 0.05 <= collected.elapsed_s < 1.0
+
+
+
+
+@pytest.mark.asyncio
+async def test_wait_for_greeks_is_bounded_when_the_clock_stalls():
+    engine = _make_option_engine([])
+    silent = SimpleNamespace(modelGreeks=None, bidGreeks=None, askGreeks=None, lastGreeks=None)
+    engine._ib.reqMktData.side_effect = [silent]
+    streams = GreekSubscriptionManager(engine._lines, clock=lambda: 1_000.0)
+    streams.subscribe(_option_position(701).contract)
+
+    collected = await asyncio.wait_for(streams.wait_for_greeks([701], 0.1), timeout=2.0)
+
+    assert collected.timed_out == [701]
+    assert collected.elapsed_s == 0.0
+
+@pytest.mark.asyncio
+async def test_retry_wait_runs_from_the_retry_not_the_subscription():
+    engine = _make_option_engine([])
+    silent = SimpleNamespace(modelGreeks=None, bidGreeks=None, askGreeks=None, lastGreeks=None)
+    engine._ib.reqMktData.side_effect = [silent]
+    engine._greek_streams.subscribe(_option_position(701).contract)
+    engine._greek_streams._subscribed_at[701] -= 10.0  # settle window long gone
+
+    stale = await engine._greek_streams.wait_for_greeks([701], 0.5, ready=engine._ticker_has_greeks)
+    assert stale.timed_out == [701] and stale.elapsed_s < 0.05
+
+    async def _deliver():
+        await asyncio.sleep(0.05)
+        silent.modelGreeks = engine._ib.reqMktData.return_value.modelGreeks
+
+    delivery = asyncio.ensure_future(_deliver())
+    retried = await engine._greek_streams.wait_for_greeks(
+        [701], 0.5, ready=engine._ticker_has_greeks, from_now=True,
+    )
+    await delivery
+
+    assert retried.ready == [701]
+
+@pytest.mark.asyncio
+async def test_greek_sweep_pipelines_qualification_batches(monkeypatch):
+    monkeypatch.setenv("IB_GREEKS_BATCHES_IN_FLIGHT", "2")
+    engine = _make_option_engine([])
+    active = 0
+    peak = 0
+
+    async def _qualify(*contracts):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return list(contracts)
+
+    engine._ib.qualifyContractsAsync = AsyncMock(side_effect=_qualify)
+    positions = [_option_position(conid) for conid in range(801, 831)]
+
+    started = time.monotonic()
+    added = await engine._sync_greek_subscriptions(positions, batch_size=5, settle_timeout=1.0)
+
+    assert sorted(added) == list(range(801, 831))
+    assert peak == 2
+    assert time.monotonic() - started < 0.3  # 6 batches × 50 ms, two at a time
+    assert len(engine._greek_streams) == 30
+    assert engine._greeks_cache_by_contract[("SPY", "20260320", 801.0, "C", "OPT")]["delta"] == 0.30
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import math
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from desktop.engine.ib_engine import IBEngine
+from desktop.engine.iv_surface import IVSurface
+
+
+VALUATION = date(2026, 1, 2)
+
+
+def test_iv_surface_interpolates_linearly_across_strike():
+    surface = IVSurface()
+    surface.update("20260320", 6100.0, 0.16)
+    surface.update("20260320", 5900.0, 0.20)
+    surface.update("20260320", 6000.0, 0.18)
+
+    assert surface.iv_at("20260320", 5950.0) == pytest.approx(0.19)
+    assert surface.iv_at("20260320", 6000.0) == pytest.approx(0.18)
+    # Flat extrapolation beyond the quoted wings.
+    assert surface.iv_at("20260320", 5000.0) == pytest.approx(0.20)
+    assert surface.iv_at("20260320", 7000.0) == pytest.approx(0.16)
+
+
+def test_iv_surface_updates_existing_strike_in_place():
+    surface = IVSurface()
+    surface.update("20260320", 6000.0, 0.18)
+    surface.update("20260320", 6000.0, 0.21)
+
+    assert len(surface) == 1
+    assert surface.iv_at("20260320", 6000.0) == pytest.approx(0.21)
+
+
+def test_iv_surface_interpolates_total_variance_across_expiries():
+    surface = IVSurface()
+    surface.update("20260201", 6000.0, 0.20)  # 30 days
+    surface.update("20260403", 6000.0, 0.16)  # 91 days
+
+    iv = surface.iv_at("20260303", 6000.0, valuation_date=VALUATION)  # 60 days
+
+    t1, t2, t = 30 / 365.0, 91 / 365.0, 60 / 365.0
+    w = 0.20 ** 2 * t1 + (0.16 ** 2 * t2 - 0.20 ** 2 * t1) * (t - t1) / (t2 - t1)
+    assert iv == pytest.approx(math.sqrt(w / t))
+    # Outside the quoted expiries the nearest smile is used.
+    assert surface.iv_at("20251231", 6000.0, valuation_date=VALUATION) == pytest.approx(0.20)
+    assert surface.iv_at("20261231", 6000.0, valuation_date=VALUATION) == pytest.approx(0.16)
+
+
+def test_iv_surface_ignores_invalid_observations():
+    surface = IVSurface()
+    surface.update("20260320", 6000.0, float("nan"))
+    surface.update("20260320", 0.0, 0.2)
+    surface.update("", 6000.0, 0.2)
+
+    assert len(surface) == 0
+    assert surface.iv_at("20260320", 6000.0) is None
+
+
+def test_engine_interpolates_iv_from_surface_with_default_fallback():
+    engine = IBEngine()
+    engine._record_iv("SPY", "20260320", 580.0, 0.22)
+    engine._record_iv("SPY", "20260320", 620.0, 0.18)
+
+    spy = SimpleNamespace(symbol="SPY", lastTradeDateOrContractMonth="20260320", strike=600.0)
+    aapl = SimpleNamespace(symbol="AAPL", lastTradeDateOrContractMonth="20260320", strike=200.0)
+
+    assert engine._interpolate_iv_from_chain(spy) == pytest.approx(0.20)
+    assert engine._interpolate_iv_from_chain(aapl) == pytest.approx(0.20)
+    engine._record_iv("SPY", "20260320", 600.0, 0.19)
+    assert engine._interpolate_iv_from_chain(spy) == pytest.approx(0.19)
@@ -10,7 +10,8 @@ Run:
 from __future__ import annotations
 
 import asyncio
-from unittest.mock import AsyncMock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import QToolBar
@@ -265,3 +266,56 @@ class TestMainWindowCompactMode:
         assert win._portfolio_tab._table.isColumnHidden(10)
         assert win._orders_tab._table.isColumnHidden(9)
         assert '"compact_mode": true' in prefs.read_text(encoding="utf-8")
+
+
+class TestMainWindowLazyTabs:
+    def test_only_portfolio_tab_is_built_at_startup(self, qtbot, mock_engine):
+        win = _make_window(qtbot, mock_engine)
+
+        assert win._built_tabs == {}
+        assert win._tabs.count() == 8
+
+    def test_tab_is_built_on_first_show(self, qtbot, mock_engine):
+        from desktop.ui.chain_tab import ChainTab
+
+        win = _make_window(qtbot, mock_engine)
+        win._tabs.setCurrentIndex(1)
+
+        assert isinstance(win._tabs.currentWidget(), ChainTab)
+        assert win._tabs.currentIndex() == 1
+        assert "Options Chain" in win._tabs.tabText(1)
+        assert win._built_tabs["chain"] is win._chain_tab
+
+    def test_agent_events_are_queued_until_ai_tab_exists(self, qtbot, mock_engine):
+        win = _make_window(qtbot, mock_engine)
+
+        win._agent_runner.alert_raised.emit({"message": "gamma breach"})
+
+        assert "ai" not in win._built_tabs
+        assert list(win._agent_events) == [("on_risk_alert", {"message": "gamma breach"})]
+
+    def test_late_built_tabs_replay_positions_and_market_snapshots(self, qtbot, mock_engine, sample_positions):
+        mock_engine._positions_snapshot = list(sample_positions)
+        mock_engine.get_position_expiries = MagicMock(return_value=["20991217"])
+        mock_engine._publish_market_snapshot(
+            "SPY",
+            SimpleNamespace(last=600.0, bid=599.9, ask=600.1, high=None, low=None, close=598.0, volume=10),
+        )
+        win = _make_window(qtbot, mock_engine)
+
+        chain = win._chain_tab
+        market = win._market_tab
+
+        expiries = [chain._cmb_expiry.itemText(i) for i in range(chain._cmb_expiry.count())]
+        assert "20991217" in expiries
+        assert "SPY" in [snap.symbol for snap in market._model._rows]
+
+    def test_startup_run_is_recorded_after_first_event_loop_turn(self, qtbot, mock_engine):
+        from desktop.engine.perf_timing import PerfRun
+
+        run = PerfRun(operation="startup")
+        win = MainWindow(mock_engine, startup=run)
+        qtbot.addWidget(win)
+
+        qtbot.waitUntil(lambda: mock_engine.perf_stats("startup")["runs"] == 1, timeout=1000)
+        assert list(run.stages) == ["main_window", "first_paint"]
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from desktop.engine.market_data_lines import LinePriority, MarketDataLineScheduler
+
+
+def _contract(conid: int):
+    return SimpleNamespace(conId=conid, localSymbol=f"C{conid}")
+
+
+def _scheduler(max_lines: int = 3, headroom: int = 0):
+    ib = MagicMock()
+    ib.reqMktData.side_effect = lambda contract, **_kw: SimpleNamespace(conid=contract.conId)
+    return MarketDataLineScheduler(lambda: ib, max_lines=max_lines, headroom=headroom), ib
+
+
+def test_lines_are_shared_and_closed_with_last_holder():
+    lines, ib = _scheduler()
+    first = lines.acquire(_contract(1), "greeks", LinePriority.HELD, "106")
+    second = lines.acquire(_contract(1), "chain", LinePriority.CHAIN, "106")
+
+    assert first is second
+    assert ib.reqMktData.call_count == 1
+    assert lines.holders(1) == {"greeks", "chain"}
+
+    lines.release(1, "greeks")
+    assert 1 in lines and ib.cancelMktData.call_count == 0
+    lines.release(1, "chain")
+    assert 1 not in lines and ib.cancelMktData.call_count == 1
+
+
+def test_wider_generic_ticks_resubscribe_the_shared_line():
+    lines, ib = _scheduler()
+    lines.acquire(_contract(1), "reference", LinePriority.HELD)
+    lines.acquire(_contract(1), "greeks", LinePriority.HELD, "106,100")
+
+    assert ib.reqMktData.call_count == 2
+    assert ib.reqMktData.call_args.kwargs["genericTickList"] == "100,106"
+    assert ib.cancelMktData.call_count == 1
+    assert len(lines) == 1
+
+
+def test_failed_widen_restores_the_original_subscription():
+    lines, ib = _scheduler()
+    lines.acquire(_contract(1), "reference", LinePriority.HELD, "106")
+    restored = SimpleNamespace(conid=1)
+    ib.reqMktData.side_effect = [RuntimeError("pacing"), restored]
+
+    assert lines.acquire(_contract(1), "greeks", LinePriority.HELD, "100,106") is restored
+    assert ib.reqMktData.call_args.kwargs["genericTickList"] == "106"
+    assert lines.ticker(1) is restored
+    assert lines.holders(1) == {"reference", "greeks"}
+
+
+def test_failed_widen_and_restore_drops_the_line_and_notifies_holders():
+    lines, ib = _scheduler()
+    evicted: list[int] = []
+    lines.on_evicted("reference", evicted.append)
+    lines.acquire(_contract(1), "reference", LinePriority.HELD, "106")
+    ib.reqMktData.side_effect = RuntimeError("pacing")
+
+    assert lines.acquire(_contract(1), "greeks", LinePriority.HELD, "100,106") is None
+    assert 1 not in lines
+    assert evicted == [1]
+
+
+def test_budget_evicts_lowest_priority_oldest_line_and_notifies_holder():
+    lines, _ib = _scheduler(max_lines=3)
+    evicted: list[int] = []
+    lines.on_evicted("watchlist", evicted.append)
+    lines.acquire(_contract(1), "watchlist", LinePriority.WATCHLIST)
+    lines.acquire(_contract(2), "watchlist", LinePriority.WATCHLIST)
+    lines.acquire(_contract(3), "chain", LinePriority.CHAIN)
+
+    assert lines.acquire(_contract(4), "greeks", LinePriority.HELD) is not None
+    assert evicted == [1]
+    assert 1 not in lines and {2, 3, 4} <= set(lines._lines)
+    assert lines.stats()["evictions"] == 1
+
+
+def test_request_is_denied_when_no_lower_priority_line_exists():
+    lines, ib = _scheduler(max_lines=3, headroom=1)
+    assert lines.budget == 2
+    lines.acquire(_contract(1), "chain", LinePriority.CHAIN)
+    lines.acquire(_contract(2), "greeks", LinePriority.HELD)
+
+    assert lines.acquire(_contract(3), "chain", LinePriority.CHAIN) is None
+    assert lines.acquire(_contract(0), "greeks", LinePriority.HELD) is None
+    stats = lines.stats()
+    assert stats["denials"] == 1
+    assert stats["by_priority"] == {"agent": 0, "watchlist": 0, "chain": 1, "held": 1}
+    assert ib.reqMktData.call_count == 2
+
+
+def test_denials_are_summarised_once_per_report(caplog):
+    lines, _ib = _scheduler(max_lines=1)
+    lines.acquire(_contract(1), "greeks", LinePriority.HELD)
+
+    with caplog.at_level("WARNING", logger="desktop.engine.market_data_lines"):
+        for conid in (2, 3, 4):
+            assert lines.acquire(_contract(conid), "greeks", LinePriority.HELD) is None
+        assert not caplog.records
+        assert lines.report_denials() == 3
+        assert lines.report_denials() == 0
+
+    assert len(caplog.records) == 1
+    assert "denied 3 line request(s)" in caplog.records[0].getMessage()
+    assert lines.stats()["denials"] == 3
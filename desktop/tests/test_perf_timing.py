@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, cast
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from desktop.engine.ib_engine import IBEngine
+from desktop.engine.perf_timing import PerfRecorder, percentile
+from desktop.ui.widgets.perf_panel import PerfPanel
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 50) is None
+    assert percentile([5.0], 95) == 5.0
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+
+
+def test_recorder_ring_buffer_and_summary():
+    recorder = PerfRecorder(capacity=3)
+    for i in range(5):
+        run = recorder.start("op")
+        run.stages["fetch"] = (i + 1) / 1000.0
+        run.count("contracts", i)
+        recorder.record(run)
+
+    summary = recorder.summary("op")
+    assert summary["runs"] == 3
+    fetch = summary["stages"]["fetch"]
+    assert fetch["n"] == 3
+    assert fetch["p50_ms"] == pytest.approx(4.0)
+    assert fetch["last_ms"] == pytest.approx(5.0)
+    assert summary["counts"]["contracts"] == {"last": 4, "mean": 3.0}
+    assert "total" in summary["stages"]
+
+    events = recorder.last("op").events()
+    assert [e["stage"] for e in events] == ["fetch", "total"]
+    assert events[-1]["counts"] == {"contracts": 4}
+
+
+def test_run_report_lists_stages_then_total():
+    recorder = PerfRecorder()
+    run = recorder.start("startup")
+    run.stages["imports"] = 0.4
+    run.stages["first_paint"] = 0.05
+    run.total_s = 0.5
+
+    assert run.report() == "imports 400ms · first_paint 50ms · total 500ms"
+
+
+@pytest.mark.asyncio
+async def test_refresh_positions_records_stage_timings(qapp):
+    engine = IBEngine()
+    engine._ib = MagicMock()
+    engine._account_id = "U1"
+    engine._spx_proxy_price_async = AsyncMock(return_value=6000.0)
+    stock = SimpleNamespace(
+        conId=1, secType="STK", symbol="AAPL", localSymbol="AAPL", exchange="SMART",
+        currency="USD", strike=0.0, right="", lastTradeDateOrContractMonth="", multiplier="",
+    )
+    engine._ib.positions.return_value = [SimpleNamespace(contract=stock, position=10.0, avgCost=150.0)]
+    engine._ib.portfolio.return_value = []
+    engine._fetch_dynamic_beta = AsyncMock()
+    engine._db_ok = True
+    engine._db = cast(Any, SimpleNamespace(persist_refresh_snapshot=AsyncMock()))
+    seen: list[str] = []
+    engine.perf_updated.connect(seen.append)
+
+    await engine.refresh_positions()
+
+    stats = engine.perf_stats()
+    assert stats["runs"] == 1 and seen == ["refresh_positions"]
+    for stage in ("spx_proxy", "betas", "greek_sweep", "build_rows", "compute", "persist_queue", "total"):
+        assert stats["stages"][stage]["n"] == 1
+    assert stats["counts"]["positions"]["last"] == 1
+
+    panel = PerfPanel(engine)
+    panel.refresh()
+    assert panel._table.rowCount() == len(stats["stages"])
@@ -166,6 +166,16 @@ class TestPortfolioTabData:
 
         assert "3 positions" in tab._lbl_status.text()
 
+    def test_data_quality_banner_counts_black76_estimates_on_fop_legs(self, qtbot, mock_engine, sample_positions):
+        tab = PortfolioTab(mock_engine)
+        qtbot.addWidget(tab)
+        sample_positions[0].greeks_source = "estimated_black76"
+        sample_positions[2].greeks_source = "estimated_bsm"
+
+        mock_engine.positions_updated.emit(sample_positions)
+
+        assert "≈ 2 option(s) using local estimated Greeks" in tab._lbl_data_quality.text()
+
     def test_empty_positions_clears_table(self, qtbot, mock_engine, sample_positions):
         tab = PortfolioTab(mock_engine)
         qtbot.addWidget(tab)
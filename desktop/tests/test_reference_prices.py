@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from desktop.engine.ib_engine import IBEngine
+from desktop.engine.market_data_lines import MarketDataLineScheduler
+from desktop.engine.reference_prices import CORE_REFERENCE_SYMBOLS, ReferencePriceService
+from desktop.workers.agent_runner import AgentRunner
+
+
+def _ticker(last=float("nan"), bid=float("nan"), ask=float("nan"), close=float("nan")):
+    return SimpleNamespace(last=last, bid=bid, ask=ask, close=close, time=datetime(2026, 1, 2, 15, 0, tzinfo=timezone.utc))
+
+
+def _service(tickers: dict[str, SimpleNamespace]):
+    ib = MagicMock()
+    ib.reqMktData.side_effect = lambda contract, **_kw: tickers[contract.symbol]
+
+    async def _resolve(symbol: str, _sec_type: str):
+        if symbol not in tickers:
+            raise ValueError(f"cannot qualify {symbol}")
+        return SimpleNamespace(symbol=symbol, conId=sorted(tickers).index(symbol) + 1)
+
+    return ReferencePriceService(MarketDataLineScheduler(lambda: ib), _resolve), ib
+
+
+@pytest.mark.asyncio
+async def test_ensure_subscribes_once_and_serves_live_quotes():
+    spy = _ticker(bid=600.0, ask=600.2)
+    service, ib = _service({"SPY": spy})
+
+    assert await service.ensure({"SPY": "STK"}) == ["SPY"]
+    assert await service.ensure({"SPY": "STK"}) == []
+    assert ib.reqMktData.call_count == 1
+    assert ib.reqMktData.call_args.kwargs["snapshot"] is False
+
+    quote = service.quote("spy")
+    assert quote.mid == pytest.approx(600.1)
+    assert quote.price == pytest.approx(600.1)
+    assert quote.updated_at == datetime(2026, 1, 2, 15, 0, tzinfo=timezone.utc).timestamp()
+
+    spy.last = 601.0  # streaming ticker updated in place
+    assert service.price("SPY") == 601.0
+
+
+@pytest.mark.asyncio
+async def test_spx_price_falls_back_from_spx_to_spy_to_es():
+    service, _ib = _service({"SPX": _ticker(), "SPY": _ticker(last=601.0), "ES": _ticker(last=6050.0)})
+    await service.ensure({"SPX": "IND", "SPY": "STK", "ES": "FUT"})
+    assert service.spx_price() == pytest.approx(6010.0)
+
+    service._tickers["SPX"][1].last = 6012.5
+    assert service.spx_price() == 6012.5
+
+
+@pytest.mark.asyncio
+async def test_unresolvable_symbol_is_not_retried_and_core_streams_are_retained():
+    service, ib = _service({"SPY": _ticker(last=600.0), "AAPL": _ticker(last=200.0)})
+
+    await service.ensure({"SPY": "STK", "AAPL": "STK", "BOGUS": "STK"})
+    assert await service.ensure({"BOGUS": "STK"}) == []
+    assert service.symbols == {"SPY", "AAPL"}
+
+    assert service.retain([]) == {"AAPL"}
+    assert service.symbols == {"SPY"}
+    ib.cancelMktData.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_engine_spx_proxy_uses_streams_without_hardcoded_fallback():
+    engine = IBEngine()
+    engine._ib = MagicMock()
+    engine._reference_wait_s = 0.0
+    tickers = {"SPX": _ticker(), "SPY": _ticker(last=612.0), "ES": _ticker(), "VIX": _ticker(last=17.0)}
+    engine._qualify_underlying = AsyncMock(side_effect=lambda sym, _st, _ex: SimpleNamespace(symbol=sym, conId=sorted(tickers).index(sym) + 1))
+    engine._ib.reqMktData.side_effect = lambda contract, **_kw: tickers[contract.symbol]
+
+    assert await engine._spx_proxy_price_async() == pytest.approx(6120.0)
+    assert await engine._spx_proxy_price_async() == pytest.approx(6120.0)
+    assert engine._ib.reqMktData.call_count == len(CORE_REFERENCE_SYMBOLS)
+    assert engine.last_price("VIX") == 17.0
+
+    tickers["SPY"].last = float("nan")
+    assert await engine._spx_proxy_price_async() == 0.0
+    engine._last_spx_proxy_price = 6100.0
+    assert await engine._spx_proxy_price_async() == 6100.0
+
+
+@pytest.mark.asyncio
+async def test_engine_resolves_futures_references_on_their_own_exchange():
+    engine = IBEngine()
+    engine._qualify_underlying = AsyncMock(return_value=SimpleNamespace(symbol="X", conId=1))
+
+    await engine._resolve_reference_contract("ES", "FUT")
+    await engine._resolve_reference_contract("ZN", "FUT")
+    engine._future_exchanges["XYZ"] = "ICEUS"
+    await engine._resolve_reference_contract("XYZ", "FUT")
+    await engine._resolve_reference_contract("AAPL", "STK")
+
+    exchanges = [call.args[2] for call in engine._qualify_underlying.await_args_list]
+    assert exchanges == ["CME", "CBOT", "ICEUS", "SMART"]
+
+
+def test_regime_detection_prefers_streamed_vix(qapp):
+    engine = MagicMock()
+    engine.reference_quote.return_value = SimpleNamespace(price=36.0)
+    engine.last_market_snapshot.return_value = {"last": 12.0}
+    runner = AgentRunner(engine)
+    assert runner._detect_regime(1_000_000.0) == "crisis_mode"
+
+    engine.reference_quote.return_value = None
+    assert runner._detect_regime(1_000_000.0) == "low_volatility"
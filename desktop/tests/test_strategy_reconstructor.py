@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import replace
 
 from desktop.engine.ib_engine import PositionRow
+from desktop.models import strategy_reconstructor
 from desktop.models.strategy_reconstructor import StrategyReconstructor
 from desktop.models.trade_groups import TradeGroupsModel
 
@@ -110,6 +111,59 @@ def test_reconstructor_does_not_treat_bull_call_spread_as_iron_condor_wing():
     assert {group.strategy_name for group in groups} == {"Bear Put Spread", "Bull Call Spread"}
 
 
+def test_reconstructor_finds_each_butterfly_in_a_strike_ladder():
+    reconstructor = StrategyReconstructor(account_id="U1")
+    legs = []
+    for n, low in enumerate((100.0, 120.0, 140.0)):
+        legs += [
+            _row(conid=100 + 3 * n, strike=low, quantity=1.0),
+            _row(conid=101 + 3 * n, strike=low + 5.0, quantity=-2.0),
+            _row(conid=102 + 3 * n, strike=low + 10.0, quantity=1.0),
+        ]
+    groups = reconstructor.reconstruct(legs)
+
+    assert [group.strategy_name for group in groups] == ["Call Butterfly"] * 3
+    assert sorted(tuple(sorted(group.leg_ids)) for group in groups) == [
+        (100, 101, 102), (103, 104, 105), (106, 107, 108),
+    ]
+
+
+def _large_single_expiry_book(size: int) -> list[PositionRow]:
+    return [
+        _row(
+            conid=1000 + i,
+            underlying="SPX",
+            symbol="SPX",
+            strike=5000.0 + 5.0 * (i // 4),
+            right="CP"[i % 2],
+            quantity=[1.0, -2.0, 1.0, -1.0][i % 4],
+        )
+        for i in range(size)
+    ]
+
+
+def test_reconstructor_scales_to_large_single_expiry_books(monkeypatch):
+    quantity_reads = 0
+    read_quantity = strategy_reconstructor._quantity
+
+    def _counting_quantity(leg):
+        nonlocal quantity_reads
+        quantity_reads += 1
+        return read_quantity(leg)
+
+    monkeypatch.setattr(strategy_reconstructor, "_quantity", _counting_quantity)
+    reads: dict[int, int] = {}
+    for size in (250, 500):
+        quantity_reads = 0
+        groups = StrategyReconstructor(account_id="U1").reconstruct(_large_single_expiry_book(size))
+        reads[size] = quantity_reads
+
+    assert sorted(leg_id for group in groups for leg_id in group.leg_ids) == list(range(1000, 1500))
+    # Candidate scans stay bucketed: doubling the book roughly doubles the work.
+    assert reads[500] < 2.5 * reads[250]
+    assert reads[500] < 30 * 500
+
+
 def test_reconstructor_labels_unmatched_leg_as_single():
     reconstructor = StrategyReconstructor(account_id="U1")
     groups = reconstructor.reconstruct([
@@ -120,6 +174,27 @@ def test_reconstructor_labels_unmatched_leg_as_single():
     assert groups[0].strategy_name == "Single Leg / Naked"
 
 
+def test_reconstructor_reuses_layout_while_position_set_is_unchanged():
+    reconstructor = StrategyReconstructor(account_id="U1")
+    legs = [
+        _row(conid=71, strike=200.0, quantity=1.0, delta=10.0),
+        _row(conid=72, strike=210.0, quantity=-1.0, delta=-4.0),
+    ]
+    first = reconstructor.reconstruct(legs)
+
+    repriced = [replace(legs[0], delta=12.0), replace(legs[1], delta=-5.0)]
+    second = reconstructor.reconstruct(repriced)
+
+    assert reconstructor.detections == 1 and reconstructor.reaggregations == 1
+    assert second[0].association_id == first[0].association_id
+    assert second[0].strategy_name == "Bull Call Spread"
+    assert second[0].net_delta == 7.0
+    assert second[0].legs[0] is repriced[0]
+
+    reconstructor.reconstruct([repriced[0], replace(repriced[1], quantity=-2.0)])
+    assert reconstructor.detections == 2
+
+
 def test_trade_groups_model_sorts_by_strategy_metric(qapp):
     model = TradeGroupsModel()
     model.set_sorting("theta", descending=True, absolute=True)
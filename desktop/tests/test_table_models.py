@@ -132,11 +132,12 @@ class TestPositionsTableModel:
         idx = m.index(0, 12)  # row 0 = stock position, col 12 = Expiry Day
         assert m.data(idx) == ""
 
-    def test_estimated_greeks_rows_use_italic_font(self, qapp):
+    @pytest.mark.parametrize("source", ["estimated_bsm", "estimated_black76"])
+    def test_estimated_greeks_rows_use_italic_font(self, qapp, source):
         from PySide6.QtGui import QFont
 
         m = PositionsTableModel()
-        m.set_data([_pos_row(greeks_source="estimated_bsm")])
+        m.set_data([_pos_row(greeks_source=source)])
         font = m.data(m.index(1, 13), Qt.ItemDataRole.FontRole)  # col 13 = Delta
         assert isinstance(font, QFont)
         assert font.italic()
@@ -251,6 +252,52 @@ class TestPositionsTableModel:
         assert isinstance(brush, QBrush)
 
 
+    # ── incremental refresh ────────────────────────────────────────────────
+
+    def test_value_refresh_emits_column_limited_data_changed(self, qapp):
+        m = PositionsTableModel()
+        m.set_data([_pos_row(conid=1), _pos_row(conid=2)])
+        resets: list[bool] = []
+        changed: list[tuple[int, int, int]] = []
+        m.modelReset.connect(lambda: resets.append(True))
+        m.dataChanged.connect(lambda tl, br, roles=None: changed.append((tl.row(), tl.column(), br.column())))
+
+        m.set_data([_pos_row(conid=1, delta=-0.40), _pos_row(conid=2)])
+
+        assert resets == []
+        # position row 1 → delta column; group header row 0 → delta column
+        assert sorted(changed) == [(0, 13, 13), (1, 13, 13)]
+        assert m.data(m.index(1, 13)) == "-0.4000"
+
+    def test_structural_refresh_inserts_and_removes_rows(self, qapp):
+        m = PositionsTableModel()
+        m.set_data([_pos_row(conid=1), _pos_row(conid=2)])
+        inserted: list[tuple[int, int]] = []
+        removed: list[tuple[int, int]] = []
+        m.rowsInserted.connect(lambda _p, first, last: inserted.append((first, last)))
+        m.rowsRemoved.connect(lambda _p, first, last: removed.append((first, last)))
+
+        m.set_data([_pos_row(conid=2), _pos_row(conid=3, expiry="20260418")])
+
+        assert removed == [(1, 1)]
+        assert inserted == [(2, 3)]
+        assert m.rowCount() == 4
+        assert m.position_at(1).conid == 2 and m.position_at(3).conid == 3
+
+    def test_refresh_keeps_persistent_selection_on_the_same_position(self, qapp):
+        from PySide6.QtCore import QPersistentModelIndex
+
+        m = PositionsTableModel()
+        m.set_sorting("delta", descending=True, absolute=True)
+        m.set_data([_pos_row(conid=1, delta=-0.9), _pos_row(conid=2, delta=0.1)])
+        selected = QPersistentModelIndex(m.index(1, 0))  # conid 2
+
+        m.set_data([_pos_row(conid=1, delta=-0.05), _pos_row(conid=2, delta=0.1)])
+
+        assert m.position_at(selected.row()).conid == 2
+        assert selected.row() == 0
+
+
 # ── ChainTableModel ──────────────────────────────────────────────────────
 
 
@@ -347,9 +394,41 @@ class TestChainTableModel:
         assert m.data(strike_idx, Qt.ItemDataRole.BackgroundRole) is not None
         assert m.data(strike_idx, Qt.ItemDataRole.ForegroundRole) is not None
 
-    def test_set_underlying_price_emits_repaint_for_existing_rows(self, qapp, qtbot):
+    def test_set_underlying_price_emits_repaint_for_existing_rows(self, qapp):
         m = ChainTableModel()
-        m.set_data([_chain_row(5500.0, "C"), _chain_row(5500.0, "P")])
+        m.set_data([
+            _chain_row(5500.0, "C"), _chain_row(5500.0, "P"),
+            _chain_row(5600.0, "C"), _chain_row(5600.0, "P"),
+            _chain_row(5700.0, "C"), _chain_row(5700.0, "P"),
+        ])
+        changed: list[tuple[int, int, int, int]] = []
+        m.dataChanged.connect(
+            lambda tl, br, roles=None: changed.append((tl.row(), br.row(), tl.column(), br.column()))
+        )
+        last_col = m.columnCount() - 1
+
+        m.set_underlying_price(5501.0)   # first marker: only the new ATM row
+        assert changed == [(0, 0, 0, last_col)]
+
+        changed.clear()
+        m.set_underlying_price(5598.0)   # old (5500) and new (5600) ATM rows only
+        assert sorted(changed) == [(0, 0, 0, last_col), (1, 1, 0, last_col)]
 
-        with qtbot.waitSignal(m.dataChanged, timeout=1000):
-            m.set_underlying_price(5501.0)
+    def test_underlying_price_tick_repaints_only_marker_rows(self, qapp):
+        m = ChainTableModel()
+        rows = []
+        for strike in (5400.0, 5450.0, 5500.0, 5550.0, 5600.0):
+            rows += [_chain_row(strike, "C"), _chain_row(strike, "P")]
+        m.set_data(rows)
+        m.set_underlying_price(5460.0)
+        changed: list[tuple[int, int]] = []
+        m.dataChanged.connect(lambda tl, br, roles=None: changed.append((tl.row(), br.row())))
+
+        m.set_underlying_price(5470.0)   # same nearest strike (5450)
+        assert changed == [(1, 1)]
+
+        changed.clear()
+        m.set_underlying_price(5540.0)   # crosses to 5550
+        assert sorted(changed) == [(1, 1), (3, 3)]
+        assert m.data(m.index(3, 8), Qt.ItemDataRole.BackgroundRole) is not None
+        assert m.data(m.index(1, 8), Qt.ItemDataRole.BackgroundRole) is None
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from desktop.engine.tool_cache import ToolResultCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_ttl_hits_then_refetches_when_stale():
+    clock = _Clock()
+    cache = ToolResultCache("t", clock=clock)
+    producer = AsyncMock(side_effect=[1, 2])
+
+    assert await cache.get_or_fetch("quote:SPY", ttl_seconds=10, producer=producer) == 1
+    assert await cache.get_or_fetch("quote:SPY", ttl_seconds=10, producer=producer) == 1
+    clock.now += 11
+    assert await cache.get_or_fetch("quote:SPY", ttl_seconds=10, producer=producer) == 2
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"]) == (1, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_share_one_producer_call():
+    cache = ToolResultCache("t")
+    gate = asyncio.Event()
+
+    async def producer():
+        await gate.wait()
+        return "v"
+
+    first = asyncio.create_task(cache.get_or_fetch("positions:fresh", ttl_seconds=60, producer=producer))
+    second = asyncio.create_task(cache.get_or_fetch("positions:fresh", ttl_seconds=60, producer=producer))
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await asyncio.gather(first, second) == ["v", "v"]
+    assert cache.stats()["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_family_and_discards_inflight_result():
+    cache = ToolResultCache("t")
+    cache.put("portfolio_greeks", {"delta": 1})
+    cache.put("bid_ask:{\"symbol\": \"SPY\"}", {"bid": 1})
+    gate = asyncio.Event()
+
+    async def slow_metrics():
+        await gate.wait()
+        return {"nlv": 1}
+
+    pending = asyncio.create_task(cache.get_or_fetch("portfolio_metrics", ttl_seconds=60, producer=slow_metrics))
+    await asyncio.sleep(0)
+
+    assert cache.invalidate("portfolio_greeks", "portfolio_metrics") == 1
+    gate.set()
+
+    assert await pending == {"nlv": 1}
+    assert "portfolio_metrics" not in cache
+    assert "portfolio_greeks" not in cache
+    assert cache.keys() == ["bid_ask:{\"symbol\": \"SPY\"}"]
+    assert cache.stats()["discarded"] == 1
+
+
+def test_lru_bound_on_entries_and_bytes():
+    by_count = ToolResultCache("t", max_entries=2, max_bytes=0)
+    for key in ("a", "b", "c"):
+        by_count.put(key, key)
+    assert by_count.keys() == ["b", "c"]
+
+    by_bytes = ToolResultCache("t", max_entries=0, max_bytes=20_000)
+    for idx in range(10):
+        by_bytes.put(f"chain:{idx}", "x" * 5_000)
+    stats = by_bytes.stats()
+    assert stats["bytes"] <= 20_000 and stats["evictions"] > 0
+    assert "chain:9" in by_bytes
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from desktop.engine.ib_engine import ChainRow, IBEngine
+from desktop.engine.write_behind import CoalescingWriter
+
+
+def _row(strike: float, bid: float) -> ChainRow:
+    return ChainRow(
+        underlying="SPY", expiry="20260618", strike=strike, right="C", conid=int(strike),
+        bid=bid, ask=bid + 0.1, last=None, volume=0, open_interest=0,
+        iv=0.2, delta=0.5, gamma=None, theta=None, vega=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_writer_coalesces_per_key_and_flushes_one_batch():
+    batches: list[list] = []
+    writer = CoalescingWriter("t", AsyncMock(side_effect=lambda batch: batches.append(batch)), delay_s=0.01)
+
+    writer.submit("a", 1)
+    writer.submit("b", 2)
+    writer.submit("a", 3)
+    assert writer.lag_s() >= 0.0 and len(writer) == 2
+    await asyncio.sleep(0.05)
+
+    assert batches == [[3, 2]]
+    stats = writer.stats()
+    assert stats["coalesced"] == 1 and stats["written"] == 2 and stats["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_writer_counts_failures_without_raising():
+    writer = CoalescingWriter("t", AsyncMock(side_effect=RuntimeError("db down")), delay_s=60)
+    writer.submit("a", 1)
+
+    assert await writer.close() is None
+    assert writer.failures == 1 and writer.last_error == "db down"
+    assert len(writer) == 0
+
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_in_flight_flush_then_writes_the_rest():
+    written: list[list] = []
+    release = asyncio.Event()
+
+    async def _slow_flush(batch):
+        await release.wait()
+        written.append(batch)
+
+    writer = CoalescingWriter("t", _slow_flush, delay_s=0.0)
+    writer.submit("a", 1)
+    await asyncio.sleep(0.01)  # the scheduled flush has popped "a" and is writing
+    writer.submit("b", 2)
+
+    closing = asyncio.ensure_future(writer.close())
+    await asyncio.sleep(0.01)
+    release.set()
+    await closing
+
+    assert written == [[1], [2]]
+    assert writer.written == 2 and len(writer) == 0
+
+@pytest.mark.asyncio
+async def test_get_chain_rows_are_bulk_written_through_the_queue():
+    engine = IBEngine()
+    engine._db_ok = True
+    engine._db = SimpleNamespace(store_cached_chain=AsyncMock(return_value=2))
+
+    engine._queue_chain_cache_rows([_row(500.0, 1.0), _row(505.0, 2.0)])
+    engine._queue_chain_cache_rows([_row(500.0, 1.5)])
+    await engine._chain_cache_writer.flush()
+
+    engine._db.store_cached_chain.assert_awaited_once()
+    rows = engine._db.store_cached_chain.await_args.args[0]
+    assert [(r["strike"], r["bid"]) for r in rows] == [(500.0, 1.5), (505.0, 2.0)]
+    assert rows[0]["option_right"] == "C" and rows[0]["conid"] == 500
+
+
+@pytest.mark.asyncio
+async def test_refresh_snapshots_coalesce_to_latest_per_account():
+    engine = IBEngine()
+    engine._db_ok = True
+    engine._db = SimpleNamespace(persist_refresh_snapshot=AsyncMock())
+
+    engine._refresh_writer.submit("U1", {"account_id": "U1", "snapshot_id": "old"})
+    engine._refresh_writer.submit("U1", {"account_id": "U1", "snapshot_id": "new"})
+    await engine._refresh_writer.flush()
+
+    engine._db.persist_refresh_snapshot.assert_awaited_once()
+    assert engine._db.persist_refresh_snapshot.await_args.args[0]["snapshot_id"] == "new"
+    stats = engine.persistence_stats()["refresh_snapshot"]
+    assert stats["coalesced"] == 1 and stats["written"] == 1 and stats["failures"] == 0
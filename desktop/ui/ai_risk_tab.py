@@ -22,7 +22,7 @@ import subprocess
 import time
 import types
 import uuid
-from dataclasses import asdict, dataclass
+from dataclasses import asdict
 from datetime import date
 from typing import Any
 
@@ -106,12 +106,6 @@ class OptimizeCapitalParams(BaseModel):
     target_metric: str = Field(default="margin", description="Optimization target: 'margin' (reduce capital use) or 'delta_efficiency' (improve delta per dollar)")
 
 
-@dataclass
-class _ToolCacheEntry:
-    value: Any
-    fetched_at: float
-
-
 def _get_copilot_account() -> str:
     """Detect which GitHub Copilot account is currently configured."""
     try:
@@ -162,6 +156,7 @@ from agents.llm_client import async_list_models, async_llm_chat, build_session_c
 from agents.llm_risk_auditor import LLMRiskAuditor
 from agents.proposer_engine import BreachDetector, RiskRegimeLoader
 from desktop.config.preferences import load_preferences
+from desktop.engine.tool_cache import ToolResultCache
 from models.order import AITradeSuggestion, OptionRight, OrderAction, PortfolioGreeks, RiskBreach
 
 
@@ -192,6 +187,8 @@ class AIRiskTab(QWidget):
     _QUOTE_TTL_SECONDS = 10.0
     _TRADE_QUOTE_TTL_SECONDS = 10.0
     _MARKET_INTEL_TTL_SECONDS = 120.0
+    # Tool families computed from positions; dropped on positions/risk updates.
+    _POSITION_DERIVED_TOOLS = ("portfolio_metrics", "portfolio_greeks", "risk_breaches")
     _PRESET_GROUPS: dict[str, list[str]] = {
         "Risk Review": [
             "Summarize my current portfolio risk, the biggest breaches, and the top 3 actions to take now.",
@@ -223,8 +220,7 @@ class AIRiskTab(QWidget):
         self._context: dict[str, Any] = {}
         self._chat_history: list[tuple[str, str]] = []
         self._suggestions: list[AITradeSuggestion] = []
-        self._tool_cache: dict[str, _ToolCacheEntry] = {}
-        self._tool_inflight: dict[str, asyncio.Task] = {}
+        self._tool_cache = ToolResultCache("ai_tools")
         self._ai_request_activity_event: asyncio.Event | None = None
         self._ai_request_tool_calls: list[str] | None = None
         self._ai_request_debug_tool_calls = False
@@ -427,19 +423,25 @@ class AIRiskTab(QWidget):
     def _clear_tool_cache(self) -> None:
         self._tool_cache.clear()
 
+    def tool_cache_stats(self) -> dict[str, Any]:
+        return self._tool_cache.stats()
+
     def _engine_connected(self) -> bool:
         return getattr(self._engine, "is_connected", False) is True
 
     def _invalidate_tool_cache_prefixes(self, *prefixes: str) -> None:
-        if not prefixes:
-            return
-        for key in list(self._tool_cache.keys()):
-            if any(key == prefix or key.startswith(f"{prefix}:") for prefix in prefixes):
-                self._tool_cache.pop(key, None)
+        self._tool_cache.invalidate(*prefixes)
 
     @Slot(object)
-    def _on_positions_updated(self, _positions: Any) -> None:
-        self._invalidate_tool_cache_prefixes("positions", "portfolio_metrics", "portfolio_greeks", "risk_breaches")
+    def _on_positions_updated(self, positions: Any) -> None:
+        # The emitted rows are the newest positions, so they replace the cached
+        # ones outright; everything derived from positions is dropped.
+        if isinstance(positions, list):
+            for key in ("positions:snapshot", "positions:fresh"):
+                self._tool_cache.put(key, positions)
+            self._invalidate_tool_cache_prefixes(*self._POSITION_DERIVED_TOOLS)
+        else:
+            self._invalidate_tool_cache_prefixes("positions", *self._POSITION_DERIVED_TOOLS)
 
     @Slot(object)
     def _on_account_updated(self, _account: Any) -> None:
@@ -451,7 +453,7 @@ class AIRiskTab(QWidget):
 
     @Slot(object)
     def _on_risk_updated(self, _risk: Any) -> None:
-        self._invalidate_tool_cache_prefixes("portfolio_metrics", "portfolio_greeks", "risk_breaches")
+        self._invalidate_tool_cache_prefixes(*self._POSITION_DERIVED_TOOLS)
 
     def _populate_preset_groups(self) -> None:
         self._cmb_preset_group.blockSignals(True)
@@ -490,26 +492,7 @@ class AIRiskTab(QWidget):
         return f"{prefix}:{encoded}"
 
     async def _get_cached_or_fetch(self, key: str, *, ttl_seconds: float, producer) -> Any:
-        now = time.monotonic()
-        entry = self._tool_cache.get(key)
-        if entry is not None and (now - entry.fetched_at) <= ttl_seconds:
-            return entry.value
-        inflight = self._tool_inflight.get(key)
-        if inflight is not None:
-            return await inflight
-
-        async def _run_producer() -> Any:
-            value = await producer()
-            self._tool_cache[key] = _ToolCacheEntry(value=value, fetched_at=time.monotonic())
-            return value
-
-        task = asyncio.create_task(_run_producer())
-        self._tool_inflight[key] = task
-        try:
-            return await task
-        finally:
-            if self._tool_inflight.get(key) is task:
-                self._tool_inflight.pop(key, None)
+        return await self._tool_cache.get_or_fetch(key, ttl_seconds=ttl_seconds, producer=producer)
 
     async def _get_positions_data(self, *, require_fresh_greeks: bool = False) -> list[Any]:
         ttl_seconds = self._GREEKS_TTL_SECONDS if require_fresh_greeks else self._POSITIONS_TTL_SECONDS
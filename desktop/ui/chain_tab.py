@@ -21,7 +21,7 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
     QComboBox, QTableView, QHeaderView, QAbstractItemView,
 )
-from PySide6.QtCore import Qt, Signal, Slot, QModelIndex, QTimer
+from PySide6.QtCore import Qt, Signal, Slot, QModelIndex
 
 from desktop.models.table_models import ChainTableModel
 
@@ -53,13 +53,10 @@ class ChainTab(QWidget):
         self._last_chain_params: tuple | None = None  # (underlying, expiry, sec_type, exchange)
         self._loading_expiries = False
         self._full_chain_rows: list = []
+        self._full_row_index: dict[int, int] = {}  # conid → index in _full_chain_rows
         self._underlying_price: float | None = None
         self._setup_ui()
         self._connect_signals()
-        # ── Live price refresh timer (visible strikes only) ──
-        self._stream_timer = QTimer(self)
-        self._stream_timer.setInterval(5_000)  # 5s streaming refresh
-        self._stream_timer.timeout.connect(self._on_stream_tick)
 
     def _setup_ui(self) -> None:
         layout = QVBoxLayout(self)
@@ -171,6 +168,7 @@ class ChainTab(QWidget):
         self._table.doubleClicked.connect(self._on_double_click)
         self._table.clicked.connect(self._on_click)  # single-click for leg cart
         self._engine.chain_ready.connect(self._on_chain_ready)
+        self._engine.chain_ticks.connect(self._on_chain_ticks)
         self._engine.connected.connect(self._on_connected)
         self._engine.disconnected.connect(self._on_disconnected)
         self._engine.positions_updated.connect(self._on_positions_loaded)
@@ -215,7 +213,6 @@ class ChainTab(QWidget):
         self._btn_fetch.setEnabled(False)
         self._btn_clear_reload.setEnabled(False)
         self._cmb_expiry.clear()
-        self._stream_timer.stop()
 
     @Slot(str)
     def _on_expiry_changed(self, _expiry_text: str) -> None:
@@ -228,7 +225,6 @@ class ChainTab(QWidget):
     @Slot()
     def _on_clear_reload(self) -> None:
         """Cancel all streaming subscriptions, clear the model, and re-fetch."""
-        self._stream_timer.stop()
         try:
             self._engine.cancel_chain_streaming()
         except Exception:
@@ -419,9 +415,6 @@ class ChainTab(QWidget):
                     self._lbl_status.setText(f"✅ {len(rows)} contracts · Underlying {underlying}: {self._underlying_price:,.2f}{cache_indicator}")
                 else:
                     self._lbl_status.setText(f"✅ {len(rows)} contracts{cache_indicator}")
-                # Start live price refresh when chain is loaded
-                if rows and not self._stream_timer.isActive():
-                    self._stream_timer.start()
             except RuntimeError:
                 return  # Widget deleted during shutdown
         except Exception as exc:
@@ -439,8 +432,29 @@ class ChainTab(QWidget):
     @Slot(list)
     def _on_chain_ready(self, rows: list) -> None:
         self._full_chain_rows = list(rows)
+        self._full_row_index = {
+            int(getattr(row, "conid", 0) or 0): idx for idx, row in enumerate(self._full_chain_rows)
+        }
         self._apply_chain_filters()
 
+    @Slot(list)
+    def _on_chain_ticks(self, conids: list) -> None:
+        """Apply a coalesced batch of live chain ticks to the affected cells only."""
+        positions = [self._full_row_index[c] for c in conids if c in self._full_row_index]
+        if not positions:
+            return
+        try:
+            updated = self._engine.read_chain_from_live_tickers([self._full_chain_rows[i] for i in positions])
+        except Exception as exc:
+            logger.debug("Chain tick read failed: %s", exc)
+            return
+        for idx, row in zip(positions, updated):
+            self._full_chain_rows[idx] = row
+        try:
+            self._model.update_rows(updated)
+        except RuntimeError:
+            pass  # Widget deleted
+
     def _selected_sigma_band(self) -> int:
         text = self._cmb_sd_range.currentText().strip()
         return 1 if text.startswith("±1") else 2 if text.startswith("±2") else 3
@@ -512,58 +526,32 @@ class ChainTab(QWidget):
             return None
         return sum(iv_samples) / len(iv_samples)
 
-    @Slot()
-    def _on_stream_tick(self) -> None:
-        """Periodic live price refresh — re-fetches prices for currently displayed chain."""
-        if not self._last_chain_params or not self._engine.is_connected:
-            return
-        underlying, expiry, sec_type, exchange = self._last_chain_params
-        loop = asyncio.get_event_loop()
-        loop.create_task(self._async_stream_refresh(underlying, expiry, sec_type, exchange))
-
-    async def _async_stream_refresh(
+    async def _async_resume_streaming(
         self, underlying: str, expiry, sec_type: str, exchange: str
     ) -> None:
-        """Refresh prices for the visible chain.
+        """Re-open live chain streams after the tab was hidden.
 
-        If the engine already has live streaming tickers for the current chain
-        (populated during the initial fetch), we read directly from those tickers
-        — no new IB market-data requests.  This is efficient and respects IB’s
-        concurrent-subscription limits.
-
-        Falls back to a full re-fetch only when no live tickers are cached.
+        Live quotes then arrive through ``IBEngine.chain_ticks``; this is only
+        needed when the engine holds no chain tickers (hideEvent cancels them).
         """
         try:
-            if self._engine._chain_tickers:
-                # Fast path: read from already-live tickers (no IB request needed)
-                current_rows = self._model.get_all_rows()
-                if current_rows:
-                    updated = self._engine.read_chain_from_live_tickers(current_rows)
-                    if updated:
-                        self._full_chain_rows = list(updated)
-                        try:
-                            self._apply_chain_filters()
-                        except RuntimeError:
-                            pass  # Widget deleted
-            else:
-                # No live tickers — do a full re-fetch (also starts a new live stream)
-                await self._engine.get_chain(
-                    underlying,
-                    expiry=expiry,
-                    sec_type=sec_type,
-                    exchange=exchange,
-                    force_refresh=True,
-                )
+            await self._engine.get_chain(
+                underlying,
+                expiry=expiry,
+                sec_type=sec_type,
+                exchange=exchange,
+                force_refresh=True,
+            )
         except Exception:
             pass  # silent — streaming failures are non-fatal
 
     def _clear_chain_view(self, status: str) -> None:
-        self._stream_timer.stop()
         try:
             self._engine.cancel_chain_streaming()
         except Exception:
             pass
         self._full_chain_rows = []
+        self._full_row_index = {}
         self._model.set_data([])
         self._lbl_status.setText(status)
 
@@ -628,12 +616,13 @@ class ChainTab(QWidget):
 
     def showEvent(self, event) -> None:
         super().showEvent(event)
-        if self._last_chain_params and self._engine.is_connected:
-            self._stream_timer.start()
+        if self._last_chain_params and self._engine.is_connected and not self._engine._chain_tickers:
+            underlying, expiry, sec_type, exchange = self._last_chain_params
+            loop = asyncio.get_event_loop()
+            loop.create_task(self._async_resume_streaming(underlying, expiry, sec_type, exchange))
 
     def hideEvent(self, event) -> None:
         super().hideEvent(event)
-        self._stream_timer.stop()
         # Release live IB market-data subscriptions when the tab is not visible
         self._engine.cancel_chain_streaming()
 
@@ -15,16 +15,25 @@ Layout:
   ├────────────────────────────────────────────────────────┤
   │                     Status Bar                         │
   └────────────────────────────────────────────────────────┘
+
+Only the Portfolio tab is built with the window.  Every other tab starts as a
+placeholder and is imported and constructed the first time it is shown (or
+first accessed through its ``_<name>_tab`` property), so the AI tab's LLM
+client stack and the other tabs' dependencies stay out of cold start.
 """
 from __future__ import annotations
 
 import asyncio
+import importlib
+import logging
 import os
-from typing import TYPE_CHECKING
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
 
 from PySide6.QtWidgets import (
     QMainWindow, QTabWidget, QDockWidget, QStatusBar,
-    QToolBar, QLabel, QMessageBox,
+    QToolBar, QLabel, QMessageBox, QVBoxLayout, QWidget,
 )
 from PySide6.QtCore import Qt, Slot, QTimer
 from PySide6.QtGui import QAction
@@ -33,27 +42,60 @@ from desktop.config.preferences import load_preferences, save_preferences
 from desktop.engine.sound_engine import SoundEngine
 from desktop.ui.portfolio_tab import PortfolioTab
 from desktop.ui.order_entry import OrderEntryPanel
-from desktop.ui.chain_tab import ChainTab
-from desktop.ui.risk_tab import RiskTab
-from desktop.ui.strategies_tab import StrategiesTab
-from desktop.ui.orders_tab import OrdersTab
-from desktop.ui.market_tab import MarketTab
-from desktop.ui.journal_tab import JournalTab
-from desktop.ui.ai_risk_tab import AIRiskTab
 from desktop.ui.widgets.account_picker import AccountPicker
+from desktop.ui.widgets.perf_panel import PerfPanel
 from desktop.workers.agent_runner import AgentRunner
 from desktop.engine.token_manager import TokenManager
 
 if TYPE_CHECKING:
     from desktop.engine.ib_engine import IBEngine
+    from desktop.engine.perf_timing import PerfRun
+
+logger = logging.getLogger(__name__)
+
+# Lazily built tabs, in display order after Portfolio: (key, label, module, class).
+_LAZY_TABS: list[tuple[str, str, str, str]] = [
+    ("chain", "📈 Options Chain", "desktop.ui.chain_tab", "ChainTab"),
+    ("risk", "⚠ Risk", "desktop.ui.risk_tab", "RiskTab"),
+    ("strategies", "🧠 Strategies", "desktop.ui.strategies_tab", "StrategiesTab"),
+    ("orders", "📋 Orders", "desktop.ui.orders_tab", "OrdersTab"),
+    ("journal", "📓 Journal", "desktop.ui.journal_tab", "JournalTab"),
+    ("ai", "🤖 AI / Risk", "desktop.ui.ai_risk_tab", "AIRiskTab"),
+    ("market", "💹 Market Data", "desktop.ui.market_tab", "MarketTab"),
+]
+
+# Background-agent events queued for the AI tab until it is first opened.
+_AGENT_EVENT_BACKLOG = 200
+
+
+class _LazyTabPlaceholder(QWidget):
+    """Stand-in page for a tab that has not been built yet."""
+
+    def __init__(self, key: str, parent=None):
+        super().__init__(parent)
+        self.key = key
+        layout = QVBoxLayout(self)
+        label = QLabel("Loading…")
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(label)
 
 
 class MainWindow(QMainWindow):
     """Top-level window for the desktop trading application."""
 
-    def __init__(self, engine: IBEngine, token_manager: TokenManager | None = None, parent=None):
+    def __init__(
+        self,
+        engine: IBEngine,
+        token_manager: TokenManager | None = None,
+        parent=None,
+        *,
+        startup: PerfRun | None = None,
+    ):
         super().__init__(parent)
         self._engine = engine
+        self._startup = startup
+        self._built_tabs: dict[str, QWidget] = {}
+        self._agent_events: deque[tuple[str, dict]] = deque(maxlen=_AGENT_EVENT_BACKLOG)
         self._token_manager = token_manager or TokenManager()
         self._preferences_path = getattr(self._token_manager, "_preferences_path", None)
         self._preferences = load_preferences(self._preferences_path)
@@ -71,6 +113,9 @@ class MainWindow(QMainWindow):
         self._setup_auto_refresh()
         # Auto-connect as soon as the Qt event loop starts running
         QTimer.singleShot(200, self._on_connect)
+        if self._startup is not None:
+            self._startup.lap("main_window")
+            QTimer.singleShot(0, self._on_first_event_loop_turn)
 
     def _setup_ui(self) -> None:
         # ── Central: Tab widget ───────────────────────────────────────────
@@ -78,37 +123,13 @@ class MainWindow(QMainWindow):
         self._tabs.setTabPosition(QTabWidget.TabPosition.North)
         self._tabs.setDocumentMode(True)
 
-        # Portfolio tab
+        # Portfolio tab (the startup view, built eagerly)
         self._portfolio_tab = PortfolioTab(self._engine)
         self._tabs.addTab(self._portfolio_tab, "📊 Portfolio")
 
-        # Options Chain tab
-        self._chain_tab = ChainTab(self._engine)
-        self._tabs.addTab(self._chain_tab, "📈 Options Chain")
-
-        # Risk tab
-        self._risk_tab = RiskTab(self._engine)
-        self._tabs.addTab(self._risk_tab, "⚠ Risk")
-
-        # Strategies tab
-        self._strategies_tab = StrategiesTab(self._engine)
-        self._tabs.addTab(self._strategies_tab, "🧠 Strategies")
-
-        # Orders tab
-        self._orders_tab = OrdersTab(self._engine)
-        self._tabs.addTab(self._orders_tab, "📋 Orders")
-
-        # Journal tab
-        self._journal_tab = JournalTab(self._engine)
-        self._tabs.addTab(self._journal_tab, "📓 Journal")
-
-        # AI / Risk tab
-        self._ai_tab = AIRiskTab(self._engine)
-        self._tabs.addTab(self._ai_tab, "🤖 AI / Risk")
-
-        # Market Data tab
-        self._market_tab = MarketTab(self._engine)
-        self._tabs.addTab(self._market_tab, "💹 Market Data")
+        # Everything else is built on first show
+        for key, label, _module, _cls in _LAZY_TABS:
+            self._tabs.addTab(_LazyTabPlaceholder(key), label)
 
         self.setCentralWidget(self._tabs)
 
@@ -123,6 +144,13 @@ class MainWindow(QMainWindow):
         dock.setMinimumWidth(320)
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, dock)
 
+        # ── Bottom dock: refresh stage timings (hidden until toggled) ─────
+        self._perf_panel = PerfPanel(self._engine)
+        self._perf_dock = QDockWidget("Refresh Timings", self)
+        self._perf_dock.setWidget(self._perf_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self._perf_dock)
+        self._perf_dock.hide()
+
     def _setup_toolbar(self) -> None:
         toolbar = QToolBar("Main Toolbar")
         toolbar.setMovable(False)
@@ -152,6 +180,16 @@ class MainWindow(QMainWindow):
         self._act_compact_mode.triggered.connect(self._on_compact_mode_toggled)
         toolbar.addAction(self._act_compact_mode)
 
+        self._act_cache_stats = QAction("🧮 Cache Stats", self)
+        self._act_cache_stats.setToolTip("Show engine cache and market-data line usage")
+        self._act_cache_stats.triggered.connect(self._on_show_cache_stats)
+        toolbar.addAction(self._act_cache_stats)
+
+        self._act_timings = self._perf_dock.toggleViewAction()
+        self._act_timings.setText("⏱ Timings")
+        self._act_timings.setToolTip("Show p50/p95 stage timings for portfolio refreshes")
+        toolbar.addAction(self._act_timings)
+
         toolbar.addSeparator()
 
         def token_checker(profile: str) -> bool:
@@ -194,11 +232,8 @@ class MainWindow(QMainWindow):
         self._engine.error_occurred.connect(self._on_engine_error)
         self._engine.connection_state.connect(self._on_connection_state_changed)
 
-        # Chain click → Order Entry prefill
-        self._chain_tab.chain_row_selected.connect(self._order_entry.prefill_from_chain)
-        self._chain_tab.leg_clicked.connect(self._on_chain_leg_clicked)
+        # Chain / AI tab signals are wired in _wire_tab() when those tabs are built
         self._portfolio_tab.position_action_requested.connect(self._on_portfolio_action_requested)
-        self._ai_tab.suggestion_authorized.connect(self._on_ai_suggestion_authorized)
 
         # Order submitted → auto-refresh orders
         self._order_entry.order_submitted.connect(self._on_order_submitted)
@@ -207,12 +242,125 @@ class MainWindow(QMainWindow):
         self._engine.order_filled.connect(self._on_order_filled)
         self._tabs.currentChanged.connect(self._on_tab_changed)
 
-        # Background agents → AI/Risk tab
-        self._agent_runner.alert_raised.connect(self._ai_tab.on_risk_alert)
-        self._agent_runner.arb_signal.connect(self._ai_tab.on_arb_signal)
-        self._agent_runner.trade_suggestion.connect(self._ai_tab.on_trade_suggestion)
+        # Background agents → AI/Risk tab (queued until the tab exists)
+        self._agent_runner.alert_raised.connect(lambda payload: self._to_ai_tab("on_risk_alert", payload))
+        self._agent_runner.arb_signal.connect(lambda payload: self._to_ai_tab("on_arb_signal", payload))
+        self._agent_runner.trade_suggestion.connect(lambda payload: self._to_ai_tab("on_trade_suggestion", payload))
         self._apply_compact_mode(self._act_compact_mode.isChecked())
 
+    # ── lazy tabs ─────────────────────────────────────────────────────────
+
+    @property
+    def _chain_tab(self):
+        return self._tab("chain")
+
+    @property
+    def _risk_tab(self):
+        return self._tab("risk")
+
+    @property
+    def _strategies_tab(self):
+        return self._tab("strategies")
+
+    @property
+    def _orders_tab(self):
+        return self._tab("orders")
+
+    @property
+    def _journal_tab(self):
+        return self._tab("journal")
+
+    @property
+    def _ai_tab(self):
+        return self._tab("ai")
+
+    @property
+    def _market_tab(self):
+        return self._tab("market")
+
+    def _tab(self, key: str) -> QWidget:
+        """Return the tab for *key*, importing and building it on first use."""
+        tab = self._built_tabs.get(key)
+        if tab is not None:
+            return tab
+        index = next(
+            i for i in range(self._tabs.count())
+            if isinstance(self._tabs.widget(i), _LazyTabPlaceholder) and self._tabs.widget(i).key == key
+        )
+        _key, label, module_name, class_name = next(spec for spec in _LAZY_TABS if spec[0] == key)
+
+        started = time.perf_counter()
+        tab_cls = getattr(importlib.import_module(module_name), class_name)
+        tab = tab_cls(self._engine)
+        self._built_tabs[key] = tab
+
+        placeholder = self._tabs.widget(index)
+        was_current = self._tabs.currentIndex() == index
+        self._tabs.blockSignals(True)
+        try:
+            self._tabs.removeTab(index)
+            self._tabs.insertTab(index, tab, label)
+            if was_current:
+                self._tabs.setCurrentIndex(index)
+        finally:
+            self._tabs.blockSignals(False)
+        placeholder.deleteLater()
+
+        self._wire_tab(key, tab)
+        self._catch_up_tab(tab)
+        logger.info("Built %s tab in %.0f ms", key, (time.perf_counter() - started) * 1000.0)
+        return tab
+
+    def _wire_tab(self, key: str, tab: Any) -> None:
+        if key == "chain":
+            # Chain click → Order Entry prefill
+            tab.chain_row_selected.connect(self._order_entry.prefill_from_chain)
+            tab.leg_clicked.connect(self._on_chain_leg_clicked)
+        elif key == "ai":
+            tab.suggestion_authorized.connect(self._on_ai_suggestion_authorized)
+            while self._agent_events:
+                method, payload = self._agent_events.popleft()
+                getattr(tab, method)(payload)
+        if hasattr(tab, "set_compact_mode"):
+            tab.set_compact_mode(self._act_compact_mode.isChecked())
+
+    def _catch_up_tab(self, tab: Any) -> None:
+        """Replay the engine state a tab would have seen had it existed from startup."""
+        engine = self._engine
+        if engine.is_connected and hasattr(tab, "_on_connected"):
+            tab._on_connected()
+        positions = engine.positions_snapshot()
+        if positions and hasattr(tab, "_on_positions_updated"):
+            tab._on_positions_updated(positions)
+        if positions and hasattr(tab, "_on_positions_loaded"):
+            tab._on_positions_loaded(positions)
+        if hasattr(tab, "_on_market_snapshot"):
+            for snap in engine.market_snapshots():
+                tab._on_market_snapshot(snap)
+        risk = engine.risk_snapshot()
+        if risk is not None and hasattr(tab, "_on_risk_updated"):
+            tab._on_risk_updated(risk)
+        if engine.is_connected and hasattr(tab, "_on_orders_updated"):
+            tab._on_orders_updated(engine.open_orders_snapshot())
+
+    def _to_ai_tab(self, method: str, payload: dict) -> None:
+        tab = self._built_tabs.get("ai")
+        if tab is None:
+            self._agent_events.append((method, payload))
+            return
+        getattr(tab, method)(payload)
+
+    @Slot()
+    def _on_first_event_loop_turn(self) -> None:
+        """Close the startup timing run once the window is up and painting."""
+        run, self._startup = self._startup, None
+        if run is None:
+            return
+        run.lap("first_paint")
+        run.count("tabs_built", 1 + len(self._built_tabs))
+        self._engine._record_perf(run)
+        logger.info("Startup to interactive portfolio view: %s", run.report())
+
     @Slot(dict)
     def _on_order_submitted(self, result: dict) -> None:
         oid = str(result.get('order_id', '?'))[:8]
@@ -423,11 +571,25 @@ class MainWindow(QMainWindow):
         mode = "Compact" if checked else "Full"
         self._statusbar.showMessage(f"{mode} mode enabled")
 
+    @Slot()
+    def _on_show_cache_stats(self) -> None:
+        parts = []
+        for stats in self._engine.cache_stats():
+            hit_rate = stats["hit_rate"]
+            rate = f"{hit_rate:.0%}" if hit_rate is not None else "–"
+            size = f"{stats['bytes'] / 1_048_576:.1f} MB" if stats["max_bytes"] else f"{stats['entries']} entries"
+            parts.append(f"{stats['name']}: {size} · hit {rate} · evicted {stats['evictions']}")
+        lines = self._engine.market_data_line_stats()
+        parts.append(f"lines: {lines['lines']}/{lines['budget']}")
+        message = " | ".join(parts)
+        self._act_cache_stats.setToolTip(message.replace(" | ", "\n"))
+        self._statusbar.showMessage(message, 15000)
+
     def _apply_compact_mode(self, enabled: bool) -> None:
-        if hasattr(self._portfolio_tab, "set_compact_mode"):
-            self._portfolio_tab.set_compact_mode(enabled)
-        if hasattr(self._orders_tab, "set_compact_mode"):
-            self._orders_tab.set_compact_mode(enabled)
+        # Tabs built later pick the mode up in _wire_tab()
+        for tab in (self._portfolio_tab, *self._built_tabs.values()):
+            if hasattr(tab, "set_compact_mode"):
+                tab.set_compact_mode(enabled)
 
     @Slot(str)
     def _on_copilot_profile_changed(self, profile: str) -> None:
@@ -438,9 +600,13 @@ class MainWindow(QMainWindow):
         )
 
     @Slot(int)
-    def _on_tab_changed(self, _: int) -> None:
-        if hasattr(self._market_tab, "_sync_refresh_timer_state"):
-            self._market_tab._sync_refresh_timer_state()
+    def _on_tab_changed(self, index: int) -> None:
+        page = self._tabs.widget(index)
+        if isinstance(page, _LazyTabPlaceholder):
+            self._tab(page.key)
+        market_tab = self._built_tabs.get("market")
+        if market_tab is not None and hasattr(market_tab, "_sync_refresh_timer_state"):
+            market_tab._sync_refresh_timer_state()
 
     def closeEvent(self, event) -> None:
         """Gracefully disconnect IB before Qt event loop shuts down."""
@@ -297,7 +297,7 @@ class MarketTab(QWidget):
         for sym, sec_type, exchange in self.DEFAULT_WATCHLIST:
             self._add_favorite(sym, sec_type, exchange)
             try:
-                await self._engine.get_market_snapshot(sym, sec_type, exchange)
+                await self._engine.watch_quote(sym, sec_type, exchange)
             except Exception as exc:
                 self._lbl_status.setText(f"⚠ {sym}: {exc}")
         self._lbl_status.setText(f"✅ Loaded {len(self.DEFAULT_WATCHLIST)} symbols")
@@ -326,6 +326,7 @@ class MarketTab(QWidget):
             if self._favorite_label(entry) == item_text:
                 self._favorite_lookup.discard(entry)
                 del self._favorites[i]
+                self._engine.unwatch_quote(entry.symbol, entry.sec_type, entry.exchange)
                 self._lst_favorites.takeItem(self._lst_favorites.row(current))
                 self._favorites_store.save(self._favorites)
                 self._lbl_status.setText(f"Removed {item_text}")
@@ -346,7 +347,8 @@ class MarketTab(QWidget):
         try:
             for favorite in list(self._favorites):
                 try:
-                    await self._engine.get_market_snapshot(
+                    # Streaming watchlist lines: only the first call per symbol hits IB.
+                    await self._engine.watch_quote(
                         favorite.symbol,
                         favorite.sec_type,
                         favorite.exchange,
@@ -46,6 +46,7 @@ class PortfolioTab(QWidget):
         super().__init__(parent)
         self._engine = engine
         self._raw_positions: list = []   # last fetched rows
+        self._strategy_groups: list | None = None  # engine-reconstructed groups for _raw_positions
         self._compact_mode = False
         self._setup_ui()
         self._connect_signals()
@@ -186,6 +187,7 @@ class PortfolioTab(QWidget):
         self._btn_refresh.clicked.connect(self._on_refresh)
         self._btn_export_csv.clicked.connect(self._on_export_csv)
         self._btn_export_json.clicked.connect(self._on_export_json)
+        self._engine.strategies_updated.connect(self._on_strategies_updated)
         self._engine.positions_updated.connect(self._on_positions_updated)
         self._engine.account_updated.connect(self._on_account_updated)
         self._view_group.idToggled.connect(self._on_view_toggled)
@@ -418,6 +420,11 @@ class PortfolioTab(QWidget):
             writer.writeheader()
             writer.writerows(rows)
 
+    @Slot(list)
+    def _on_strategies_updated(self, groups: list) -> None:
+        # Emitted just before positions_updated with groups built off the GUI loop.
+        self._strategy_groups = groups
+
     @Slot(list)
     def _on_positions_updated(self, rows: list) -> None:
         self._raw_positions = rows
@@ -435,7 +442,8 @@ class PortfolioTab(QWidget):
         )
         estimated_greeks = sum(
             1 for r in rows
-            if getattr(r, "sec_type", "") in ("OPT", "FOP") and getattr(r, "greeks_source", None) == "estimated_bsm"
+            if getattr(r, "sec_type", "") in ("OPT", "FOP")
+            and str(getattr(r, "greeks_source", None) or "").startswith("estimated_")
         )
         parts: list[str] = []
         if missing_greeks:
@@ -461,7 +469,10 @@ class PortfolioTab(QWidget):
             return
 
         self._trades_model.set_sorting(metric, descending=descending, absolute=absolute)
-        self._trades_model.set_data(self._raw_positions, account_id=getattr(self._engine, "account_id", ""))
+        if self._strategy_groups is not None:
+            self._trades_model.set_groups(self._strategy_groups)
+        else:
+            self._trades_model.set_data(self._raw_positions, account_id=getattr(self._engine, "account_id", ""))
         self._model = self._trades_model
         self._table.setModel(self._trades_model)
 
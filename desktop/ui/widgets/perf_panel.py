@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any
+
+from PySide6.QtCore import Qt, Slot
+from PySide6.QtWidgets import QHeaderView, QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+
+
+class PerfPanel(QWidget):
+    """Status panel with p50/p95 stage timings for an instrumented engine call.
+
+    Refreshes whenever the engine emits ``perf_updated`` for *operation*
+    (default ``refresh_positions``); reads ``engine.perf_stats()``.
+    """
+
+    COLUMNS = ("Stage", "Runs", "p50 ms", "p95 ms", "Last ms")
+
+    def __init__(self, engine, operation: str = "refresh_positions", parent=None):
+        super().__init__(parent)
+        self._engine = engine
+        self._operation = operation
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        self._lbl_summary = QLabel("No timing data yet")
+        self._lbl_summary.setWordWrap(True)
+        layout.addWidget(self._lbl_summary)
+
+        self._table = QTableWidget(0, len(self.COLUMNS))
+        self._table.setHorizontalHeaderLabels(list(self.COLUMNS))
+        self._table.verticalHeader().setVisible(False)
+        self._table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self._table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self._table)
+
+        engine.perf_updated.connect(self._on_perf_updated)
+
+    @Slot(str)
+    def _on_perf_updated(self, operation: str) -> None:
+        if operation == self._operation and self.isVisible():
+            self.refresh()
+
+    def refresh(self) -> None:
+        stats: dict[str, Any] = self._engine.perf_stats(self._operation)
+        stages: dict[str, dict[str, Any]] = stats.get("stages") or {}
+        self._table.setRowCount(len(stages))
+        for row, (name, values) in enumerate(stages.items()):
+            cells = [name, str(values.get("n") or 0)] + [
+                f"{values[key]:,.1f}" if values.get(key) is not None else "–"
+                for key in ("p50_ms", "p95_ms", "last_ms")
+            ]
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if col:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self._table.setItem(row, col, item)
+        counts = stats.get("counts") or {}
+        counters = ", ".join(f"{name}={values['last']}" for name, values in counts.items())
+        self._lbl_summary.setText(
+            f"{self._operation}: {stats.get('runs', 0)} run(s)" + (f" · last: {counters}" if counters else "")
+        )
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.refresh()
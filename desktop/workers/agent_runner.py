@@ -204,12 +204,19 @@ class AgentRunner(QObject):
             logger.info("Risk breach cleared: %s", m)
 
     def _detect_regime(self, nlv: float) -> str:
-        """Simple regime based on VIX from last market snapshot."""
+        """Simple regime based on VIX from the live reference stream (last snapshot as fallback)."""
+        vix = None
         try:
-            snap = self._engine.last_market_snapshot("VIX") or {}
-            vix = float(snap.get("last") or snap.get("close") or 20.0)
+            price = getattr(self._engine.reference_quote("VIX"), "price", None)
+            vix = float(price) if isinstance(price, (int, float)) and price > 0 else None
         except Exception:
-            vix = 20.0
+            vix = None
+        if not vix:
+            try:
+                snap = self._engine.last_market_snapshot("VIX") or {}
+                vix = float(snap.get("last") or snap.get("close") or 20.0)
+            except Exception:
+                vix = 20.0
         if vix >= 35:
             return "crisis_mode"
         if vix >= 22:
@@ -22,3 +22,11 @@ def test_load_snapshots_uses_store_query():
     assert rows[0]["spx_delta"] == 5.0
     assert store.calls
     assert "start_dt" in store.calls[0]
+
+
+def test_load_snapshots_asks_for_downsampled_history():
+    store = _FakeSnapshotStore()
+
+    _load_snapshots(store, "1M")
+
+    assert store.calls[0]["max_points"] > 0